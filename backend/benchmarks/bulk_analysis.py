@@ -0,0 +1,56 @@
+"""Mede a vazão da análise em massa de currículos com 1..N processos.
+
+Usa a mesma função executada pelo BulkAnalysisService
+(resume_analyzer.analyze_candidate_batch), sem banco de dados.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bulk_analysis --resumes 100000 --workers 1 2 4 8
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.synthetic import generate_resumes
+from src.services.resume_analyzer import analyze_candidate_batch
+
+
+def run(rows, workers: int, chunk_size: int) -> dict:
+    chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        # Aquece os processos (importação e compilação da taxonomia) fora da medição
+        list(pool.map(analyze_candidate_batch, [rows[:1]] * workers))
+        start = time.perf_counter()
+        analyzed = sum(len(result) for result in pool.map(analyze_candidate_batch, chunks))
+        seconds = time.perf_counter() - start
+    return {
+        'workers': workers,
+        'resumes': analyzed,
+        'seconds': round(seconds, 3),
+        'resumes_per_second': round(analyzed / seconds, 1) if seconds else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resumes', type=int, default=20000)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    resumes = generate_resumes(args.resumes, seed=args.seed)
+    rows = [(index, None, text) for index, text in enumerate(resumes)]
+
+    baseline = None
+    for workers in args.workers:
+        result = run(rows, workers, args.chunk_size)
+        baseline = baseline or result['resumes_per_second']
+        result['speedup'] = round(result['resumes_per_second'] / baseline, 2) if baseline else None
+        print(', '.join(f'{key}={value}' for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
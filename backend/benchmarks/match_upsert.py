@@ -0,0 +1,106 @@
+"""Mede a gravação de resultados de compatibilidade em candidate_job_matches.
+
+Compara o upsert em lote do MatchStore (INSERT ... ON CONFLICT DO UPDATE por
+lote) com o padrão anterior de SELECT + UPDATE/INSERT + commit por par.
+
+Uso (a partir de backend/):
+    python -m benchmarks.match_upsert --candidates 1000 --jobs 100
+    python -m benchmarks.match_upsert --database-url postgresql://...
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from flask import Flask
+from sqlalchemy import insert
+
+from src.models import db, Candidate, CandidateJobMatch, JobPosting, Tenant
+from src.services.match_store import MatchStore
+
+BREAKDOWN = {'skills_match': 50.0, 'experience_match': 100.0, 'location_match': 50.0,
+             'salary_match': 75.0, 'overall_score': 68.75}
+
+
+def create_app(database_url: str) -> Flask:
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    db.init_app(app)
+    return app
+
+
+def seed(candidates: int, jobs: int):
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(Tenant), [{'id': 1, 'name': 'benchmark'}])
+    db.session.execute(insert(Candidate), [
+        {'id': index, 'tenant_id': 1, 'first_name': 'c', 'last_name': str(index)}
+        for index in range(1, candidates + 1)
+    ])
+    db.session.execute(insert(JobPosting), [
+        {'id': index, 'tenant_id': 1, 'title': 'job', 'description': 'd'}
+        for index in range(1, jobs + 1)
+    ])
+    db.session.commit()
+
+
+def legacy_write(pairs):
+    """Padrão anterior da rota de compatibilidade: uma consulta e um commit por par."""
+    for candidate_id, job_id in pairs:
+        match = CandidateJobMatch.query.filter_by(candidate_id=candidate_id, job_posting_id=job_id).first()
+        if match:
+            match.match_score = BREAKDOWN['overall_score']
+        else:
+            db.session.add(CandidateJobMatch(tenant_id=1, candidate_id=candidate_id, job_posting_id=job_id,
+                                             match_score=BREAKDOWN['overall_score']))
+        db.session.commit()
+
+
+def bulk_write(pairs):
+    MatchStore.upsert_many(
+        {'tenant_id': 1, 'candidate_id': candidate_id, 'job_posting_id': job_id, 'breakdown': BREAKDOWN}
+        for candidate_id, job_id in pairs
+    )
+    db.session.commit()
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--candidates', type=int, default=1000)
+    parser.add_argument('--jobs', type=int, default=100)
+    parser.add_argument('--legacy-pairs', type=int, default=2000,
+                        help='pares gravados pelo padrão anterior (extrapolado para o total)')
+    parser.add_argument('--database-url', default=None, help='padrão: SQLite em arquivo temporário')
+    args = parser.parse_args()
+
+    database_url = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+    pairs = [(candidate_id, job_id)
+             for job_id in range(1, args.jobs + 1)
+             for candidate_id in range(1, args.candidates + 1)]
+
+    with create_app(database_url).app_context():
+        seed(args.candidates, args.jobs)
+        insert_seconds = timed(bulk_write, pairs)
+        update_seconds = timed(bulk_write, pairs)
+
+        sample = pairs[:args.legacy_pairs]
+        CandidateJobMatch.query.delete()
+        db.session.commit()
+        legacy_seconds = timed(legacy_write, sample)
+
+    print(f'pairs={len(pairs)}, dialect={database_url.split(":", 1)[0]}')
+    print(f'bulk_insert_seconds={insert_seconds:.3f}, rows_per_second={len(pairs) / insert_seconds:.0f}')
+    print(f'bulk_update_seconds={update_seconds:.3f}, rows_per_second={len(pairs) / update_seconds:.0f}')
+    legacy_rate = len(sample) / legacy_seconds
+    print(f'legacy_pairs={len(sample)}, legacy_seconds={legacy_seconds:.3f}, rows_per_second={legacy_rate:.0f}, '
+          f'estimated_legacy_seconds_for_all={len(pairs) / legacy_rate:.1f}')
+
+
+if __name__ == '__main__':
+    main()
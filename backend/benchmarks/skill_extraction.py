@@ -0,0 +1,75 @@
+"""Compara a extração de habilidades antiga (uma busca por substring por habilidade)
+com o SkillMatcher compilado.
+
+Uso (a partir de backend/):
+    python -m benchmarks.skill_extraction --resumes 10000 --extra-skills 1000
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from benchmarks.synthetic import generate_resumes
+from src.services.skill_matcher import SkillMatcher, load_skill_matcher
+
+
+def legacy_extract_skills(text: str, skills: List[str]) -> List[str]:
+    """Algoritmo anterior de AIService.extract_skills: um `in` por habilidade."""
+    if not text:
+        return []
+    text_lower = text.lower()
+    return list({skill for skill in skills if skill.lower() in text_lower})
+
+
+def synthetic_taxonomy(extra_skills: int, seed: int = 7) -> SkillMatcher:
+    """Taxonomia padrão acrescida de termos artificiais, para medir a escala."""
+    base = load_skill_matcher()
+    rng = random.Random(seed)
+    extra = [
+        ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 10)))
+        for _ in range(extra_skills)
+    ]
+    return SkillMatcher({'base': base.skills, 'extra': extra}, version=base.version)
+
+
+def run(resume_count: int, extra_skills: int = 0, seed: int = 42) -> dict:
+    resumes = generate_resumes(resume_count, seed=seed)
+    matcher = synthetic_taxonomy(extra_skills) if extra_skills else load_skill_matcher()
+
+    start = time.perf_counter()
+    legacy_results = [legacy_extract_skills(text, matcher.skills) for text in resumes]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher_results = [matcher.find_all(text) for text in resumes]
+    matcher_seconds = time.perf_counter() - start
+
+    # Casamentos que só a busca por substring encontra (ex.: "java" em "javascript")
+    legacy_only = sum(len(set(old) - set(new)) for old, new in zip(legacy_results, matcher_results))
+
+    return {
+        'resumes': resume_count,
+        'taxonomy_size': len(matcher.skills),
+        'legacy_seconds': round(legacy_seconds, 4),
+        'matcher_seconds': round(matcher_seconds, 4),
+        'speedup': round(legacy_seconds / matcher_seconds, 2) if matcher_seconds else None,
+        'legacy_only_matches': legacy_only,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resumes', type=int, default=10000)
+    parser.add_argument('--extra-skills', type=int, default=1000,
+                        help='termos artificiais adicionados na segunda rodada (0 desativa)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rounds = [0] + ([args.extra_skills] if args.extra_skills else [])
+    for extra in rounds:
+        result = run(args.resumes, extra_skills=extra, seed=args.seed)
+        print(', '.join(f'{key}={value}' for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
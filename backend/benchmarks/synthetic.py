@@ -0,0 +1,140 @@
+import random
+from typing import List
+
+from src.services.skill_matcher import load_skill_matcher
+
+FILLER_WORDS = [
+    'responsible', 'for', 'developing', 'and', 'maintaining', 'applications', 'team',
+    'projects', 'clients', 'delivered', 'features', 'using', 'with', 'in', 'the',
+    'company', 'systems', 'worked', 'on', 'platform', 'services', 'data', 'product',
+    'javascripting', 'sqlite', 'reactive', 'gitlab', 'cssom', 'awsome',
+]
+
+
+def generate_resumes(count: int, seed: int = 42, words_per_resume: int = 250) -> List[str]:
+    """Gera currículos sintéticos e determinísticos para benchmarks."""
+    rng = random.Random(seed)
+    skills = load_skill_matcher().skills
+    resumes = []
+    for _ in range(count):
+        words = [rng.choice(FILLER_WORDS) for _ in range(words_per_resume)]
+        for skill in rng.sample(skills, rng.randint(3, 12)):
+            words.insert(rng.randrange(len(words)), skill.title() if rng.random() < 0.3 else skill)
+        words.insert(rng.randrange(len(words)), f'{rng.randint(1, 15)} years of experience')
+        resumes.append(' '.join(words))
+    return resumes
+
+
+FIRST_NAMES = [
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique',
+    'Isabela', 'João', 'Karina', 'Lucas', 'Mariana', 'Nicolas', 'Olivia', 'Pedro',
+]
+LAST_NAMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa', 'Almeida',
+    'Ferreira', 'Rodrigues', 'Gomes', 'Martins', 'Araújo', 'Barbosa', 'Ribeiro', 'Carvalho',
+]
+
+
+def generate_candidates(count: int, duplicate_rate: float = 0.1, seed: int = 42) -> List[dict]:
+    """Gera candidatos sintéticos com uma fração de duplicados em formatos variados.
+
+    Os duplicados repetem email, LinkedIn e telefone de um candidato anterior com
+    variações de caixa, pontuação e URL, como acontece em importações reais.
+    """
+    rng = random.Random(seed)
+    candidates = []
+    for index in range(count):
+        if candidates and rng.random() < duplicate_rate:
+            original = rng.choice(candidates)
+            digits = ''.join(ch for ch in original['phone'] if ch.isdigit())
+            candidates.append({
+                'id': index + 1,
+                'first_name': original['first_name'].upper(),
+                'last_name': original['last_name'],
+                'email': f" {original['email'].upper()} ",
+                'phone': f'({digits[:2]}) {digits[2:7]}-{digits[7:]}',
+                'linkedin_url': original['linkedin_url'].replace('https://www.', 'http://br.') + '/'
+            })
+            continue
+
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        slug = f'{first_name}{last_name}{index}'.lower()
+        candidates.append({
+            'id': index + 1,
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': f'{slug}@example.com',
+            'phone': f'11{rng.randint(900000000, 999999999)}',
+            'linkedin_url': f'https://www.linkedin.com/in/{slug}' if rng.random() < 0.7 else ''
+        })
+    return candidates
+
+
+LOCATIONS = ['São Paulo', 'Rio de Janeiro', 'Belo Horizonte', 'Curitiba', 'Recife', 'Porto Alegre', 'Remoto']
+EXPERIENCE_LEVELS = ['entry', 'mid', 'senior', 'executive']
+
+# Escalas nomeadas dos benchmarks: quantidade de candidatos do tenant
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+
+
+def jobs_for_scale(candidate_count: int) -> int:
+    """Vagas do tenant sintético: uma para cada 100 candidatos, no mínimo 10."""
+    return max(10, candidate_count // 100)
+
+
+def generate_profiles(count: int, duplicate_rate: float = 0.1, seed: int = 42,
+                      include_resume: bool = True, words_per_resume: int = 120) -> List[dict]:
+    """Candidatos completos: identificação de generate_candidates (com duplicados
+    plantados) mais habilidades, currículo, experiência, localização e pretensão.
+
+    'features' traz as habilidades e a experiência plantadas, no formato do
+    CandidateFeatureStore, para medir a pontuação sem depender da extração.
+    Sem `include_resume` o texto não é gerado, o que mantém a escala de 1M em memória.
+    """
+    rng = random.Random(seed + 1)
+    skills = load_skill_matcher().skills
+    profiles = generate_candidates(count, duplicate_rate, seed)
+    for profile in profiles:
+        planted = rng.sample(skills, rng.randint(2, 10))
+        listed = planted[:rng.randint(0, len(planted))]
+        years = rng.randint(0, 20)
+        profile.update({
+            'skills': ', '.join(listed),
+            'experience_years': years if rng.random() < 0.6 else None,
+            'location': rng.choice(LOCATIONS),
+            'salary_expectation': rng.choice([None, rng.randrange(2000, 30000, 500)]),
+            'features': {'skills': sorted(set(planted)), 'experience_years': years}
+        })
+        if include_resume:
+            words = [rng.choice(FILLER_WORDS) for _ in range(words_per_resume)]
+            for skill in planted:
+                words.insert(rng.randrange(len(words)), skill.title() if rng.random() < 0.3 else skill)
+            words.insert(rng.randrange(len(words)), f'{years} years of experience')
+            if rng.random() < 0.4:
+                words.insert(rng.randrange(len(words)), rng.choice(['bachelor degree', 'master in computer science', 'mba']))
+            if rng.random() < 0.3:
+                words.insert(rng.randrange(len(words)), 'certified aws solutions architect')
+            profile['resume_text'] = ' '.join(words)
+    return profiles
+
+
+def generate_jobs(count: int, seed: int = 42) -> List[dict]:
+    """Vagas sintéticas no formato job_data usado pelo AIService."""
+    rng = random.Random(seed + 2)
+    skills = load_skill_matcher().skills
+    jobs = []
+    for index in range(count):
+        required = rng.sample(skills, rng.randint(0, 8))
+        salary_min = rng.choice([None, rng.randrange(2000, 15000, 500)])
+        jobs.append({
+            'id': index + 1,
+            'title': f'Vaga {index + 1}',
+            'description': ' '.join(rng.choice(FILLER_WORDS) for _ in range(60)),
+            'requirements': ', '.join(required),
+            'experience_level': rng.choice(EXPERIENCE_LEVELS),
+            'location': rng.choice(LOCATIONS),
+            'remote_work': rng.random() < 0.2,
+            'salary_min': salary_min,
+            'salary_max': salary_min + rng.randrange(1000, 10000, 500) if salary_min else None
+        })
+    return jobs
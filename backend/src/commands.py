@@ -0,0 +1,181 @@
+"""Comandos de linha de comando (flask <grupo> <comando>).
+
+Registrar na aplicação com register_commands(app).
+"""
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select
+
+from src.models import db, Candidate
+from src.services.dedup_index import CandidateDedupIndex
+from src.services.funnel import FunnelService
+from src.services.match_materializer import MatchMaterializer
+from src.services.result_cache import result_cache
+from src.services.task_queue import TaskQueue, TaskWorker
+from src.services.tenant_sketches import TenantSketchService
+from src.services.tenant_stats import TenantStatsService
+
+matches_cli = AppGroup('matches', help='Matriz de compatibilidade candidato x vaga.')
+tasks_cli = AppGroup('tasks', help='Fila de tarefas de IA (ai_tasks).')
+cache_cli = AppGroup('cache', help='Cache de resultados de IA (ai_results).')
+stats_cli = AppGroup('stats', help='Contadores agregados por tenant (tenant_stats).')
+sketches_cli = AppGroup('sketches', help='Sketches de streaming por tenant (tenant_sketches).')
+funnel_cli = AppGroup('funnel', help='Agregações diárias do funil de contratação (funnel_daily_rollups).')
+text_index_cli = AppGroup('text-index', help='Índices TF-IDF por tenant (text_index_dirty_marks).')
+dedup_cli = AppGroup('dedup', help='Chaves de deduplicação dos candidatos (colunas dedup_*).')
+
+
+def _print_stats(stats):
+    click.echo(', '.join(f'{key}={value}' for key, value in stats.items()))
+
+
+@matches_cli.command('rebuild')
+@click.option('--tenant-id', type=int, default=None, help='Limita a reconstrução a um tenant.')
+@click.option('--chunk-size', type=int, default=MatchMaterializer.CHUNK_SIZE, show_default=True)
+def rebuild_matches(tenant_id, chunk_size):
+    """Recalcula todos os pares (candidato, vaga ativa)."""
+    _print_stats(MatchMaterializer(chunk_size=chunk_size).rebuild(tenant_id))
+
+
+@matches_cli.command('process-dirty')
+@click.option('--tenant-id', type=int, default=None, help='Processa apenas as marcas de um tenant.')
+@click.option('--loop', is_flag=True, help='Continua processando a cada intervalo (worker).')
+@click.option('--interval', type=float, default=5.0, show_default=True, help='Segundos entre verificações.')
+def process_dirty_matches(tenant_id, loop, interval):
+    """Recalcula os pares marcados por alterações de candidatos e vagas."""
+    materializer = MatchMaterializer()
+    while True:
+        stats = materializer.process_dirty(tenant_id)
+        if stats['marks']:
+            _print_stats(stats)
+        if not loop:
+            return
+        if not materializer.pending_marks(tenant_id):
+            time.sleep(interval)
+
+
+@tasks_cli.command('worker')
+@click.option('--burst', is_flag=True, help='Termina quando a fila estiver vazia.')
+@click.option('--interval', type=float, default=1.0, show_default=True, help='Segundos entre verificações com a fila vazia.')
+def run_task_worker(burst, interval):
+    """Executa as operações de IA enfileiradas pelas rotas com async=true e as análises em massa."""
+    # Importado aqui para não carregar o modelo de IA nos demais comandos
+    from src.services.ai_operations import AIOperations
+    worker = TaskWorker(TaskQueue(), AIOperations().handlers(), limits=AIOperations.limits())
+    click.echo(f'Worker {worker.worker_id} iniciado')
+    processed = worker.run(interval, burst)
+    click.echo(f'processed={processed}')
+
+
+@tasks_cli.command('purge')
+def purge_tasks():
+    """Remove as tarefas cujo resultado expirou."""
+    click.echo(f'deleted={TaskQueue().purge_expired()}')
+
+
+@cache_cli.command('purge')
+@click.option('--days', type=int, default=30, show_default=True, help='Idade máxima dos resultados mantidos.')
+def purge_results(days):
+    """Remove os resultados gravados há mais de --days dias."""
+    click.echo(f'deleted={result_cache.purge(days)}')
+
+
+@stats_cli.command('reconcile')
+@click.option('--tenant-id', type=int, default=None, help='Limita a reconciliação a um tenant.')
+def reconcile_stats(tenant_id):
+    """Recalcula os contadores a partir das tabelas de origem e corrige o desvio."""
+    _print_stats(TenantStatsService().reconcile(tenant_id))
+
+
+@sketches_cli.command('rebuild')
+@click.option('--tenant-id', type=int, default=None, help='Limita a reconstrução a um tenant.')
+def rebuild_sketches(tenant_id):
+    """Recalcula os sketches de habilidades, salários e experiência a partir das tabelas de origem."""
+    _print_stats(TenantSketchService().rebuild(tenant_id))
+
+
+@sketches_cli.command('fold')
+@click.option('--tenant-id', type=int, default=None, help='Incorpora apenas os deltas de um tenant.')
+@click.option('--loop', is_flag=True, help='Continua incorporando a cada intervalo (worker).')
+@click.option('--interval', type=float, default=5.0, show_default=True, help='Segundos entre verificações.')
+def fold_sketches(tenant_id, loop, interval):
+    """Incorpora aos sketches os deltas gravados pelas escritas de candidatos."""
+    service = TenantSketchService()
+    while True:
+        stats = service.fold(tenant_id)
+        if stats['deltas']:
+            _print_stats(stats)
+        if not loop:
+            return
+        if not service.pending_deltas(tenant_id):
+            time.sleep(interval)
+
+
+@funnel_cli.command('rollup')
+@click.option('--start', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Primeiro dia (padrão: ontem).')
+@click.option('--end', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Último dia (padrão: hoje).')
+@click.option('--tenant-id', type=int, default=None, help='Limita a reconstrução a um tenant.')
+def rollup_funnel(start, end, tenant_id):
+    """Recalcula as agregações diárias do funil a partir dos eventos de status."""
+    end = end.date() if end else datetime.utcnow().date()
+    start = start.date() if start else end - timedelta(days=1)
+    if start > end:
+        raise click.BadParameter('--start deve ser anterior a --end')
+    _print_stats(FunnelService().rebuild(start, end, tenant_id))
+
+
+@text_index_cli.command('process-dirty')
+@click.option('--tenant-id', type=int, default=None, help='Processa apenas as marcas de um tenant.')
+@click.option('--loop', is_flag=True, help='Continua processando a cada intervalo (worker).')
+@click.option('--interval', type=float, default=5.0, show_default=True, help='Segundos entre verificações.')
+def process_dirty_text_index(tenant_id, loop, interval):
+    """Aplica aos índices TF-IDF os candidatos e vagas criados, alterados ou excluídos."""
+    from src.services.text_similarity import TextSimilarityService
+    service = TextSimilarityService()
+    while True:
+        stats = service.process_dirty(tenant_id)
+        if stats['marks']:
+            _print_stats(stats)
+        if not loop:
+            return
+        if not service.pending_marks(tenant_id):
+            time.sleep(interval)
+
+
+@text_index_cli.command('rebuild')
+@click.option('--tenant-id', type=int, required=True, help='Tenant cujo vocabulário será reajustado.')
+def rebuild_text_index(tenant_id):
+    """Reajusta o índice TF-IDF do tenant com todos os documentos atuais."""
+    from src.services.text_similarity import TextSimilarityService
+    index = TextSimilarityService().rebuild(tenant_id)
+    _print_stats({kind: len(keys) for kind, keys in index.keys.items()})
+
+
+@dedup_cli.command('backfill')
+@click.option('--tenant-id', type=int, default=None, help='Limita o preenchimento a um tenant.')
+@click.option('--chunk-size', type=int, default=1000, show_default=True)
+def backfill_dedup(tenant_id, chunk_size):
+    """Preenche as chaves dedup_* dos candidatos existentes (passo obrigatório na implantação)."""
+    tenant_ids = [tenant_id] if tenant_id is not None else [
+        row[0] for row in db.session.execute(select(Candidate.tenant_id).distinct().order_by(Candidate.tenant_id))
+    ]
+    updated = 0
+    for current in tenant_ids:
+        # Uma transação por tenant, para não manter todo o banco numa só
+        updated += CandidateDedupIndex.backfill(current, chunk_size)
+        db.session.commit()
+    _print_stats({'tenants': len(tenant_ids), 'candidates': updated})
+
+
+def register_commands(app):
+    app.cli.add_command(matches_cli)
+    app.cli.add_command(tasks_cli)
+    app.cli.add_command(cache_cli)
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(sketches_cli)
+    app.cli.add_command(funnel_cli)
+    app.cli.add_command(text_index_cli)
+    app.cli.add_command(dedup_cli)
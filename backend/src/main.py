@@ -0,0 +1,60 @@
+import importlib
+import os
+from datetime import timedelta
+from typing import Dict, Optional
+
+from flask import Flask, jsonify
+from flask_cors import CORS
+from flask_jwt_extended import JWTManager
+
+# Blueprints da API, registrados sob /api
+BLUEPRINTS = (
+    ('src.routes.ai_analytics', 'ai_analytics_bp'),
+    ('src.routes.candidates', 'candidates_bp'),
+    ('src.routes.ats_crm_integration', 'ats_crm_integration_bp'),
+    ('src.routes.job_postings', 'job_postings_bp'),
+    ('src.routes.tags', 'tags_bp'),
+    ('src.routes.notes', 'notes_bp'),
+    ('src.routes.i18n_config', 'i18n_config_bp'),
+)
+
+
+def create_app(config: Optional[Dict] = None) -> Flask:
+    """Aplicação servida pelo Gunicorn (wsgi.py) e usada pelos comandos flask.
+
+    `config` sobrepõe a configuração lida do ambiente (usado nos testes).
+    """
+    app = Flask(__name__)
+
+    # Configurações do Banco de Dados
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///recruitment.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Configurações JWT (a identidade é um dicionário com id, tenant_id e role)
+    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'super-secret-jwt-key')  # Mude para uma chave forte em produção
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+    app.config['JWT_VERIFY_SUB'] = False
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', app.config['JWT_SECRET_KEY'])
+    app.config.update(config or {})
+
+    # Importados aqui: os modelos e as rotas dependem do pacote src já configurado
+    from src.models.user import db
+    from src.utils.i18n import init_babel
+    from src.commands import register_commands
+
+    db.init_app(app)
+    JWTManager(app)
+    CORS(app)
+    init_babel(app)
+
+    for module_name, blueprint_name in BLUEPRINTS:
+        app.register_blueprint(getattr(importlib.import_module(module_name), blueprint_name), url_prefix='/api')
+
+    # flask matches/tasks/stats/sketches/funnel/text-index/dedup ...
+    register_commands(app)
+
+    @app.route('/api/health')
+    def health_check():
+        return jsonify({'status': 'ok', 'message': 'API is running!'}), 200
+
+    return app
@@ -0,0 +1,28 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from src.models.user import db
+
+class AIResult(db.Model):
+    """Resultado de uma operação pura de IA, endereçado pelo hash das entradas (ver ResultCache).
+
+    A chave inclui a versão do algoritmo, então uma entrada nunca fica
+    desatualizada: versões antigas apenas deixam de ser consultadas e saem na
+    limpeza por idade.
+    """
+    __tablename__ = 'ai_results'
+
+    key = db.Column(db.String(64), primary_key=True)  # SHA-256 de operação + versão + entradas normalizadas
+    operation = db.Column(db.String(50), nullable=False)  # compatibility, resume_analysis
+    value = db.Column(db.Text, nullable=False)  # JSON do resultado
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<AIResult {self.operation} {self.key[:12]}>'
+
+    def to_dict(self):
+        return {
+            'key': self.key,
+            'operation': self.operation,
+            'value': self.value,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
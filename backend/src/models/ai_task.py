@@ -0,0 +1,61 @@
+from flask_sqlalchemy import SQLAlchemy
+import json
+from datetime import datetime
+from src.models.user import db
+
+# Predicado das tarefas ainda na fila ou em execução (índice único parcial de unique_key)
+ACTIVE_TASK_PREDICATE = db.text("status IN ('queued', 'running')")
+
+class AITask(db.Model):
+    """Operação de IA enfileirada para execução fora da requisição (ver TaskQueue).
+
+    A fila vive no próprio banco: um worker (flask tasks worker) reivindica a
+    tarefa, grava o resultado e o cliente consulta pelo ID. Enquanto está em
+    execução a tarefa fica reservada até locked_until; se o worker morrer, ela
+    volta a ser reivindicável depois desse prazo.
+    """
+    __tablename__ = 'ai_tasks'
+
+    id = db.Column(db.String(32), primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False, index=True)
+    operation = db.Column(db.String(50), nullable=False)  # recommend_candidates, detect_duplicates, analyze_candidate, bulk_analyze
+    unique_key = db.Column(db.String(100), nullable=True)  # No máximo uma tarefa ativa por chave (ver TaskQueue.enqueue_unique)
+    payload = db.Column(db.Text, nullable=False)  # JSON com os parâmetros da operação
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Próxima tentativa permitida
+    locked_by = db.Column(db.String(100), nullable=True)  # Worker que reivindicou a tarefa
+    locked_until = db.Column(db.DateTime, nullable=True)  # Fim do prazo de visibilidade
+    progress = db.Column(db.Text, nullable=True)  # JSON com o progresso informado pelo handler (report_progress)
+    result = db.Column(db.Text, nullable=True)  # JSON da resposta da operação
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)  # Resultado removido depois desta data
+
+    __table_args__ = (
+        # Busca das próximas tarefas reivindicáveis pelo worker
+        db.Index('ix_ai_tasks_claim', 'status', 'available_at'),
+        db.Index('uq_ai_tasks_active_unique_key', 'unique_key', unique=True,
+                 sqlite_where=ACTIVE_TASK_PREDICATE, postgresql_where=ACTIVE_TASK_PREDICATE),
+    )
+
+    def __repr__(self):
+        return f'<AITask {self.id} {self.operation} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'task_id': self.id,
+            'operation': self.operation,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'progress': json.loads(self.progress) if self.progress else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
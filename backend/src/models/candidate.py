@@ -1,9 +1,17 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import event
 from src.models.user import db
+from src.utils.normalization import normalize_email, normalize_linkedin, normalize_name, normalize_phone
 
 class Candidate(db.Model):
     __tablename__ = 'candidates'
+    __table_args__ = (
+        db.Index('ix_candidates_tenant_dedup_email', 'tenant_id', 'dedup_email'),
+        db.Index('ix_candidates_tenant_dedup_phone', 'tenant_id', 'dedup_phone'),
+        db.Index('ix_candidates_tenant_dedup_linkedin', 'tenant_id', 'dedup_linkedin'),
+        db.Index('ix_candidates_tenant_dedup_name', 'tenant_id', 'dedup_name'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False)
@@ -12,7 +20,7 @@ class Candidate(db.Model):
     email = db.Column(db.String(120), nullable=True)
     phone = db.Column(db.String(20), nullable=True)
     linkedin_url = db.Column(db.String(500), nullable=True)
-    resume_text = db.Column(db.Text, nullable=True)
+    resume_text = db.deferred(db.Column(db.Text, nullable=True))  # carregado só quando lido ou pedido com undefer/load_only
     resume_file_url = db.Column(db.String(500), nullable=True)
     skills = db.Column(db.Text, nullable=True)  # JSON string com habilidades
     experience_years = db.Column(db.Integer, nullable=True)
@@ -26,14 +34,29 @@ class Candidate(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Chaves normalizadas para deduplicação (mantidas pelos eventos abaixo)
+    dedup_email = db.Column(db.String(120), nullable=True)
+    dedup_phone = db.Column(db.String(20), nullable=True)
+    dedup_linkedin = db.Column(db.String(500), nullable=True)
+    dedup_name = db.Column(db.String(201), nullable=True)
+    
     # Relacionamentos
     notes = db.relationship('Note', backref='candidate', lazy=True, cascade='all, delete-orphan')
     candidate_tags = db.relationship('CandidateTag', backref='candidate', lazy=True, cascade='all, delete-orphan')
     job_matches = db.relationship('CandidateJobMatch', backref='candidate', lazy=True, cascade='all, delete-orphan')
+    features = db.relationship('CandidateFeatures', backref='candidate', uselist=False, lazy=True, cascade='all, delete-orphan')
+    skill_postings = db.relationship('CandidateSkill', backref='candidate', lazy=True, cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<Candidate {self.first_name} {self.last_name}>'
     
+    def refresh_dedup_keys(self):
+        """Recalcula as chaves de deduplicação a partir dos campos brutos (vazio vira NULL)."""
+        self.dedup_email = normalize_email(self.email) or None
+        self.dedup_phone = normalize_phone(self.phone) or None
+        self.dedup_linkedin = normalize_linkedin(self.linkedin_url) or None
+        self.dedup_name = normalize_name(self.first_name, self.last_name) or None
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -58,3 +81,8 @@ class Candidate(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+
+@event.listens_for(Candidate, 'before_insert')
+@event.listens_for(Candidate, 'before_update')
+def _sync_dedup_keys(mapper, connection, candidate):
+    candidate.refresh_dedup_keys()
@@ -0,0 +1,31 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+import json
+from src.models.user import db
+
+class CandidateFeatures(db.Model):
+    __tablename__ = 'candidate_features'
+    
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id'), primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False, index=True)
+    skills = db.Column(db.Text, nullable=True)  # JSON com as habilidades extraídas de skills + currículo
+    experience_years = db.Column(db.Integer, nullable=True)  # Anos de experiência inferidos do currículo
+    certifications = db.Column(db.Text, nullable=True)  # JSON com as certificações encontradas
+    education_keywords = db.Column(db.Text, nullable=True)  # JSON com as palavras-chave de educação
+    feature_version = db.Column(db.String(32), nullable=False)  # Versão do extrator que gerou os dados
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CandidateFeatures candidate_id={self.candidate_id} version={self.feature_version}>'
+    
+    def to_dict(self):
+        return {
+            'candidate_id': self.candidate_id,
+            'tenant_id': self.tenant_id,
+            'skills': json.loads(self.skills) if self.skills else [],
+            'experience_years': self.experience_years,
+            'certifications': json.loads(self.certifications) if self.certifications else [],
+            'education_keywords': json.loads(self.education_keywords) if self.education_keywords else [],
+            'feature_version': self.feature_version,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
@@ -6,10 +6,11 @@ class CandidateJobMatch(db.Model):
     __tablename__ = 'candidate_job_matches'
     
     id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False, index=True)
     candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id'), nullable=False)
     job_posting_id = db.Column(db.Integer, db.ForeignKey('job_postings.id'), nullable=False)
-    match_score = db.Column(db.Float, nullable=False)  # Pontuação de 0.0 a 1.0
-    ai_analysis = db.Column(db.Text, nullable=True)  # Análise detalhada da IA
+    match_score = db.Column(db.Float, nullable=False)  # Score geral de compatibilidade, de 0 a 100
+    ai_analysis = db.Column(db.Text, nullable=True)  # JSON com o detalhamento do score por dimensão
     status = db.Column(db.String(50), nullable=False, default='pending')  # pending, reviewed, approved, rejected
     reviewed_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     reviewed_at = db.Column(db.DateTime, nullable=True)
@@ -19,8 +20,12 @@ class CandidateJobMatch(db.Model):
     # Relacionamento com o usuário que revisou
     reviewer = db.relationship('User', foreign_keys=[reviewed_by], backref='reviewed_matches')
     
-    # Índice único para evitar duplicatas
-    __table_args__ = (db.UniqueConstraint('candidate_id', 'job_posting_id', name='unique_candidate_job_match'),)
+    __table_args__ = (
+        # Índice único para evitar duplicatas
+        db.UniqueConstraint('candidate_id', 'job_posting_id', name='unique_candidate_job_match'),
+        # Ranking por vaga (leaderboard) percorrido com cursores por chave
+        db.Index('ix_candidate_job_matches_leaderboard', 'job_posting_id', match_score.desc(), 'candidate_id'),
+    )
     
     def __repr__(self):
         return f'<CandidateJobMatch candidate_id={self.candidate_id} job_id={self.job_posting_id} score={self.match_score}>'
@@ -28,6 +33,7 @@ class CandidateJobMatch(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
+            'tenant_id': self.tenant_id,
             'candidate_id': self.candidate_id,
             'job_posting_id': self.job_posting_id,
             'match_score': self.match_score,
@@ -0,0 +1,26 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from src.models.user import db
+
+class CandidateSkill(db.Model):
+    """Índice invertido habilidade -> candidatos, mantido por tenant."""
+    __tablename__ = 'candidate_skills'
+    
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id'), primary_key=True)
+    skill = db.Column(db.String(100), primary_key=True)  # Nome canônico da taxonomia de habilidades
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Lista de candidatos por habilidade dentro do tenant
+    __table_args__ = (db.Index('ix_candidate_skills_tenant_skill', 'tenant_id', 'skill', 'candidate_id'),)
+    
+    def __repr__(self):
+        return f'<CandidateSkill candidate_id={self.candidate_id} skill={self.skill}>'
+    
+    def to_dict(self):
+        return {
+            'candidate_id': self.candidate_id,
+            'skill': self.skill,
+            'tenant_id': self.tenant_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
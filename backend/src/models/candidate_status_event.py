@@ -0,0 +1,47 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from src.models.user import db
+
+class CandidateStatusEvent(db.Model):
+    """Mudança de status de um candidato, registrada junto com a escrita (ver FunnelService).
+
+    Guarda o tempo que o candidato passou no status anterior. Sem chaves
+    estrangeiras para candidato e vaga: o histórico do funil sobrevive à
+    exclusão dos registros.
+    """
+    __tablename__ = 'candidate_status_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False)
+    candidate_id = db.Column(db.Integer, nullable=False)
+    job_posting_id = db.Column(db.Integer, nullable=True)  # Vaga em que a mudança aconteceu, se informada
+    source = db.Column(db.String(100), nullable=True)  # Origem do candidato no momento da mudança
+    from_status = db.Column(db.String(50), nullable=True)  # Nulo na criação do candidato
+    to_status = db.Column(db.String(50), nullable=False)
+    seconds_in_previous = db.Column(db.Integer, nullable=True)  # Tempo no status anterior
+    changed_by = db.Column(db.Integer, nullable=True)  # Usuário que fez a mudança
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Última mudança do candidato (início do status atual)
+        db.Index('ix_candidate_status_events_candidate', 'candidate_id', 'created_at'),
+        # Reconstrução das agregações diárias do tenant
+        db.Index('ix_candidate_status_events_tenant_created', 'tenant_id', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<CandidateStatusEvent {self.candidate_id} {self.from_status}->{self.to_status}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tenant_id': self.tenant_id,
+            'candidate_id': self.candidate_id,
+            'job_posting_id': self.job_posting_id,
+            'source': self.source,
+            'from_status': self.from_status,
+            'to_status': self.to_status,
+            'seconds_in_previous': self.seconds_in_previous,
+            'changed_by': self.changed_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
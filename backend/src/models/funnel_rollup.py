@@ -0,0 +1,79 @@
+from flask_sqlalchemy import SQLAlchemy
+from typing import Dict, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models.user import db
+
+# Dialetos com INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert
+}
+
+class FunnelDailyRollup(db.Model):
+    """Contagens diárias do funil por tenant, origem, vaga e etapa (status).
+
+    Incrementada na mesma transação de cada CandidateStatusEvent e reconstruída
+    a partir dos eventos por flask funnel rollup. O endpoint do funil lê apenas
+    esta tabela. Origem vazia e vaga 0 representam "não informado", para que
+    as colunas façam parte da chave primária.
+    """
+    __tablename__ = 'funnel_daily_rollups'
+
+    tenant_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    day = db.Column(db.Date, primary_key=True)
+    source = db.Column(db.String(100), primary_key=True, default='')
+    job_posting_id = db.Column(db.Integer, primary_key=True, autoincrement=False, default=0)
+    stage = db.Column(db.String(50), primary_key=True)
+    entered = db.Column(db.BigInteger, nullable=False, default=0)  # Candidatos que entraram na etapa no dia
+    exited = db.Column(db.BigInteger, nullable=False, default=0)  # Candidatos que saíram da etapa no dia
+    exit_seconds = db.Column(db.BigInteger, nullable=False, default=0)  # Tempo na etapa somado de quem saiu
+
+    COUNTERS = ('entered', 'exited', 'exit_seconds')
+
+    def __repr__(self):
+        return f'<FunnelDailyRollup {self.tenant_id} {self.day} {self.stage}>'
+
+    def to_dict(self):
+        return {
+            'tenant_id': self.tenant_id,
+            'day': self.day.isoformat() if self.day else None,
+            'source': self.source,
+            'job_posting_id': self.job_posting_id,
+            'stage': self.stage,
+            'entered': self.entered,
+            'exited': self.exited,
+            'exit_seconds': self.exit_seconds
+        }
+
+    @classmethod
+    def increment(cls, connection, deltas: Dict[Tuple, Dict[str, int]]) -> None:
+        """Soma os contadores por (tenant_id, dia, origem, vaga, etapa), na transação da conexão."""
+        rows = [
+            {'tenant_id': tenant_id, 'day': day, 'source': source, 'job_posting_id': job_posting_id, 'stage': stage,
+             **{counter: values.get(counter, 0) for counter in cls.COUNTERS}}
+            for (tenant_id, day, source, job_posting_id, stage), values in deltas.items()
+        ]
+        if not rows:
+            return
+
+        table = cls.__table__
+        insert = UPSERT_DIALECTS.get(connection.dialect.name)
+        if insert is not None:
+            statement = insert(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=['tenant_id', 'day', 'source', 'job_posting_id', 'stage'],
+                set_={counter: table.c[counter] + statement.excluded[counter] for counter in cls.COUNTERS}
+            )
+            connection.execute(statement, rows)
+            return
+
+        for row in rows:
+            updated = connection.execute(table.update().where(
+                table.c.tenant_id == row['tenant_id'],
+                table.c.day == row['day'],
+                table.c.source == row['source'],
+                table.c.job_posting_id == row['job_posting_id'],
+                table.c.stage == row['stage']
+            ).values({counter: table.c[counter] + row[counter] for counter in cls.COUNTERS})).rowcount
+            if not updated:
+                connection.execute(table.insert(), row)
@@ -0,0 +1,73 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.models.candidate import Candidate
+from src.models.candidate_features import CandidateFeatures
+from src.models.job_posting import JobPosting
+
+# Campos que alteram o score de compatibilidade
+CANDIDATE_SCORING_FIELDS = ('skills', 'resume_text', 'experience_years', 'location', 'salary_expectation')
+JOB_SCORING_FIELDS = ('description', 'requirements', 'experience_level', 'location',
+                      'remote_work', 'salary_min', 'salary_max', 'status')
+
+class MatchDirtyMark(db.Model):
+    """Candidato ou vaga cujos pares da matriz de compatibilidade precisam ser recalculados.
+
+    Preenchida automaticamente a cada flush (ver _mark_dirty_matches) e consumida
+    pelo MatchMaterializer. Sem chaves estrangeiras: a marca pode sobreviver à
+    exclusão do candidato ou da vaga e é simplesmente ignorada.
+    """
+    __tablename__ = 'match_dirty_marks'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, nullable=False, index=True)
+    candidate_id = db.Column(db.Integer, nullable=True)  # Recalcular o candidato contra as vagas ativas
+    job_posting_id = db.Column(db.Integer, nullable=True)  # Recalcular a vaga contra todos os candidatos
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<MatchDirtyMark candidate_id={self.candidate_id} job_id={self.job_posting_id}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tenant_id': self.tenant_id,
+            'candidate_id': self.candidate_id,
+            'job_posting_id': self.job_posting_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+def _changed(instance, fields) -> bool:
+    state = inspect(instance)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_dirty_matches(session, flush_context):
+    """Registra os candidatos e vagas alterados neste flush.
+
+    Roda depois do flush para que registros novos já tenham ID; o histórico dos
+    atributos e as listas new/dirty ainda refletem o estado anterior ao flush.
+    """
+    marks = set()
+    for instance in list(session.new) + list(session.dirty):
+        is_new = instance in session.new
+        if isinstance(instance, Candidate):
+            if is_new or _changed(instance, CANDIDATE_SCORING_FIELDS):
+                marks.add((instance.tenant_id, instance.id, None))
+        elif isinstance(instance, CandidateFeatures):
+            if is_new or _changed(instance, ('skills', 'experience_years', 'feature_version')):
+                marks.add((instance.tenant_id, instance.candidate_id, None))
+        elif isinstance(instance, JobPosting):
+            if is_new or _changed(instance, JOB_SCORING_FIELDS):
+                marks.add((instance.tenant_id, None, instance.id))
+
+    if marks:
+        session.connection().execute(MatchDirtyMark.__table__.insert(), [
+            {'tenant_id': tenant_id, 'candidate_id': candidate_id, 'job_posting_id': job_id,
+             'created_at': datetime.utcnow()}
+            for tenant_id, candidate_id, job_id in marks
+        ])
@@ -2,10 +2,21 @@
 from .user import User
 from .tenant import Tenant
 from .candidate import Candidate
+from .candidate_features import CandidateFeatures
+from .candidate_skill import CandidateSkill
 from .job_posting import JobPosting
 from .note import Note
 from .tag import Tag
 from .candidate_job_match import CandidateJobMatch
+from .match_dirty_mark import MatchDirtyMark
+from .text_index_dirty_mark import TextIndexDirtyMark
+from .tenant_stat import TenantStat
+from .response_cache_generation import ResponseCacheGeneration
+from .candidate_status_event import CandidateStatusEvent
+from .funnel_rollup import FunnelDailyRollup
+from .tenant_sketch import TenantSketch, TenantSketchDelta
+from .ai_task import AITask
+from .ai_result import AIResult
 from .audit_log import AuditLog
 
 # Importar db do main para disponibilizar aqui
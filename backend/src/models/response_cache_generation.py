@@ -0,0 +1,125 @@
+from flask_sqlalchemy import SQLAlchemy
+import logging
+from typing import Iterable, Set, Tuple
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.models.candidate import Candidate
+from src.models.candidate_features import CandidateFeatures
+from src.models.candidate_job_match import CandidateJobMatch
+from src.models.candidate_skill import CandidateSkill
+from src.models.candidate_status_event import CandidateStatusEvent
+from src.models.job_posting import JobPosting
+from src.models.tag import Tag, CandidateTag
+from src.models.tenant_stat import UPSERT_DIALECTS
+
+logger = logging.getLogger(__name__)
+
+# Escopo do cache de respostas alterado pela escrita de cada modelo
+MODEL_SCOPES = (
+    (Candidate, 'candidates'),
+    (CandidateSkill, 'candidates'),
+    (CandidateFeatures, 'candidates'),
+    (CandidateStatusEvent, 'candidates'),
+    (Tag, 'tags'),
+    (JobPosting, 'job_postings'),
+    (CandidateJobMatch, 'matches')
+)
+
+class ResponseCacheGeneration(db.Model):
+    """Geração de um escopo do cache de respostas por tenant (ver ResponseCache).
+
+    Incrementada depois do commit de qualquer transação que altere o escopo, em
+    qualquer processo (rotas, TaskWorker, comandos flask): as escritas do ORM
+    são detectadas no flush e as feitas com Core se registram com mark. Como a
+    geração fica no banco, todos os workers e hosts deixam de servir as
+    respostas guardadas com a geração anterior.
+    """
+    __tablename__ = 'response_cache_generations'
+
+    tenant_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    scope = db.Column(db.String(30), primary_key=True)  # candidates, tags, job_postings, matches
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ResponseCacheGeneration {self.tenant_id} {self.scope}={self.value}>'
+
+    @staticmethod
+    def mark(session, tenant_id: int, *scopes: str) -> None:
+        """Registra na sessão escopos alterados por escritas Core; incrementados no commit."""
+        pending = session.info.setdefault('response_cache_scopes', set())
+        pending.update((tenant_id, scope) for scope in scopes)
+
+    @classmethod
+    def read(cls, connection, tenant_id: int, scopes: Tuple[str, ...]) -> Tuple[int, ...]:
+        table = cls.__table__
+        values = dict(connection.execute(
+            select(table.c.scope, table.c.value).where(table.c.tenant_id == tenant_id, table.c.scope.in_(scopes))
+        ).all())
+        return tuple(values.get(scope, 0) for scope in scopes)
+
+    @classmethod
+    def bump(cls, connection, scopes: Iterable[Tuple[int, str]]) -> None:
+        """Incrementa as gerações (tenant_id, escopo), na transação da conexão."""
+        rows = [{'tenant_id': tenant_id, 'scope': scope, 'value': 1} for tenant_id, scope in sorted(scopes)]
+        if not rows:
+            return
+
+        insert = UPSERT_DIALECTS.get(connection.dialect.name)
+        if insert is not None:
+            statement = insert(cls.__table__)
+            statement = statement.on_conflict_do_update(
+                index_elements=['tenant_id', 'scope'],
+                set_={'value': cls.__table__.c.value + 1}
+            )
+            connection.execute(statement, rows)
+            return
+
+        table = cls.__table__
+        for row in rows:
+            updated = connection.execute(table.update().where(
+                table.c.tenant_id == row['tenant_id'],
+                table.c.scope == row['scope']
+            ).values(value=table.c.value + 1)).rowcount
+            if not updated:
+                connection.execute(table.insert(), row)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_scopes(session, flush_context):
+    """Acumula na sessão os escopos (tenant, escopo) alterados pelos objetos deste flush."""
+    changed: Set[Tuple[int, str]] = set()
+    tag_ids = set()
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(instance, CandidateTag):
+            # Sem tenant_id: resolvido pela tag
+            tag_ids.add(instance.tag_id)
+            continue
+        for model, scope in MODEL_SCOPES:
+            if isinstance(instance, model):
+                changed.add((instance.tenant_id, scope))
+                break
+    if tag_ids:
+        rows = session.connection().execute(select(Tag.tenant_id).where(Tag.id.in_(tag_ids)).distinct())
+        changed.update((tenant_id, 'tags') for (tenant_id,) in rows)
+    if changed:
+        session.info.setdefault('response_cache_scopes', set()).update(changed)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_changed_scopes(session):
+    """Incrementa as gerações dos escopos alterados, numa transação própria depois do commit."""
+    scopes = session.info.pop('response_cache_scopes', None)
+    if not scopes:
+        return
+    try:
+        with db.engine.begin() as connection:
+            ResponseCacheGeneration.bump(connection, scopes)
+    except Exception:
+        # Os dados já foram confirmados: as respostas antigas expiram pelo TTL
+        logger.exception('Falha ao invalidar o cache de respostas: %s', sorted(scopes))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_scopes(session):
+    session.info.pop('response_cache_scopes', None)
@@ -0,0 +1,229 @@
+from flask_sqlalchemy import SQLAlchemy
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.models.candidate import Candidate
+from src.models.candidate_skill import CandidateSkill
+from src.utils.sketches import CountMinSketch, TDigest
+
+class TenantSketch(db.Model):
+    """Sketch de streaming do tenant, gravado em binário compacto (zlib).
+
+    'skills': Count-Min com heavy hitters sobre o índice candidate_skills.
+    'salary_expectation' e 'experience_years': t-digest dos valores informados.
+    As escritas de candidatos não regravam os sketches: gravam um delta em
+    tenant_sketch_deltas na própria transação (ver record), incorporado em
+    segundo plano por flask sketches fold (ver apply). O t-digest não aceita
+    remoções: valores alterados ou excluídos contam em `stale` até a próxima
+    reconstrução (flask sketches rebuild), que também preenche rebuilt_at.
+    Antes da primeira reconstrução os sketches não são usados nem recebem
+    deltas.
+    """
+    __tablename__ = 'tenant_sketches'
+
+    tenant_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(30), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    stale = db.Column(db.BigInteger, nullable=False, default=0)  # Valores removidos ainda presentes no t-digest
+    rebuilt_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    SKILLS = 'skills'
+    # Campos numéricos do candidato acompanhados por t-digest
+    NUMERIC_FIELDS = ('salary_expectation', 'experience_years')
+
+    def __repr__(self):
+        return f'<TenantSketch {self.tenant_id} {self.name}>'
+
+    @classmethod
+    def new_update(cls) -> Dict:
+        """Atualização vazia de um tenant, no formato aceito por apply."""
+        return {'skills': Counter(), 'stale': Counter(), **{field: [] for field in cls.NUMERIC_FIELDS}}
+
+    @classmethod
+    def empty(cls, name: str):
+        return CountMinSketch() if name == cls.SKILLS else TDigest()
+
+    @classmethod
+    def load(cls, name: str, data: bytes):
+        return CountMinSketch.from_bytes(data) if name == cls.SKILLS else TDigest.from_bytes(data)
+
+    @classmethod
+    def changed_names(cls, update: Dict) -> List[str]:
+        """Sketches alterados por uma atualização."""
+        names = [cls.SKILLS] if any(update['skills'].values()) else []
+        return names + [field for field in cls.NUMERIC_FIELDS if update[field] or update['stale'][field]]
+
+    @classmethod
+    def encode_update(cls, update: Dict) -> str:
+        return json.dumps({
+            'skills': {skill: count for skill, count in update['skills'].items() if count},
+            'stale': {field: count for field, count in update['stale'].items() if count},
+            **{field: [float(value) for value in update[field]] for field in cls.NUMERIC_FIELDS}
+        }, separators=(',', ':'))
+
+    @classmethod
+    def merge_update(cls, update: Dict, data: str) -> None:
+        """Soma a `update` um delta gravado com encode_update."""
+        delta = json.loads(data)
+        update['skills'].update(delta['skills'])
+        update['stale'].update(delta['stale'])
+        for field in cls.NUMERIC_FIELDS:
+            update[field].extend(delta[field])
+
+    @classmethod
+    def record(cls, connection, updates: Dict[int, Dict]) -> None:
+        """Grava as atualizações por tenant em tenant_sketch_deltas, na transação da conexão.
+
+        `updates[tenant_id]` tem 'skills' (Counter de deltas), as listas de
+        valores novos de cada campo numérico e 'stale' (Counter por campo). As
+        linhas do tenant são lidas com FOR SHARE: escritas concorrentes não
+        esperam umas pelas outras, mas fold e rebuild, que as travam com
+        FOR UPDATE, esperam o commit das escritas em andamento. Tenants ainda
+        não reconstruídos são ignorados: seus sketches são calculados das
+        tabelas de origem.
+        """
+        table = cls.__table__
+        now = datetime.utcnow()
+        deltas = []
+        for tenant_id, update in updates.items():
+            if not cls.changed_names(update):
+                continue
+            rebuilt = connection.execute(
+                select(table.c.rebuilt_at).where(table.c.tenant_id == tenant_id).with_for_update(read=True)
+            ).scalars().all()
+            if any(rebuilt):
+                deltas.append({'tenant_id': tenant_id, 'data': cls.encode_update(update), 'created_at': now})
+        if deltas:
+            connection.execute(TenantSketchDelta.__table__.insert(), deltas)
+
+    @classmethod
+    def apply(cls, connection, updates: Dict[int, Dict]) -> None:
+        """Incorpora aos sketches as atualizações por tenant, na transação da conexão.
+
+        Usado por TenantSketchService.fold com os deltas acumulados. As linhas
+        são lidas com FOR UPDATE e regravadas uma vez por lote de deltas.
+        """
+        table = cls.__table__
+        now = datetime.utcnow()
+        for tenant_id, update in updates.items():
+            names = cls.changed_names(update)
+            if not names:
+                continue
+
+            stored = {
+                name: (data, stale) for name, data, stale in connection.execute(
+                    select(table.c.name, table.c.data, table.c.stale)
+                    .where(table.c.tenant_id == tenant_id, table.c.name.in_(names))
+                    .with_for_update()
+                )
+            }
+            for name in names:
+                data, stale = stored.get(name, (None, 0))
+                sketch = cls.load(name, data) if data is not None else cls.empty(name)
+                if name == cls.SKILLS:
+                    for skill, count in update['skills'].items():
+                        sketch.add(skill, count)
+                else:
+                    sketch.update(update[name])
+                    stale += update['stale'][name]
+
+                values = {'data': sketch.to_bytes(), 'stale': stale, 'updated_at': now}
+                if name in stored:
+                    connection.execute(
+                        table.update().where(table.c.tenant_id == tenant_id, table.c.name == name).values(values)
+                    )
+                else:
+                    connection.execute(table.insert().values(tenant_id=tenant_id, name=name, **values))
+
+
+class TenantSketchDelta(db.Model):
+    """Atualização dos sketches de um tenant ainda não incorporada a tenant_sketches.
+
+    Gravada por TenantSketch.record e consumida por TenantSketchService.fold,
+    que apaga os deltas incorporados.
+    """
+    __tablename__ = 'tenant_sketch_deltas'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, nullable=False, index=True)
+    data = db.Column(db.Text, nullable=False)  # JSON gerado por TenantSketch.encode_update
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<TenantSketchDelta {self.id} tenant={self.tenant_id}>'
+
+
+def pending_update(session, tenant_id: int) -> Dict:
+    """Atualização acumulada na sessão para o tenant até o fim do flush."""
+    updates = session.info.setdefault('tenant_sketch_updates', {})
+    if tenant_id not in updates:
+        updates[tenant_id] = TenantSketch.new_update()
+    return updates[tenant_id]
+
+
+def _old_value(instance, field):
+    """Valor anterior ao flush do atributo (o atual se não mudou)."""
+    history = inspect(instance).attrs[field].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else getattr(instance, field)
+
+
+def _candidate_inserted(mapper, connection, target):
+    update = pending_update(inspect(target).session, target.tenant_id)
+    for field in TenantSketch.NUMERIC_FIELDS:
+        if getattr(target, field) is not None:
+            update[field].append(getattr(target, field))
+
+
+def _candidate_updated(mapper, connection, target):
+    update = None
+    for field in TenantSketch.NUMERIC_FIELDS:
+        history = inspect(target).attrs[field].history
+        if not history.added:
+            continue
+        old = history.deleted[0] if history.deleted else None
+        new = history.added[0]
+        if old == new:
+            continue
+        update = update or pending_update(inspect(target).session, target.tenant_id)
+        if old is not None:
+            update['stale'][field] += 1
+        if new is not None:
+            update[field].append(new)
+
+
+def _candidate_deleted(mapper, connection, target):
+    update = pending_update(inspect(target).session, target.tenant_id)
+    for field in TenantSketch.NUMERIC_FIELDS:
+        if _old_value(target, field) is not None:
+            update['stale'][field] += 1
+
+
+def _skill_changed(target, sign: int) -> None:
+    skill = target.skill if sign > 0 else _old_value(target, 'skill')
+    pending_update(inspect(target).session, target.tenant_id)['skills'][skill] += sign
+
+
+event.listen(Candidate, 'after_insert', _candidate_inserted)
+event.listen(Candidate, 'after_update', _candidate_updated)
+event.listen(Candidate, 'after_delete', _candidate_deleted)
+event.listen(CandidateSkill, 'after_insert', lambda mapper, connection, target: _skill_changed(target, 1))
+event.listen(CandidateSkill, 'after_delete', lambda mapper, connection, target: _skill_changed(target, -1))
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_tenant_sketches(session, flush_context):
+    """Grava na transação do flush os deltas acumulados pelas escritas do ORM.
+
+    CandidateFeatureStore.store_many, que reescreve candidate_skills com Core,
+    chama TenantSketch.record diretamente.
+    """
+    updates = session.info.pop('tenant_sketch_updates', None)
+    if updates:
+        TenantSketch.record(session.connection(), updates)
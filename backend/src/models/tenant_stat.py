@@ -0,0 +1,173 @@
+from flask_sqlalchemy import SQLAlchemy
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.models.candidate import Candidate
+from src.models.candidate_job_match import CandidateJobMatch
+from src.models.candidate_skill import CandidateSkill
+from src.models.job_posting import JobPosting
+
+# Dialetos com INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert
+}
+
+class TenantStat(db.Model):
+    """Contador agregado do tenant, atualizado na mesma transação das escritas.
+
+    Uma linha por (tenant, métrica, chave): totais ('total': candidates, jobs,
+    matches), contagem por status ('candidate_status', 'job_status'), histograma
+    de compatibilidade ('score_bucket') e frequência de habilidades ('skill').
+    Os incrementos são somas atômicas no banco (ver increment), então escritas
+    concorrentes não se perdem. A linha 'meta'/'reconciled_at' indica que o
+    tenant já foi recalculado a partir das tabelas de origem (TenantStatsService);
+    sem ela os contadores ainda não são confiáveis.
+    """
+    __tablename__ = 'tenant_stats'
+
+    tenant_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    metric = db.Column(db.String(30), primary_key=True)
+    key = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    # Faixas do histograma de compatibilidade: (rótulo, score mínimo), da maior para a menor
+    SCORE_BUCKETS = (
+        ('90-100', 90),
+        ('80-89', 80),
+        ('70-79', 70),
+        ('60-69', 60),
+        ('50-59', 50),
+        ('0-49', None)
+    )
+
+    def __repr__(self):
+        return f'<TenantStat {self.tenant_id} {self.metric}:{self.key}={self.value}>'
+
+    def to_dict(self):
+        return {
+            'tenant_id': self.tenant_id,
+            'metric': self.metric,
+            'key': self.key,
+            'value': self.value
+        }
+
+    @classmethod
+    def bucket_for(cls, score: Optional[float]) -> str:
+        """Faixa do histograma do score (nulo conta como zero)."""
+        score = score or 0
+        for label, minimum in cls.SCORE_BUCKETS:
+            if minimum is None or score >= minimum:
+                return label
+
+    @classmethod
+    def increment(cls, connection, deltas: Dict[Tuple[int, str, str], int]) -> None:
+        """Soma os deltas (tenant_id, métrica, chave) -> valor nos contadores, na transação da conexão."""
+        rows = [
+            {'tenant_id': tenant_id, 'metric': metric, 'key': key, 'value': value}
+            for (tenant_id, metric, key), value in deltas.items() if value
+        ]
+        if not rows:
+            return
+
+        insert = UPSERT_DIALECTS.get(connection.dialect.name)
+        if insert is not None:
+            statement = insert(cls.__table__)
+            statement = statement.on_conflict_do_update(
+                index_elements=['tenant_id', 'metric', 'key'],
+                set_={'value': cls.__table__.c.value + statement.excluded.value}
+            )
+            connection.execute(statement, rows)
+            return
+
+        table = cls.__table__
+        for row in rows:
+            updated = connection.execute(table.update().where(
+                table.c.tenant_id == row['tenant_id'],
+                table.c.metric == row['metric'],
+                table.c.key == row['key']
+            ).values(value=table.c.value + row['value'])).rowcount
+            if not updated:
+                connection.execute(table.insert(), row)
+
+
+def _old_value(instance, field):
+    """Valor anterior ao flush do atributo (o atual se não mudou)."""
+    history = inspect(instance).attrs[field].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else getattr(instance, field)
+
+
+def _changed_value(instance, field):
+    """(anterior, novo) se o atributo mudou neste flush e o valor anterior era conhecido."""
+    history = inspect(instance).attrs[field].history
+    if history.added and history.deleted:
+        return history.deleted[0], history.added[0]
+    return None
+
+
+def _pending_deltas(instance):
+    """Deltas acumulados na sessão do registro até o fim do flush."""
+    return inspect(instance).session.info.setdefault('tenant_stat_deltas', defaultdict(int))
+
+
+def _count_row(instance, sign: int) -> None:
+    """Conta um registro inserido (sign = 1) ou excluído (sign = -1)."""
+    deltas = _pending_deltas(instance)
+
+    def value(field):
+        # Na exclusão vale o valor anterior ao flush
+        return getattr(instance, field) if sign > 0 else _old_value(instance, field)
+
+    if isinstance(instance, Candidate):
+        deltas[(instance.tenant_id, 'total', 'candidates')] += sign
+        deltas[(instance.tenant_id, 'candidate_status', value('status'))] += sign
+    elif isinstance(instance, JobPosting):
+        deltas[(instance.tenant_id, 'total', 'jobs')] += sign
+        deltas[(instance.tenant_id, 'job_status', value('status'))] += sign
+    elif isinstance(instance, CandidateJobMatch):
+        deltas[(instance.tenant_id, 'total', 'matches')] += sign
+        deltas[(instance.tenant_id, 'score_bucket', TenantStat.bucket_for(value('match_score')))] += sign
+    else:
+        deltas[(instance.tenant_id, 'skill', value('skill'))] += sign
+
+
+def _count_change(instance) -> None:
+    """Move o registro alterado entre as chaves de status ou de faixa de score."""
+    field = 'match_score' if isinstance(instance, CandidateJobMatch) else 'status'
+    change = _changed_value(instance, field)
+    if not change:
+        return
+    if isinstance(instance, CandidateJobMatch):
+        metric, old, new = 'score_bucket', TenantStat.bucket_for(change[0]), TenantStat.bucket_for(change[1])
+    else:
+        metric = 'candidate_status' if isinstance(instance, Candidate) else 'job_status'
+        old, new = change
+    deltas = _pending_deltas(instance)
+    deltas[(instance.tenant_id, metric, old)] -= 1
+    deltas[(instance.tenant_id, metric, new)] += 1
+
+
+# Eventos por linha: incluem exclusões em cascata e órfãos removidos de coleções
+for _model in (Candidate, JobPosting, CandidateJobMatch, CandidateSkill):
+    event.listen(_model, 'after_insert', lambda mapper, connection, target: _count_row(target, 1))
+    event.listen(_model, 'after_delete', lambda mapper, connection, target: _count_row(target, -1))
+for _model in (Candidate, JobPosting, CandidateJobMatch):
+    event.listen(_model, 'after_update', lambda mapper, connection, target: _count_change(target))
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_tenant_stats(session, flush_context):
+    """Grava na transação do flush os deltas acumulados pelas escritas do ORM.
+
+    Cobre as rotas de candidatos e vagas, as exclusões em cascata e o índice de
+    habilidades; os caminhos em lote com Core (MatchStore,
+    CandidateFeatureStore.store_many) chamam TenantStat.increment diretamente.
+    """
+    deltas = session.info.pop('tenant_stat_deltas', None)
+    if deltas:
+        TenantStat.increment(session.connection(), deltas)
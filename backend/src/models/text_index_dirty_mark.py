@@ -0,0 +1,60 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.models.candidate import Candidate
+from src.models.job_posting import JobPosting
+
+# Campos que compõem o documento TF-IDF (ver TextSimilarityService.candidate_document e job_document)
+CANDIDATE_DOCUMENT_FIELDS = ('resume_text', 'skills', 'current_position')
+JOB_DOCUMENT_FIELDS = ('title', 'description', 'requirements')
+
+class TextIndexDirtyMark(db.Model):
+    """Documento do índice TF-IDF do tenant que precisa ser atualizado ou removido.
+
+    Preenchida automaticamente a cada flush (ver _mark_dirty_documents) e
+    consumida por TextSimilarityService.process_dirty (flask text-index
+    process-dirty), fora das requisições. Sem chaves estrangeiras: a marca de um
+    documento excluído remove-o do índice.
+    """
+    __tablename__ = 'text_index_dirty_marks'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)  # candidate, job
+    doc_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<TextIndexDirtyMark {self.kind} {self.doc_id}>'
+
+
+def _changed(instance, fields) -> bool:
+    state = inspect(instance)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_dirty_documents(session, flush_context):
+    """Registra os candidatos e vagas criados, com texto alterado ou excluídos neste flush."""
+    marks = set()
+    for instance in list(session.new) + list(session.dirty):
+        is_new = instance in session.new
+        if isinstance(instance, Candidate):
+            if is_new or _changed(instance, CANDIDATE_DOCUMENT_FIELDS):
+                marks.add((instance.tenant_id, 'candidate', instance.id))
+        elif isinstance(instance, JobPosting):
+            if is_new or _changed(instance, JOB_DOCUMENT_FIELDS):
+                marks.add((instance.tenant_id, 'job', instance.id))
+    for instance in session.deleted:
+        if isinstance(instance, Candidate):
+            marks.add((instance.tenant_id, 'candidate', instance.id))
+        elif isinstance(instance, JobPosting):
+            marks.add((instance.tenant_id, 'job', instance.id))
+
+    if marks:
+        session.connection().execute(TextIndexDirtyMark.__table__.insert(), [
+            {'tenant_id': tenant_id, 'kind': kind, 'doc_id': doc_id, 'created_at': datetime.utcnow()}
+            for tenant_id, kind, doc_id in marks
+        ])
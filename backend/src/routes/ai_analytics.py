@@ -1,11 +1,52 @@
-from flask import Blueprint, request, jsonify
+from datetime import date, datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models import db, Candidate, JobPosting, CandidateJobMatch
+from sqlalchemy.orm import load_only
+from src.models import db, Candidate, JobPosting, TenantSketch
+from src.services.ai_operations import AIOperations
 from src.services.ai_service import AIService
+from src.services.dashboard import TenantDashboard
+from src.services.feature_store import CandidateFeatureStore
+from src.services.funnel import FunnelService
+from src.services.job_features import job_feature_cache
+from src.services.leaderboard import LEADERBOARD_MAX_PAGE_SIZE, Leaderboard, decode_cursor
+from src.services.match_materializer import SCORING_COLUMNS
+from src.services.match_store import MatchStore
+from src.services.result_cache import result_cache
+from src.services.reverse_matching import ReverseMatcher
+from src.services.task_queue import TaskQueue
+from src.services.tenant_sketches import TenantSketchService
+from src.services.text_similarity import TextSimilarityService
 from src.utils.auth import require_role
+from src.utils.response_cache import cached_response, response_cache
+from src.utils.timing import init_stage_timing, stage, stage_histograms
 
 ai_analytics_bp = Blueprint('ai_analytics', __name__)
-ai_service = AIService()
+init_stage_timing(ai_analytics_bp)
+ai_service = AIService(result_cache=result_cache)
+feature_store = CandidateFeatureStore(ai_service)
+text_similarity = TextSimilarityService(ai_service)
+leaderboard = Leaderboard()
+reverse_matcher = ReverseMatcher(ai_service)
+operations = AIOperations(feature_store, leaderboard)
+bulk_analysis = operations.bulk_analysis
+task_queue = TaskQueue()
+dashboard = TenantDashboard()
+funnel = FunnelService()
+sketches = TenantSketchService()
+
+def _wants_async():
+    """Se o cliente pediu execução pela fila (?async=true)."""
+    return request.args.get('async', 'false').lower() == 'true'
+
+def _enqueue(tenant_id, operation, payload):
+    """Enfileira a operação e responde 202 com o ID e os endereços de consulta."""
+    task = task_queue.enqueue(tenant_id, operation, payload)
+    return jsonify({
+        **task.to_dict(),
+        'status_url': url_for('ai_analytics.get_ai_task', task_id=task.id),
+        'result_url': url_for('ai_analytics.get_ai_task_result', task_id=task.id)
+    }), 202
 
 @ai_analytics_bp.route('/candidates/<int:candidate_id>/analyze', methods=['POST'])
 @jwt_required()
@@ -21,43 +62,107 @@ def analyze_candidate(candidate_id):
         type: integer
         required: true
         description: ID do candidato
+      - name: async
+        in: query
+        type: boolean
+        default: false
+        description: Executa pela fila de tarefas e responde 202 com o ID da tarefa
     responses:
       200:
         description: Análise do candidato
+      202:
+        description: Tarefa enfileirada
       404:
         description: Candidato não encontrado
     """
     current_user = get_jwt_identity()
     
-    candidate = Candidate.query.filter_by(
-        id=candidate_id, 
-        tenant_id=current_user['tenant_id']
-    ).first()
+    if _wants_async():
+        # Validado antes de enfileirar, para responder 404 como a chamada síncrona
+        if not db.session.query(Candidate.id).filter_by(id=candidate_id, tenant_id=current_user['tenant_id']).first():
+            return jsonify({'error': 'Candidato não encontrado'}), 404
+        return _enqueue(current_user['tenant_id'], 'analyze_candidate', {'candidate_id': candidate_id})
     
-    if not candidate:
-        return jsonify({'error': 'Candidato não encontrado'}), 404
+    try:
+        return jsonify(operations.analyze_candidate(current_user['tenant_id'], candidate_id))
+    except LookupError as error:
+        return jsonify({'error': str(error)}), 404
+
+@ai_analytics_bp.route('/candidates/bulk-analyze', methods=['POST'])
+@jwt_required()
+@require_role(['admin', 'manager'])
+def bulk_analyze_candidates():
+    """
+    Reanalisa os currículos de vários candidatos em segundo plano, pela fila de tarefas (flask tasks worker)
+    ---
+    tags:
+      - AI Analytics
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          properties:
+            candidate_ids:
+              type: array
+              items:
+                type: integer
+              description: IDs dos candidatos (omitido = todos do tenant)
+            filters:
+              type: object
+              description: Filtros opcionais (status, source, stale_only)
+    responses:
+      202:
+        description: Job enfileirado, com ID e contadores de progresso
+      400:
+        description: Parâmetros inválidos
+      409:
+        description: Já existe uma análise em massa pendente no tenant (devolvida no corpo)
+    """
+    current_user = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
     
-    # Preparar dados do candidato
-    candidate_data = {
-        'first_name': candidate.first_name,
-        'last_name': candidate.last_name,
-        'email': candidate.email,
-        'skills': candidate.skills,
-        'resume_text': candidate.resume_text,
-        'experience_years': candidate.experience_years,
-        'location': candidate.location,
-        'salary_expectation': candidate.salary_expectation
-    }
+    candidate_ids = data.get('candidate_ids')
+    if candidate_ids is not None and (
+        not isinstance(candidate_ids, list) or not all(isinstance(item, int) for item in candidate_ids)
+    ):
+        return jsonify({'error': 'candidate_ids deve ser uma lista de inteiros'}), 400
     
-    # Analisar candidato
-    analysis = ai_service.analyze_resume_text(candidate.resume_text or '')
-    enriched_data = ai_service.enrich_candidate_data(candidate_data)
+    filters = data.get('filters') or {}
+    if not isinstance(filters, dict):
+        return jsonify({'error': 'filters deve ser um objeto'}), 400
     
-    return jsonify({
-        'candidate_id': candidate_id,
-        'analysis': analysis,
-        'enriched_data': enriched_data
-    })
+    job, created = bulk_analysis.submit(current_user['tenant_id'], candidate_ids, filters)
+    
+    return jsonify(bulk_analysis.describe(job)), 202 if created else 409
+
+@ai_analytics_bp.route('/analysis-jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_bulk_analysis_job(job_id):
+    """
+    Consulta o progresso de uma análise em massa
+    ---
+    tags:
+      - AI Analytics
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+        description: ID do job retornado por /candidates/bulk-analyze
+    responses:
+      200:
+        description: Status e contadores do job
+      404:
+        description: Job não encontrado
+    """
+    current_user = get_jwt_identity()
+    job = bulk_analysis.get(job_id, current_user['tenant_id'])
+    
+    if not job:
+        return jsonify({'error': 'Job não encontrado'}), 404
+    
+    return jsonify(bulk_analysis.describe(job))
 
 @ai_analytics_bp.route('/jobs/<int:job_id>/recommend-candidates', methods=['GET'])
 @jwt_required()
@@ -77,32 +182,132 @@ def recommend_candidates_for_job(job_id):
         in: query
         type: integer
         default: 10
-        description: Número máximo de candidatos recomendados
+        description: Número máximo de candidatos recomendados (reduzido a LEADERBOARD_MAX_PAGE_SIZE)
+      - name: cursor
+        in: query
+        type: string
+        description: Cursor opaco da próxima página (next_cursor da resposta anterior)
+      - name: min_score
+        in: query
+        type: number
+        description: Score mínimo de compatibilidade (0-100)
+      - name: status
+        in: query
+        type: string
+        enum: [pending, reviewed, approved, rejected]
+        description: Status do par candidato-vaga
+      - name: candidate_status
+        in: query
+        type: string
+        enum: [new, contacted, interviewed, hired, rejected]
+        description: Status do candidato
+      - name: async
+        in: query
+        type: boolean
+        default: false
+        description: Executa pela fila de tarefas e responde 202 com o ID da tarefa
     responses:
       200:
-        description: Lista de candidatos recomendados
+        description: Página do ranking de candidatos e cursor da próxima; stale indica ranking ainda em atualização
+      202:
+        description: Tarefa enfileirada
+      400:
+        description: limit menor que 1, cursor inválido ou cursor para um ranking sem paginação
       404:
         description: Vaga não encontrada
     """
     current_user = get_jwt_identity()
     limit = request.args.get('limit', 10, type=int)
+    cursor = request.args.get('cursor')
+    min_score = request.args.get('min_score', type=float)
+    status = request.args.get('status')
+    candidate_status = request.args.get('candidate_status')
+    
+    if limit < 1:
+        return jsonify({'error': 'limit deve ser maior que zero'}), 400
+    limit = min(limit, LEADERBOARD_MAX_PAGE_SIZE)
+    
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Cursor inválido'}), 400
+    
+    params = {
+        'job_id': job_id,
+        'limit': limit,
+        'cursor': cursor,
+        'min_score': min_score,
+        'status': status,
+        'candidate_status': candidate_status
+    }
     
-    job = JobPosting.query.filter_by(
-        id=job_id, 
-        tenant_id=current_user['tenant_id']
-    ).first()
+    if _wants_async():
+        if not db.session.query(JobPosting.id).filter_by(id=job_id, tenant_id=current_user['tenant_id']).first():
+            return jsonify({'error': 'Vaga não encontrada'}), 404
+        return _enqueue(current_user['tenant_id'], 'recommend_candidates', params)
+    
+    try:
+        result = operations.recommend_candidates(current_user['tenant_id'], **params)
+    except LookupError as error:
+        return jsonify({'error': str(error)}), 404
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    with stage('serialization'):
+        return jsonify(result)
+
+@ai_analytics_bp.route('/candidates/<int:candidate_id>/compatibility/<int:job_id>', methods=['GET'])
+@jwt_required()
+def calculate_compatibility(candidate_id, job_id):
+    """
+    Calcula a compatibilidade entre candidato e vaga
+    ---
+    tags:
+      - AI Analytics
+    parameters:
+      - name: candidate_id
+        in: path
+        type: integer
+        required: true
+        description: ID do candidato
+      - name: job_id
+        in: path
+        type: integer
+        required: true
+        description: ID da vaga
+      - name: include_text_similarity
+        in: query
+        type: boolean
+        default: false
+        description: Inclui a similaridade textual TF-IDF (informativa, fora do overall_score; nula enquanto o índice do tenant não foi construído)
+    responses:
+      200:
+        description: Score de compatibilidade
+      404:
+        description: Candidato ou vaga não encontrados
+    """
+    current_user = get_jwt_identity()
+    
+    with stage('db'):
+        candidate = Candidate.query.options(load_only(*SCORING_COLUMNS)).filter_by(
+            id=candidate_id, 
+            tenant_id=current_user['tenant_id']
+        ).first()
+        
+        job = JobPosting.query.filter_by(
+            id=job_id, 
+            tenant_id=current_user['tenant_id']
+        ).first()
+    
+    if not candidate:
+        return jsonify({'error': 'Candidato não encontrado'}), 404
     
     if not job:
         return jsonify({'error': 'Vaga não encontrada'}), 404
     
-    # Buscar candidatos do mesmo tenant
-    candidates = Candidate.query.filter_by(
-        tenant_id=current_user['tenant_id']
-    ).all()
-    
-    # Preparar dados da vaga
+    # Preparar dados
     job_data = {
-        'title': job.title,
         'description': job.description,
         'requirements': job.requirements,
         'experience_level': job.experience_level,
@@ -112,35 +317,48 @@ def recommend_candidates_for_job(job_id):
         'salary_max': job.salary_max
     }
     
-    # Preparar dados dos candidatos
-    candidates_data = []
-    for candidate in candidates:
+    with stage('features'):
         candidate_data = {
-            'id': candidate.id,
-            'first_name': candidate.first_name,
-            'last_name': candidate.last_name,
-            'email': candidate.email,
             'skills': candidate.skills,
-            'resume_text': candidate.resume_text,
+            'features': feature_store.get(candidate),
             'experience_years': candidate.experience_years,
             'location': candidate.location,
             'salary_expectation': candidate.salary_expectation
         }
-        candidates_data.append(candidate_data)
-    
-    # Obter recomendações
-    recommendations = ai_service.recommend_candidates(job_data, candidates_data, limit)
+        job_features = ai_service.job_features(job_data, job.id, job.updated_at)
     
-    return jsonify({
-        'job_id': job_id,
-        'recommendations': recommendations
-    })
+    # Calcular compatibilidade
+    compatibility = ai_service.calculate_compatibility_score(
+        candidate_data, job_data, job_features=job_features
+    )
+    
+    # Salvar no banco de dados (um único upsert)
+    with stage('db'):
+        MatchStore.upsert_many([{
+            'tenant_id': current_user['tenant_id'],
+            'candidate_id': candidate_id,
+            'job_posting_id': job_id,
+            'breakdown': compatibility
+        }])
+        db.session.commit()
+    
+    # Similaridade textual TF-IDF (opcional): só informativa, não entra no score gravado
+    if request.args.get('include_text_similarity', 'false').lower() == 'true':
+        similarity = text_similarity.candidate_job_similarity(current_user['tenant_id'], candidate_id, job_id)
+        compatibility = dict(compatibility, text_similarity=None if similarity is None else round(similarity * 100, 2))
+    
+    with stage('serialization'):
+        return jsonify({
+            'candidate_id': candidate_id,
+            'job_id': job_id,
+            'compatibility': compatibility
+        })
 
-@ai_analytics_bp.route('/candidates/<int:candidate_id>/compatibility/<int:job_id>', methods=['GET'])
+@ai_analytics_bp.route('/candidates/<int:candidate_id>/matching-jobs', methods=['GET'])
 @jwt_required()
-def calculate_compatibility(candidate_id, job_id):
+def matching_jobs_for_candidate(candidate_id):
     """
-    Calcula a compatibilidade entre candidato e vaga
+    Vagas ativas mais compatíveis com um candidato
     ---
     tags:
       - AI Analytics
@@ -150,83 +368,109 @@ def calculate_compatibility(candidate_id, job_id):
         type: integer
         required: true
         description: ID do candidato
-      - name: job_id
-        in: path
+      - name: limit
+        in: query
         type: integer
-        required: true
-        description: ID da vaga
+        default: 10
+        description: Número máximo de vagas
+      - name: min_score
+        in: query
+        type: number
+        description: Score mínimo de compatibilidade (0-100)
     responses:
       200:
-        description: Score de compatibilidade
+        description: Vagas ordenadas por compatibilidade
       404:
-        description: Candidato ou vaga não encontrados
+        description: Candidato não encontrado
     """
     current_user = get_jwt_identity()
     
-    candidate = Candidate.query.filter_by(
+    candidate = Candidate.query.options(load_only(*SCORING_COLUMNS)).filter_by(
         id=candidate_id, 
         tenant_id=current_user['tenant_id']
     ).first()
     
-    job = JobPosting.query.filter_by(
-        id=job_id, 
-        tenant_id=current_user['tenant_id']
-    ).first()
-    
     if not candidate:
         return jsonify({'error': 'Candidato não encontrado'}), 404
     
-    if not job:
-        return jsonify({'error': 'Vaga não encontrada'}), 404
-    
-    # Preparar dados
     candidate_data = {
         'skills': candidate.skills,
-        'resume_text': candidate.resume_text,
+        'features': feature_store.get(candidate),
         'experience_years': candidate.experience_years,
         'location': candidate.location,
         'salary_expectation': candidate.salary_expectation
     }
     
-    job_data = {
-        'description': job.description,
-        'requirements': job.requirements,
-        'experience_level': job.experience_level,
-        'location': job.location,
-        'remote_work': job.remote_work,
-        'salary_min': job.salary_min,
-        'salary_max': job.salary_max
-    }
+    matches = reverse_matcher.match(
+        current_user['tenant_id'], candidate_data,
+        limit=request.args.get('limit', 10, type=int),
+        min_score=request.args.get('min_score', type=float)
+    )
+    
+    with stage('serialization'):
+        return jsonify({
+            'candidate_id': candidate_id,
+            'matches': matches
+        })
+
+@ai_analytics_bp.route('/matching-jobs', methods=['POST'])
+@jwt_required()
+def matching_jobs_for_profile():
+    """
+    Vagas ativas mais compatíveis com um perfil ainda não cadastrado
+    ---
+    tags:
+      - AI Analytics
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          properties:
+            skills:
+              type: string
+            resume_text:
+              type: string
+            experience_years:
+              type: integer
+            location:
+              type: string
+            salary_expectation:
+              type: number
+            limit:
+              type: integer
+              default: 10
+            min_score:
+              type: number
+    responses:
+      200:
+        description: Vagas ordenadas por compatibilidade
+      400:
+        description: Dados inválidos
+    """
+    current_user = get_jwt_identity()
+    data = request.get_json(silent=True)
     
-    # Calcular compatibilidade
-    compatibility = ai_service.calculate_compatibility_score(candidate_data, job_data)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Dados inválidos'}), 400
     
-    # Salvar no banco de dados
-    existing_match = CandidateJobMatch.query.filter_by(
-        candidate_id=candidate_id,
-        job_posting_id=job_id
-    ).first()
+    try:
+        limit = int(data.get('limit', 10))
+        min_score = float(data['min_score']) if data.get('min_score') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Dados inválidos'}), 400
     
-    if existing_match:
-        existing_match.compatibility_score = compatibility['overall_score']
-        existing_match.score_breakdown = compatibility
-    else:
-        new_match = CandidateJobMatch(
-            candidate_id=candidate_id,
-            job_posting_id=job_id,
-            compatibility_score=compatibility['overall_score'],
-            score_breakdown=compatibility,
-            tenant_id=current_user['tenant_id']
-        )
-        db.session.add(new_match)
+    candidate_data = {
+        key: data.get(key)
+        for key in ('skills', 'resume_text', 'experience_years', 'location', 'salary_expectation')
+    }
     
-    db.session.commit()
+    matches = reverse_matcher.match(
+        current_user['tenant_id'], candidate_data, limit=limit, min_score=min_score
+    )
     
-    return jsonify({
-        'candidate_id': candidate_id,
-        'job_id': job_id,
-        'compatibility': compatibility
-    })
+    with stage('serialization'):
+        return jsonify({'matches': matches})
 
 @ai_analytics_bp.route('/candidates/duplicates', methods=['GET'])
 @jwt_required()
@@ -243,42 +487,142 @@ def detect_duplicate_candidates():
         type: number
         default: 0.8
         description: Limiar de similaridade (0-1)
+      - name: async
+        in: query
+        type: boolean
+        default: false
+        description: Executa pela fila de tarefas e responde 202 com o ID da tarefa
     responses:
       200:
         description: Lista de grupos de candidatos duplicados
+      202:
+        description: Tarefa enfileirada
     """
     current_user = get_jwt_identity()
     threshold = request.args.get('threshold', 0.8, type=float)
     
-    # Buscar candidatos do tenant
-    candidates = Candidate.query.filter_by(
-        tenant_id=current_user['tenant_id']
-    ).all()
+    if _wants_async():
+        return _enqueue(current_user['tenant_id'], 'detect_duplicates', {'threshold': threshold})
     
-    # Preparar dados dos candidatos
-    candidates_data = []
-    for candidate in candidates:
-        candidate_data = {
-            'id': candidate.id,
-            'first_name': candidate.first_name,
-            'last_name': candidate.last_name,
-            'email': candidate.email,
-            'phone': candidate.phone,
-            'linkedin_url': candidate.linkedin_url
-        }
-        candidates_data.append(candidate_data)
+    result = operations.detect_duplicates(current_user['tenant_id'], threshold)
+    
+    with stage('serialization'):
+        return jsonify(result)
+
+@ai_analytics_bp.route('/tasks/<task_id>', methods=['GET'])
+@jwt_required()
+def get_ai_task(task_id):
+    """
+    Consulta o status de uma tarefa de IA enfileirada
+    ---
+    tags:
+      - AI Analytics
+    parameters:
+      - name: task_id
+        in: path
+        type: string
+        required: true
+        description: ID retornado pelas rotas chamadas com async=true
+    responses:
+      200:
+        description: Status, tentativas e erro da tarefa
+      404:
+        description: Tarefa não encontrada ou expirada
+    """
+    current_user = get_jwt_identity()
+    task = task_queue.get(task_id, current_user['tenant_id'])
     
-    # Detectar duplicatas
-    duplicates = ai_service.detect_duplicate_candidates(candidates_data, threshold)
+    if not task:
+        return jsonify({'error': 'Tarefa não encontrada'}), 404
     
+    return jsonify(task.to_dict())
+
+@ai_analytics_bp.route('/tasks/<task_id>/result', methods=['GET'])
+@jwt_required()
+def get_ai_task_result(task_id):
+    """
+    Retorna o resultado de uma tarefa de IA
+    ---
+    tags:
+      - AI Analytics
+    parameters:
+      - name: task_id
+        in: path
+        type: string
+        required: true
+        description: ID da tarefa
+    responses:
+      200:
+        description: Mesmo corpo da resposta síncrona da operação
+      202:
+        description: Tarefa ainda na fila ou em execução
+      404:
+        description: Tarefa não encontrada ou expirada
+      409:
+        description: Tarefa falhou
+    """
+    current_user = get_jwt_identity()
+    task = task_queue.get(task_id, current_user['tenant_id'])
+    
+    if not task:
+        return jsonify({'error': 'Tarefa não encontrada'}), 404
+    
+    if task.status == 'failed':
+        return jsonify(task.to_dict()), 409
+    
+    if task.status != 'completed':
+        return jsonify(task.to_dict()), 202
+    
+    # O resultado já foi serializado pelo worker com o mesmo provedor JSON da aplicação
+    return current_app.response_class(task.result, mimetype='application/json')
+
+@ai_analytics_bp.route('/analytics/cache-stats', methods=['GET'])
+@jwt_required()
+@require_role(['admin', 'manager'])
+def get_cache_stats():
+    """
+    Contadores dos caches de IA deste worker
+    ---
+    tags:
+      - AI Analytics
+    responses:
+      200:
+        description: Acertos e faltas dos caches de resultados, de vagas e de respostas
+    """
     return jsonify({
-        'duplicates': duplicates,
-        'threshold': threshold,
-        'total_groups': len(duplicates)
+        'results': result_cache.stats(),
+        'job_features': job_feature_cache.stats(),
+        'responses': response_cache.stats()
     })
 
+@ai_analytics_bp.route('/analytics/metrics', methods=['GET'])
+@jwt_required()
+@require_role(['admin', 'manager'])
+def get_stage_metrics():
+    """
+    Histogramas de duração por etapa das rotas de IA e contadores do cache de respostas deste worker
+    ---
+    tags:
+      - AI Analytics
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [prometheus, json]
+        default: prometheus
+        description: Formato de exposição
+    responses:
+      200:
+        description: Histogramas por endpoint e etapa (db, features, scoring, ranking, serialization, total)
+    """
+    if request.args.get('format') == 'json':
+        return jsonify({'stages': stage_histograms.snapshot(), 'response_cache': response_cache.stats()})
+    return current_app.response_class(stage_histograms.to_prometheus() + response_cache.to_prometheus(),
+                                      mimetype='text/plain; version=0.0.4')
+
 @ai_analytics_bp.route('/analytics/dashboard', methods=['GET'])
 @jwt_required()
+@cached_response('candidates', 'job_postings', 'matches')
 def get_analytics_dashboard():
     """
     Retorna dados para o dashboard de analytics
@@ -291,60 +635,122 @@ def get_analytics_dashboard():
     """
     current_user = get_jwt_identity()
     
-    # Estatísticas básicas
-    total_candidates = Candidate.query.filter_by(tenant_id=current_user['tenant_id']).count()
-    total_jobs = JobPosting.query.filter_by(tenant_id=current_user['tenant_id']).count()
-    total_matches = CandidateJobMatch.query.filter_by(tenant_id=current_user['tenant_id']).count()
-    
-    # Top skills mais comuns
-    candidates_with_skills = Candidate.query.filter(
-        Candidate.tenant_id == current_user['tenant_id'],
-        Candidate.skills.isnot(None)
-    ).all()
-    
-    all_skills = []
-    for candidate in candidates_with_skills:
-        if candidate.skills:
-            skills = [skill.strip().lower() for skill in candidate.skills.split(',')]
-            all_skills.extend(skills)
-    
-    from collections import Counter
-    skill_counts = Counter(all_skills)
-    top_skills = skill_counts.most_common(10)
-    
-    # Distribuição de scores de compatibilidade
-    matches = CandidateJobMatch.query.filter_by(tenant_id=current_user['tenant_id']).all()
-    score_distribution = {
-        '90-100': 0,
-        '80-89': 0,
-        '70-79': 0,
-        '60-69': 0,
-        '50-59': 0,
-        '0-49': 0
-    }
-    
-    for match in matches:
-        score = match.compatibility_score or 0
-        if score >= 90:
-            score_distribution['90-100'] += 1
-        elif score >= 80:
-            score_distribution['80-89'] += 1
-        elif score >= 70:
-            score_distribution['70-79'] += 1
-        elif score >= 60:
-            score_distribution['60-69'] += 1
-        elif score >= 50:
-            score_distribution['50-59'] += 1
-        else:
-            score_distribution['0-49'] += 1
-    
-    return jsonify({
-        'basic_stats': {
-            'total_candidates': total_candidates,
-            'total_jobs': total_jobs,
-            'total_matches': total_matches
-        },
-        'top_skills': top_skills,
-        'score_distribution': score_distribution
-    })
+    # Totais, histograma e habilidades agregados no banco
+    return jsonify(dashboard.build(current_user['tenant_id']))
 
+
+@ai_analytics_bp.route('/analytics/funnel', methods=['GET'])
+@jwt_required()
+@cached_response('candidates')
+def get_hiring_funnel():
+    """
+    Funil de contratação do tenant (entradas, saídas, tempo médio e conversão por etapa)
+    ---
+    tags:
+      - AI Analytics
+    parameters:
+      - name: start
+        in: query
+        type: string
+        format: date
+        description: Primeiro dia do período (padrão: 30 dias atrás)
+      - name: end
+        in: query
+        type: string
+        format: date
+        description: Último dia do período (padrão: hoje, UTC)
+      - name: source
+        in: query
+        type: string
+        description: Origem dos candidatos
+      - name: job_id
+        in: query
+        type: integer
+        description: Vaga em que as mudanças de status aconteceram
+    responses:
+      200:
+        description: Etapas do funil, conversão geral e entradas por origem
+      400:
+        description: Período ou filtros inválidos
+    """
+    current_user = get_jwt_identity()
+
+    try:
+        end = date.fromisoformat(request.args['end']) if 'end' in request.args else datetime.utcnow().date()
+        start = date.fromisoformat(request.args['start']) if 'start' in request.args else end - timedelta(days=30)
+    except ValueError:
+        return jsonify({'error': 'Datas devem estar no formato AAAA-MM-DD'}), 400
+    if start > end:
+        return jsonify({'error': 'start deve ser anterior a end'}), 400
+    job_id = request.args.get('job_id')
+    if job_id is not None and not job_id.isdigit():
+        return jsonify({'error': 'job_id deve ser um inteiro'}), 400
+
+    # Lido apenas das agregações diárias (funnel_daily_rollups)
+    return jsonify(funnel.funnel(current_user['tenant_id'], start, end, request.args.get('source'),
+                                 int(job_id) if job_id is not None else None))
+
+@ai_analytics_bp.route('/analytics/skills/top', methods=['GET'])
+@jwt_required()
+@cached_response('candidates')
+def get_top_skills():
+    """
+    Habilidades mais frequentes do tenant (aproximado, Count-Min com heavy hitters)
+    ---
+    tags:
+      - AI Analytics
+    parameters:
+      - name: limit
+        in: query
+        type: integer
+        default: 10
+        description: Número de habilidades (máximo 50)
+    responses:
+      200:
+        description: Habilidades com contagem estimada e limite de erro (max_overcount com a confiança informada)
+      400:
+        description: Parâmetros inválidos
+    """
+    current_user = get_jwt_identity()
+    limit = request.args.get('limit', 10, type=int)
+    if not 1 <= limit <= 50:
+        return jsonify({'error': 'limit deve estar entre 1 e 50'}), 400
+    return jsonify(sketches.top_skills(current_user['tenant_id'], limit))
+
+@ai_analytics_bp.route('/analytics/percentiles', methods=['GET'])
+@jwt_required()
+@cached_response('candidates')
+def get_candidate_percentiles():
+    """
+    Percentis de expectativa salarial ou anos de experiência do tenant (aproximado, t-digest)
+    ---
+    tags:
+      - AI Analytics
+    parameters:
+      - name: field
+        in: query
+        type: string
+        enum: [salary_expectation, experience_years]
+        default: salary_expectation
+      - name: percentiles
+        in: query
+        type: string
+        default: 25,50,75,90
+        description: Percentis (0-100) separados por vírgula
+    responses:
+      200:
+        description: Valores por percentil com o erro máximo de posição (rank_error_bound) e a fração de valores obsoletos
+      400:
+        description: Parâmetros inválidos
+    """
+    current_user = get_jwt_identity()
+    field = request.args.get('field', 'salary_expectation')
+    if field not in TenantSketch.NUMERIC_FIELDS:
+        return jsonify({'error': 'field inválido'}), 400
+    try:
+        percentiles = [float(value) for value in request.args.get('percentiles', '25,50,75,90').split(',')]
+    except ValueError:
+        return jsonify({'error': 'percentiles deve ser uma lista de números'}), 400
+    if not percentiles or len(percentiles) > 20 or any(not 0 <= value <= 100 for value in percentiles):
+        return jsonify({'error': 'percentiles deve ter de 1 a 20 valores entre 0 e 100'}), 400
+    return jsonify(sketches.percentiles(current_user['tenant_id'], field, percentiles))
@@ -1,11 +1,17 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.services.ai_service import AIService
 from src.services.ats_crm_integration_service import ATSCRMIntegrationService
+from src.services.feature_store import CandidateFeatureStore
+from src.services.funnel import FunnelService
+from src.services.result_cache import result_cache
 from src.models import db, Candidate # Importar Candidate para deduplicação
 from src.utils.auth import require_role
 
 ats_crm_integration_bp = Blueprint("ats_crm_integration", __name__)
-ats_crm_service = ATSCRMIntegrationService()
+feature_store = CandidateFeatureStore(AIService(result_cache=result_cache))
+ats_crm_service = ATSCRMIntegrationService(feature_store.ai_service)
+funnel = FunnelService()
 
 @ats_crm_integration_bp.route("/integrate/candidate", methods=["POST"])
 @jwt_required()
@@ -46,25 +52,8 @@ def integrate_candidate():
 
     unified_data = ats_crm_service.unify_candidate_data(raw_data)
 
-    # Para deduplicação e enriquecimento, precisamos dos candidatos existentes do tenant
-    existing_candidates = Candidate.query.filter_by(tenant_id=current_user["tenant_id"]).all()
-    existing_candidates_list = []
-    for c in existing_candidates:
-        existing_candidates_list.append({
-            "id": c.id,
-            "first_name": c.first_name,
-            "last_name": c.last_name,
-            "email": c.email,
-            "phone": c.phone,
-            "linkedin_url": c.linkedin_url,
-            "resume_text": c.resume_text,
-            "skills": c.skills,
-            "experience_years": c.experience_years,
-            "location": c.location,
-            "salary_expectation": c.salary_expectation
-        })
-
-    processed_data = ats_crm_service.enrich_and_deduplicate(unified_data, existing_candidates_list)
+    # Deduplicação por consultas pontuais nas chaves indexadas do tenant
+    processed_data = ats_crm_service.enrich_and_deduplicate(unified_data, current_user["tenant_id"])
 
     if processed_data["is_duplicate"]:
         return jsonify({"message": "Candidato duplicado detectado, não adicionado.", "duplicate_of": processed_data["duplicate_of"]}), 200
@@ -84,6 +73,9 @@ def integrate_candidate():
         tenant_id=current_user["tenant_id"]
     )
     db.session.add(new_candidate)
+    # Reaproveita a análise do currículo feita no enriquecimento
+    feature_store.refresh(new_candidate, processed_data["enriched_data"].get("ai_analysis"))
+    funnel.record(new_candidate, None, changed_by=current_user.get("id"))
     db.session.commit()
 
     # Sincronizar de volta para o ATS/CRM (exemplo)
@@ -1,19 +1,34 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from sqlalchemy import and_, or_
-from src.models import db, Candidate, Tag, CandidateTag
+from sqlalchemy.orm import load_only, undefer
+from src.models import db, Candidate, Tag, CandidateTag, JobPosting
+from src.services.feature_store import CandidateFeatureStore
+from src.services.funnel import FunnelService
 from src.utils.auth import require_tenant_access
+from src.utils.response_cache import cached_response
 
 candidates_bp = Blueprint("candidates", __name__)
+feature_store = CandidateFeatureStore()
+funnel = FunnelService()
+
+# Campos que alimentam as características derivadas do candidato
+FEATURE_SOURCE_FIELDS = ("skills", "resume_text")
 
 def get_tenant_id_from_jwt():
     """Extrai o tenant_id do JWT"""
     claims = get_jwt()
     return claims.get("tenant_id")
 
+def get_user_id_from_jwt():
+    """Extrai o id do usuário da identidade do JWT"""
+    identity = get_jwt_identity()
+    return identity.get("id") if isinstance(identity, dict) else None
+
 @candidates_bp.route("/candidates", methods=["GET"])
 @jwt_required()
 @require_tenant_access
+@cached_response("candidates", "tags")
 def get_candidates():
     """
     Listar Candidatos
@@ -98,7 +113,8 @@ def get_candidates():
         status = request.args.get("status")
         tag_ids = request.args.getlist("tag_ids", type=int)
         
-        query = Candidate.query.filter_by(tenant_id=tenant_id)
+        # resume_text faz parte da resposta (to_dict); as demais consultas não o carregam
+        query = Candidate.query.options(undefer(Candidate.resume_text)).filter_by(tenant_id=tenant_id)
         
         if search:
             search_filter = or_(
@@ -263,7 +279,7 @@ def create_candidate():
         
         email = data.get("email")
         if email:
-            existing = Candidate.query.filter_by(
+            existing = Candidate.query.options(load_only(Candidate.id)).filter_by(
                 tenant_id=tenant_id, 
                 email=email.lower().strip()
             ).first()
@@ -291,6 +307,8 @@ def create_candidate():
         )
         
         db.session.add(candidate)
+        feature_store.refresh(candidate)
+        funnel.record(candidate, None, changed_by=get_user_id_from_jwt())
         db.session.commit()
         
         return jsonify({
@@ -346,7 +364,7 @@ def get_candidate(candidate_id):
     try:
         tenant_id = get_tenant_id_from_jwt()
         
-        candidate = Candidate.query.filter_by(
+        candidate = Candidate.query.options(undefer(Candidate.resume_text)).filter_by(
             id=candidate_id, 
             tenant_id=tenant_id
         ).first()
@@ -424,6 +442,9 @@ def update_candidate(candidate_id):
               type: string
               description: Status do candidato.
               enum: [new, contacted, interviewed, hired, rejected]
+            job_posting_id:
+              type: integer
+              description: Vaga em que a mudança de status aconteceu (histórico do funil).
     security:
       - jwt:
           - 
@@ -453,7 +474,7 @@ def update_candidate(candidate_id):
       401:
         description: Token de acesso ausente ou inválido.
       404:
-        description: Candidato não encontrado.
+        description: Candidato ou vaga não encontrados.
       409:
         description: Candidato com este email já existe.
       500:
@@ -463,7 +484,7 @@ def update_candidate(candidate_id):
         tenant_id = get_tenant_id_from_jwt()
         data = request.get_json()
         
-        candidate = Candidate.query.filter_by(
+        candidate = Candidate.query.options(undefer(Candidate.resume_text)).filter_by(
             id=candidate_id, 
             tenant_id=tenant_id
         ).first()
@@ -473,13 +494,23 @@ def update_candidate(candidate_id):
         
         email = data.get("email")
         if email and email.lower().strip() != candidate.email:
-            existing = Candidate.query.filter_by(
+            existing = Candidate.query.options(load_only(Candidate.id)).filter_by(
                 tenant_id=tenant_id, 
                 email=email.lower().strip()
             ).first()
             if existing:
                 return jsonify({"error": "Candidato com este email já existe"}), 409
         
+        job_posting_id = data.get("job_posting_id")
+        if job_posting_id is not None:
+            job = JobPosting.query.options(load_only(JobPosting.id)).filter_by(
+                id=job_posting_id,
+                tenant_id=tenant_id
+            ).first()
+            if not job:
+                return jsonify({"error": "Vaga não encontrada"}), 404
+        
+        previous_status = candidate.status
         updatable_fields = [
             "first_name", "last_name", "email", "phone", "linkedin_url",
             "resume_text", "resume_file_url", "skills", "experience_years",
@@ -494,6 +525,12 @@ def update_candidate(candidate_id):
                 else:
                     setattr(candidate, field, data[field])
         
+        if candidate.features is None or any(field in data for field in FEATURE_SOURCE_FIELDS):
+            feature_store.refresh(candidate)
+        
+        if candidate.status != previous_status:
+            funnel.record(candidate, previous_status, job_posting_id, get_user_id_from_jwt())
+        
         db.session.commit()
         
         return jsonify({
@@ -598,7 +635,7 @@ def add_candidate_tag(candidate_id):
         if not data or not data.get("tag_id"):
             return jsonify({"error": "ID da tag é obrigatório"}), 400
         
-        candidate = Candidate.query.filter_by(
+        candidate = Candidate.query.options(load_only(Candidate.id)).filter_by(
             id=candidate_id, 
             tenant_id=tenant_id
         ).first()
@@ -669,7 +706,7 @@ def remove_candidate_tag(candidate_id, tag_id):
     try:
         tenant_id = get_tenant_id_from_jwt()
         
-        candidate = Candidate.query.filter_by(
+        candidate = Candidate.query.options(load_only(Candidate.id)).filter_by(
             id=candidate_id, 
             tenant_id=tenant_id
         ).first()
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models import db, JobPosting
 from src.utils.auth import require_role
 from src.utils.i18n import translate_text, get_user_locale
+from src.utils.response_cache import cached_response
 
 job_postings_bp = Blueprint("job_postings", __name__)
 
@@ -44,6 +45,10 @@ def create_job_posting():
               type: number
             salary_max:
               type: number
+            status:
+              type: string
+              enum: [draft, active, paused, closed]
+              default: draft
     responses:
       201:
         description: Vaga criada com sucesso.
@@ -65,6 +70,7 @@ def create_job_posting():
         remote_work=data.get("remote_work", False),
         salary_min=data.get("salary_min"),
         salary_max=data.get("salary_max"),
+        status=data.get("status", "draft"),
         tenant_id=current_user["tenant_id"]
     )
     db.session.add(new_job_posting)
@@ -73,6 +79,7 @@ def create_job_posting():
 
 @job_postings_bp.route("/job-postings", methods=["GET"])
 @jwt_required()
+@cached_response("job_postings")
 def get_job_postings():
     """
     Retorna todas as vagas do tenant.
@@ -169,6 +176,9 @@ def update_job_posting(job_id):
               type: number
             salary_max:
               type: number
+            status:
+              type: string
+              enum: [draft, active, paused, closed]
     responses:
       200:
         description: Vaga atualizada com sucesso.
@@ -191,6 +201,7 @@ def update_job_posting(job_id):
     job_posting.remote_work = data.get("remote_work", job_posting.remote_work)
     job_posting.salary_min = data.get("salary_min", job_posting.salary_min)
     job_posting.salary_max = data.get("salary_max", job_posting.salary_max)
+    job_posting.status = data.get("status", job_posting.status)
     db.session.commit()
     return jsonify(job_posting.to_dict()), 200
 
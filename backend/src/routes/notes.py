@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
+from sqlalchemy.orm import load_only
 from src.models import db, Note, Candidate
 from src.utils.auth import require_tenant_access, get_current_user_info
 from datetime import datetime
@@ -64,7 +65,7 @@ def get_notes_for_candidate(candidate_id):
         tenant_id = get_tenant_id_from_jwt()
         user_info = get_current_user_info()
         
-        candidate = Candidate.query.filter_by(id=candidate_id, tenant_id=tenant_id).first()
+        candidate = Candidate.query.options(load_only(Candidate.id)).filter_by(id=candidate_id, tenant_id=tenant_id).first()
         if not candidate:
             return jsonify({"error": "Candidato não encontrado"}), 404
         
@@ -149,7 +150,7 @@ def create_note_for_candidate(candidate_id):
         if not data or not data.get("content"):
             return jsonify({"error": "Conteúdo da nota é obrigatório"}), 400
         
-        candidate = Candidate.query.filter_by(id=candidate_id, tenant_id=tenant_id).first()
+        candidate = Candidate.query.options(load_only(Candidate.id)).filter_by(id=candidate_id, tenant_id=tenant_id).first()
         if not candidate:
             return jsonify({"error": "Candidato não encontrado"}), 404
         
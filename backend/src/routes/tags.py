@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 from src.models import db, Tag
 from src.utils.auth import require_tenant_access, require_role
+from src.utils.response_cache import cached_response
 
 tags_bp = Blueprint("tags", __name__)
 
@@ -13,6 +14,7 @@ def get_tenant_id_from_jwt():
 @tags_bp.route("/tags", methods=["GET"])
 @jwt_required()
 @require_tenant_access
+@cached_response("tags")
 def get_tags():
     """
     Listar Tags
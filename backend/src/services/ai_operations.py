@@ -0,0 +1,319 @@
+import heapq
+import os
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import load_only
+from src.models import db, Candidate, JobPosting, CandidateJobMatch
+from src.services.bulk_analysis import BULK_ANALYSIS_MAX_CONCURRENT, BulkAnalysisService
+from src.services.dedup_index import CandidateDedupIndex
+from src.services.feature_store import CandidateFeatureStore
+from src.services.leaderboard import Leaderboard, recommendation_item
+from src.services.match_materializer import MatchMaterializer
+from src.services.skill_index import SkillIndex
+from src.services.task_queue import TaskQueue
+from src.utils.timing import stage
+
+# Candidatos lidos do cursor do banco, pontuados e descartados por vez
+AI_STREAM_CHUNK_SIZE = int(os.getenv('AI_STREAM_CHUNK_SIZE', '1000'))
+
+# Colunas do candidato usadas na pontuação e na análise (sem resume_text)
+STREAM_COLUMNS = (Candidate.id, Candidate.tenant_id, Candidate.first_name, Candidate.last_name,
+                  Candidate.email, Candidate.skills, Candidate.experience_years, Candidate.location,
+                  Candidate.salary_expectation)
+# Colunas lidas ao montar o ranking ao vivo, no formato do leaderboard
+RANKING_COLUMNS = STREAM_COLUMNS + (Candidate.status,)
+
+
+def _rank_key(item: Dict):
+    """Ordem do ranking: score desc, ID do candidato asc."""
+    return -item['compatibility_score'], item['candidate']['id']
+
+
+class AIOperations:
+    """Operações pesadas de IA expostas pela API.
+
+    Executadas tanto dentro da requisição (rotas de ai_analytics) quanto pelo
+    TaskWorker, a partir da fila ai_tasks; por isso recebem só valores
+    serializáveis e devolvem o corpo da resposta. Registro inexistente gera
+    LookupError.
+
+    Os caminhos que percorrem o tenant inteiro leem os candidatos em lotes por
+    um cursor no servidor (yield_per) e mantêm só o top-k ou os grupos
+    encontrados, então a memória não cresce com o tamanho do tenant.
+    """
+
+    # Atualização do leaderboard pedida por uma leitura que o encontrou atrasado
+    REFRESH_LEADERBOARD = 'refresh_leaderboard'
+
+    def __init__(self, feature_store: Optional[CandidateFeatureStore] = None,
+                 leaderboard: Optional[Leaderboard] = None, chunk_size: int = AI_STREAM_CHUNK_SIZE,
+                 queue: Optional[TaskQueue] = None):
+        self.feature_store = feature_store or CandidateFeatureStore()
+        self.ai_service = self.feature_store.ai_service
+        self.leaderboard = leaderboard or Leaderboard()
+        self.materializer = MatchMaterializer(self.feature_store)
+        self.queue = queue or TaskQueue()
+        self.bulk_analysis = BulkAnalysisService(self.feature_store, queue=self.queue)
+        self.chunk_size = chunk_size
+        self.dedup_index = CandidateDedupIndex(self.ai_service.duplicate_detector)
+
+    def handlers(self) -> Dict[str, Callable]:
+        """Operações disponíveis para a fila, por nome."""
+        return {
+            'analyze_candidate': self.analyze_candidate,
+            'detect_duplicates': self.detect_duplicates,
+            'recommend_candidates': self.recommend_candidates,
+            self.REFRESH_LEADERBOARD: self.refresh_leaderboard,
+            BulkAnalysisService.OPERATION: self.bulk_analysis.run
+        }
+
+    @staticmethod
+    def limits() -> Dict[str, int]:
+        """Máximo de tarefas simultâneas por operação, somando todos os workers."""
+        return {BulkAnalysisService.OPERATION: BULK_ANALYSIS_MAX_CONCURRENT}
+
+    def analyze_candidate(self, tenant_id: int, candidate_id: int) -> Dict:
+        candidate = Candidate.query.options(load_only(*STREAM_COLUMNS, Candidate.resume_text)).filter_by(
+            id=candidate_id,
+            tenant_id=tenant_id
+        ).first()
+
+        if not candidate:
+            raise LookupError('Candidato não encontrado')
+
+        # Preparar dados do candidato
+        candidate_data = {
+            'first_name': candidate.first_name,
+            'last_name': candidate.last_name,
+            'email': candidate.email,
+            'skills': candidate.skills,
+            'resume_text': candidate.resume_text,
+            'experience_years': candidate.experience_years,
+            'location': candidate.location,
+            'salary_expectation': candidate.salary_expectation
+        }
+
+        # Analisar candidato a partir das características persistidas
+        analysis = self.feature_store.to_analysis(self.feature_store.get(candidate))
+        enriched_data = self.ai_service.enrich_candidate_data(candidate_data, analysis)
+
+        # Persiste características recalculadas por mudança de versão do extrator
+        db.session.commit()
+
+        return {
+            'candidate_id': candidate_id,
+            'analysis': analysis,
+            'enriched_data': enriched_data
+        }
+
+    def detect_duplicates(self, tenant_id: int, threshold: float = 0.8) -> Dict:
+        # Grupos encontrados percorrendo, no banco, os blocos das chaves dedup_* indexadas
+        # (find_groups mede as próprias leituras como 'db' e as comparações como 'scoring')
+        groups = self.dedup_index.find_groups(tenant_id, threshold, self.chunk_size)
+
+        # Somente os candidatos agrupados são carregados
+        with stage('db'):
+            details = self.dedup_index.candidate_details(
+                [candidate_id for group in groups for candidate_id in group]
+            )
+        duplicates = [[details[candidate_id] for candidate_id in group] for group in groups]
+
+        return {
+            'duplicates': duplicates,
+            'threshold': threshold,
+            'total_groups': len(duplicates)
+        }
+
+    def recommend_candidates(self, tenant_id: int, job_id: int, limit: int = 10, cursor: Optional[str] = None,
+                             min_score: Optional[float] = None, status: Optional[str] = None,
+                             candidate_status: Optional[str] = None) -> Dict:
+        """Página do ranking de candidatos da vaga (cursor inválido gera ValueError).
+
+        A leitura não grava pares. Vagas ativas são servidas pelo leaderboard; se
+        ele estiver atrasado, a página sai com stale=True e a atualização é
+        enfileirada (refresh_leaderboard, uma tarefa por tenant de cada vez). Vagas
+        inativas, e vagas ativas ainda sem nenhum par materializado, têm apenas a
+        primeira página, pontuada ao vivo.
+        """
+        with stage('db'):
+            job = JobPosting.query.filter_by(
+                id=job_id,
+                tenant_id=tenant_id
+            ).first()
+
+        if not job:
+            raise LookupError('Vaga não encontrada')
+
+        stale = False
+        if job.status == MatchMaterializer.ACTIVE_STATUS:
+            with stage('db'):
+                stale = self.leaderboard.is_stale(tenant_id, job)
+                materialized = True
+                if stale:
+                    self.queue.enqueue_unique(tenant_id, self.REFRESH_LEADERBOARD, {'job_id': job_id},
+                                              f'{self.REFRESH_LEADERBOARD}:{tenant_id}')
+                    materialized = CandidateJobMatch.query.filter_by(job_posting_id=job_id).first() is not None
+            if materialized:
+                with stage('db'):
+                    page = self.leaderboard.page(tenant_id, job_id, limit, cursor, min_score, status, candidate_status)
+                return {'job_id': job_id, 'source': 'leaderboard', 'stale': stale, **page}
+
+        if cursor:
+            raise ValueError('O ranking de vagas inativas ou ainda não materializadas não é paginado')
+
+        # Preparar dados da vaga
+        job_data = {
+            'title': job.title,
+            'description': job.description,
+            'requirements': job.requirements,
+            'experience_level': job.experience_level,
+            'location': job.location,
+            'remote_work': job.remote_work,
+            'salary_min': job.salary_min,
+            'salary_max': job.salary_max
+        }
+
+        with stage('features'):
+            # Garante que o índice de habilidades reflete a versão atual do extrator
+            if self.feature_store.refresh_stale(tenant_id):
+                db.session.commit()
+
+            # Vaga processada uma vez por versão (cache compartilhado do worker)
+            job_features = self.ai_service.job_features(job_data, job.id, job.updated_at)
+            job_skills = list(job_features['skills'])
+
+        if min_score is not None or status or candidate_status:
+            recommendations = self._live_filtered(
+                tenant_id, job_id, job_data, job_features, limit, min_score, status, candidate_status
+            )
+        elif job_skills:
+            # Pontua primeiro apenas quem tem ao menos uma habilidade da vaga
+            recommendations = self._top_candidates(
+                SkillIndex.shortlist_query(tenant_id, job_skills), job_data, job_features, limit
+            )
+
+            # Os demais só entram se os pesos sem habilidades ainda puderem colocá-los no top-k
+            if SkillIndex.needs_outsiders(recommendations, limit):
+                recommendations = self._top_candidates(
+                    SkillIndex.outsiders_query(tenant_id, job_skills), job_data, job_features, limit,
+                    best=recommendations
+                )
+        else:
+            # Sem habilidades na vaga o índice não ajuda: todos têm skills_match zero
+            recommendations = self._top_candidates(
+                Candidate.query.filter_by(tenant_id=tenant_id).order_by(Candidate.id), job_data, job_features, limit
+            )
+
+        with stage('db'):
+            statuses = self._match_statuses(job_id, [item['candidate']['id'] for item in recommendations])
+        for item in recommendations:
+            item['match_status'] = statuses.get(item['candidate']['id'], 'pending')
+
+        return {
+            'job_id': job_id,
+            'source': 'live',
+            'stale': stale,
+            'recommendations': recommendations,
+            'next_cursor': None
+        }
+
+    def refresh_leaderboard(self, tenant_id: int, job_id: int) -> Dict:
+        """Handler de refresh_leaderboard: processa as marcas pendentes do tenant.
+
+        Uma vaga ativa ainda sem nenhum par (anterior ao materializador) é
+        calculada por inteiro.
+        """
+        stats = self.materializer.process_dirty(tenant_id)
+        missing = self.materializer.materialize_job(tenant_id, job_id, only_missing=True)
+        return {'dirty': stats, 'job': missing}
+
+    def _stream(self, query) -> Iterator[List]:
+        """Lotes de candidatos lidos por um cursor no servidor, só com as colunas da pontuação."""
+        rows = iter(query.options(load_only(*RANKING_COLUMNS)).yield_per(self.chunk_size))
+        while True:
+            with stage('db'):
+                chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _top_candidates(self, query, job_data, job_features, limit, accept=None,
+                        best: Optional[List[Dict]] = None, on_chunk=None) -> List[Dict]:
+        """Os `limit` melhores da consulta, pontuando lote a lote.
+
+        `accept` filtra as recomendações de cada lote (e então o lote é pontuado
+        por inteiro); `on_chunk` recebe cada lote antes da pontuação; `best` é um
+        top-k anterior a ser combinado com o da consulta.
+        """
+        best = list(best or [])
+        for chunk in self._stream(query):
+            if on_chunk is not None:
+                on_chunk(chunk)
+            recommendations = self._score_candidates(chunk, job_data, len(chunk) if accept else limit, job_features)
+            if accept is not None:
+                recommendations = [item for item in recommendations if accept(item)]
+            with stage('ranking'):
+                best = heapq.nsmallest(limit, best + recommendations, key=_rank_key)
+        return best
+
+    def _live_filtered(self, tenant_id, job_id, job_data, job_features, limit, min_score=None,
+                       status=None, candidate_status=None) -> List[Dict]:
+        """Top-k ao vivo com os filtros do leaderboard, numa única passada pelo tenant."""
+        query = Candidate.query.filter_by(tenant_id=tenant_id)
+        if candidate_status:
+            query = query.filter_by(status=candidate_status)
+
+        statuses = {}
+
+        def accept(item):
+            if min_score is not None and item['compatibility_score'] < min_score:
+                return False
+            # Pares ainda sem linha materializada estão pendentes
+            return not status or statuses.get(item['candidate']['id'], 'pending') == status
+
+        def load_statuses(chunk):
+            # Status dos pares só do lote atual
+            statuses.clear()
+            with stage('db'):
+                statuses.update(self._match_statuses(job_id, [candidate.id for candidate in chunk]))
+
+        return self._top_candidates(query.order_by(Candidate.id), job_data, job_features, limit, accept,
+                                    on_chunk=load_statuses if status else None)
+
+    @staticmethod
+    def _match_statuses(job_id: int, candidate_ids: List[int]) -> Dict[int, str]:
+        if not candidate_ids:
+            return {}
+        return dict(db.session.query(CandidateJobMatch.candidate_id, CandidateJobMatch.status).filter(
+            CandidateJobMatch.job_posting_id == job_id,
+            CandidateJobMatch.candidate_id.in_(candidate_ids)
+        ))
+
+    def _score_candidates(self, candidates, job_data, limit, job_features=None) -> List[Dict]:
+        """Pontua os candidatos com as características já extraídas.
+
+        Os itens saem no formato do leaderboard; match_status é preenchido por
+        quem monta a página.
+        """
+        with stage('features'):
+            features = self.feature_store.get_many(candidates)
+            candidates_data = []
+            for candidate in candidates:
+                candidate_data = {
+                    'id': candidate.id,
+                    'skills': candidate.skills,
+                    'features': features[candidate.id],
+                    'experience_years': candidate.experience_years,
+                    'location': candidate.location,
+                    'salary_expectation': candidate.salary_expectation
+                }
+                candidates_data.append(candidate_data)
+
+        recommendations = self.ai_service.recommend_candidates(job_data, candidates_data, limit, job_features)
+        by_id = {candidate.id: candidate for candidate in candidates}
+        return [
+            recommendation_item(by_id[item['candidate']['id']], item['compatibility_score'],
+                                item['score_breakdown'], None)
+            for item in recommendations
+        ]
@@ -1,8 +1,9 @@
 from typing import Dict, Any, List
 
 class ATSCRMIntegrationService:
-    def __init__(self):
-        pass
+    def __init__(self, ai_service=None):
+        # AIService compartilhado com a rota (com cache de resultados); criado sob demanda se omitido
+        self.ai_service = ai_service
 
     def unify_candidate_data(self, raw_data: Dict) -> Dict:
         """
@@ -40,38 +41,29 @@ class ATSCRMIntegrationService:
         # Simula uma resposta de sucesso da API do ATS/CRM
         return {"status": "success", "ats_crm_id": "ats_crm_candidate_123", "message": f"Candidato sincronizado com {ats_type}"}
 
-    def enrich_and_deduplicate(self, new_candidate_data: Dict, existing_candidates: List[Dict]) -> Dict:
+    def enrich_and_deduplicate(self, new_candidate_data: Dict, tenant_id: int, threshold: float = 0.8) -> Dict:
         """
         Enriquece e deduplica dados de um novo candidato com base em candidatos existentes.
-        Usa a lógica de detecção de duplicatas do AIService.
+        A deduplicação consulta as chaves normalizadas indexadas do tenant
+        (CandidateDedupIndex), com os mesmos pesos e limiar do AIService.
         """
-        # Simula a integração com o AIService para deduplicação e enriquecimento
-        # Em um cenário real, o AIService seria injetado ou acessado de forma mais robusta
-        from src.services.ai_service import AIService
-        ai_service = AIService()
+        from src.services.dedup_index import CandidateDedupIndex
+        if self.ai_service is None:
+            from src.services.ai_service import AIService
+            self.ai_service = AIService()
+        ai_service = self.ai_service
 
         # Enriquecimento
         enriched_data = ai_service.enrich_candidate_data(new_candidate_data)
 
         # Deduplicação
-        all_candidates = existing_candidates + [enriched_data]
-        duplicates = ai_service.detect_duplicate_candidates(all_candidates)
-        
-        is_duplicate = False
-        duplicate_of = None
-        for group in duplicates:
-            if enriched_data in group and len(group) > 1:
-                is_duplicate = True
-                # Encontra o outro candidato no grupo que não é o novo
-                for c in group:
-                    if c != enriched_data:
-                        duplicate_of = c.get("id") # Assume que o candidato existente tem um ID
-                        break
-                break
+        duplicate_of = CandidateDedupIndex(ai_service.duplicate_detector).find_duplicate(
+            tenant_id, enriched_data, threshold
+        )
 
         return {
             "enriched_data": enriched_data,
-            "is_duplicate": is_duplicate,
+            "is_duplicate": duplicate_of is not None,
             "duplicate_of": duplicate_of
         }
 
@@ -0,0 +1,162 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import or_
+from src.models import db, AITask, Candidate, CandidateFeatures
+from src.services.feature_store import CandidateFeatureStore
+from src.services.resume_analyzer import analyze_candidate_batch
+from src.services.task_queue import TaskQueue, report_progress
+
+# Processos de análise; por padrão um por núcleo
+BULK_ANALYSIS_WORKERS = int(os.getenv('BULK_ANALYSIS_WORKERS', '0')) or os.cpu_count() or 1
+# Candidatos lidos do banco, enviados a um processo e gravados por vez
+BULK_ANALYSIS_CHUNK_SIZE = int(os.getenv('BULK_ANALYSIS_CHUNK_SIZE', '500'))
+# Análises em massa executadas ao mesmo tempo, somando todos os workers da fila
+BULK_ANALYSIS_MAX_CONCURRENT = int(os.getenv('BULK_ANALYSIS_MAX_CONCURRENT', '1'))
+
+
+class BulkAnalysisService:
+    """Reanalisa os currículos de um tenant em paralelo, pela fila ai_tasks.
+
+    submit enfileira uma tarefa 'bulk_analyze' (uma por tenant de cada vez) e o
+    TaskWorker executa run: os candidatos são lidos em lotes por ID (só id,
+    skills e resume_text), distribuídos para um ProcessPoolExecutor com um
+    processo por núcleo e as características de cada lote concluído são gravadas
+    em lote pelo CandidateFeatureStore. O progresso fica na própria tarefa, então
+    qualquer worker da API responde a consulta e nada se perde num reinício; a
+    tarefa reivindicada de novo recomeça do início (com stale_only, só o que
+    faltou). O worker limita as análises simultâneas a BULK_ANALYSIS_MAX_CONCURRENT.
+    """
+
+    OPERATION = 'bulk_analyze'
+    # Filtros aceitos além da lista de IDs
+    FILTERS = ('status', 'source', 'stale_only')
+
+    def __init__(self, feature_store: Optional[CandidateFeatureStore] = None,
+                 max_workers: int = BULK_ANALYSIS_WORKERS, chunk_size: int = BULK_ANALYSIS_CHUNK_SIZE,
+                 queue: Optional[TaskQueue] = None):
+        self.feature_store = feature_store or CandidateFeatureStore()
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.queue = queue or TaskQueue()
+
+    def submit(self, tenant_id: int, candidate_ids: Optional[List[int]] = None,
+               filters: Optional[Dict] = None) -> Tuple[AITask, bool]:
+        """Enfileira a análise; (tarefa, criada). Com outra ainda pendente no tenant, devolve a existente."""
+        filters = {key: value for key, value in (filters or {}).items() if key in self.FILTERS}
+        return self.queue.enqueue_unique(tenant_id, self.OPERATION, {'candidate_ids': candidate_ids, 'filters': filters},
+                                         f'{self.OPERATION}:{tenant_id}')
+
+    def get(self, job_id: str, tenant_id: int) -> Optional[AITask]:
+        task = self.queue.get(job_id, tenant_id)
+        return task if task is not None and task.operation == self.OPERATION else None
+
+    @staticmethod
+    def describe(task: AITask) -> Dict:
+        """Status e contadores de progresso da análise."""
+        counters = json.loads(task.result if task.status == 'completed' and task.result else task.progress or '{}')
+        total = counters.get('total', 0)
+        processed = counters.get('processed', 0)
+        return {
+            'job_id': task.id,
+            'status': task.status,
+            'total': total,
+            'processed': processed,
+            'failed': counters.get('failed', 0),
+            'progress': round(processed / total * 100, 2) if total else (100.0 if task.status == 'completed' else 0.0),
+            'candidates_per_second': counters.get('candidates_per_second'),
+            'filters': json.loads(task.payload).get('filters') or {},
+            'error': task.error or counters.get('error'),
+            'created_at': task.created_at.isoformat() if task.created_at else None,
+            'started_at': task.started_at.isoformat() if task.started_at else None,
+            'finished_at': task.finished_at.isoformat() if task.finished_at else None
+        }
+
+    def run(self, tenant_id: int, candidate_ids: Optional[List[int]] = None, filters: Optional[Dict] = None) -> Dict:
+        """Handler da tarefa: analisa os candidatos e devolve os contadores finais."""
+        filters = filters or {}
+        started = time.perf_counter()
+        counters = {'total': self._query(tenant_id, candidate_ids, filters).count(), 'processed': 0, 'failed': 0,
+                    'candidates_per_second': None, 'error': None}
+        report_progress(counters)
+        # spawn evita copiar para os filhos as conexões e threads deste processo
+        with ProcessPoolExecutor(max_workers=self.max_workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            self._process(tenant_id, candidate_ids, filters, pool, counters, started)
+        elapsed = time.perf_counter() - started
+        counters['candidates_per_second'] = round(counters['processed'] / elapsed, 2) if elapsed else None
+        return counters
+
+    def _query(self, tenant_id: int, candidate_ids: Optional[List[int]], filters: Dict):
+        query = Candidate.query.filter(Candidate.tenant_id == tenant_id)
+        if candidate_ids is not None:
+            query = query.filter(Candidate.id.in_(candidate_ids))
+        if filters.get('status'):
+            query = query.filter(Candidate.status == filters['status'])
+        if filters.get('source'):
+            query = query.filter(Candidate.source == filters['source'])
+        if filters.get('stale_only'):
+            query = query.outerjoin(Candidate.features).filter(or_(
+                CandidateFeatures.candidate_id.is_(None),
+                CandidateFeatures.feature_version != self.feature_store.version
+            ))
+        return query
+
+    def _chunks(self, tenant_id: int, candidate_ids: Optional[List[int]], filters: Dict):
+        """Lê os candidatos em lotes por ID crescente, sem carregar o tenant inteiro.
+
+        Só tuplas de colunas: nenhum objeto se acumula na sessão do worker.
+        """
+        query = self._query(tenant_id, candidate_ids, filters).with_entities(
+            Candidate.id, Candidate.skills, Candidate.resume_text
+        ).order_by(Candidate.id)
+        last_id = 0
+        while True:
+            rows = [tuple(row) for row in query.filter(Candidate.id > last_id).limit(self.chunk_size)]
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield rows
+
+    def _process(self, tenant_id: int, candidate_ids: Optional[List[int]], filters: Dict,
+                 pool: ProcessPoolExecutor, counters: Dict, started: float) -> None:
+        # Mantém alguns lotes por processo em andamento enquanto os anteriores são gravados
+        max_in_flight = self.max_workers * 2
+        in_flight = {}
+        chunks = self._chunks(tenant_id, candidate_ids, filters)
+        exhausted = False
+
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                rows = next(chunks, None)
+                if rows is None:
+                    exhausted = True
+                    break
+                in_flight[pool.submit(analyze_candidate_batch, rows)] = len(rows)
+
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                size = in_flight.pop(future)
+                try:
+                    results = future.result()
+                except Exception as error:
+                    counters['failed'] += size
+                    counters['error'] = str(error)
+                    continue
+                self.feature_store.store_many(tenant_id, dict(results))
+                db.session.commit()
+                counters['processed'] += size
+
+            elapsed = time.perf_counter() - started
+            counters['candidates_per_second'] = round(counters['processed'] / elapsed, 2) if elapsed else None
+            if not report_progress(counters):
+                # Outro worker reivindicou a tarefa (reserva vencida); ele refaz a análise
+                for future in in_flight:
+                    future.cancel()
+                raise RuntimeError('Reserva da análise em massa perdida')
@@ -0,0 +1,89 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from src.models import db, Candidate, JobPosting, CandidateJobMatch, CandidateSkill, TenantStat
+from src.services.tenant_stats import TenantStatsService, score_bucket_expression
+
+
+class TenantDashboard:
+    """Dados do dashboard de analytics.
+
+    Lidos dos contadores de tenant_stats, mantidos na mesma transação das
+    escritas: o dashboard custa uma leitura pela chave primária. Enquanto o
+    tenant não tiver sido reconciliado, os dados são agregados no banco: os
+    totais em uma única consulta com subconsultas escalares, o histograma em um
+    GROUP BY sobre um CASE e as habilidades mais comuns a partir do índice
+    candidate_skills (nomes canônicos).
+    """
+
+    TOP_SKILLS_LIMIT = 10
+
+    def __init__(self, stats: Optional[TenantStatsService] = None):
+        self.stats = stats or TenantStatsService()
+
+    def build(self, tenant_id: int) -> Dict:
+        stats = self.stats.read(tenant_id)
+        if stats is not None:
+            return self.from_stats(stats)
+        return {
+            'basic_stats': self.basic_stats(tenant_id),
+            'top_skills': self.top_skills(tenant_id),
+            'score_distribution': self.score_distribution(tenant_id)
+        }
+
+    def from_stats(self, stats: Dict[str, Dict[str, int]]) -> Dict:
+        totals = stats.get('total', {})
+        skills = sorted(
+            ((skill, count) for skill, count in stats.get('skill', {}).items() if count > 0),
+            key=lambda item: (-item[1], item[0])
+        )
+        buckets = stats.get('score_bucket', {})
+        return {
+            'basic_stats': {
+                'total_candidates': totals.get('candidates', 0),
+                'total_jobs': totals.get('jobs', 0),
+                'total_matches': totals.get('matches', 0)
+            },
+            'top_skills': [[skill, count] for skill, count in skills[:self.TOP_SKILLS_LIMIT]],
+            'score_distribution': {label: buckets.get(label, 0) for label, _ in TenantStat.SCORE_BUCKETS}
+        }
+
+    @staticmethod
+    def basic_stats(tenant_id: int) -> Dict:
+        """Os três totais do tenant em uma ida ao banco."""
+        def count(model):
+            return select(func.count()).select_from(model).where(model.tenant_id == tenant_id).scalar_subquery()
+
+        row = db.session.execute(select(
+            count(Candidate).label('total_candidates'),
+            count(JobPosting).label('total_jobs'),
+            count(CandidateJobMatch).label('total_matches')
+        )).one()
+        return dict(row._mapping)
+
+    def top_skills(self, tenant_id: int) -> List[List]:
+        """Pares [habilidade, candidatos], do mais comum ao menos comum (empate por nome)."""
+        total = func.count().label('total')
+        rows = db.session.execute(
+            select(CandidateSkill.skill, total)
+            .where(CandidateSkill.tenant_id == tenant_id)
+            .group_by(CandidateSkill.skill)
+            .order_by(total.desc(), CandidateSkill.skill)
+            .limit(self.TOP_SKILLS_LIMIT)
+        )
+        return [[skill, count] for skill, count in rows]
+
+    @staticmethod
+    def score_distribution(tenant_id: int) -> Dict[str, int]:
+        """Histograma dos scores de compatibilidade (score nulo conta como zero)."""
+        bucket = score_bucket_expression(CandidateJobMatch.match_score).label('bucket')
+
+        distribution = {label: 0 for label, _ in TenantStat.SCORE_BUCKETS}
+        rows = db.session.execute(
+            select(bucket, func.count())
+            .where(CandidateJobMatch.tenant_id == tenant_id)
+            .group_by(bucket)
+        )
+        for label, count in rows:
+            distribution[label] = count
+        return distribution
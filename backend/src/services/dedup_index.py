@@ -0,0 +1,190 @@
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import load_only
+from src.models import db, Candidate
+from src.services.duplicate_detector import DuplicateDetector, UnionFind
+from src.utils.timing import stage
+
+# Coluna indexada correspondente a cada chave do DuplicateDetector
+DEDUP_COLUMNS = {
+    'email': Candidate.dedup_email,
+    'name': Candidate.dedup_name,
+    'linkedin': Candidate.dedup_linkedin,
+    'phone': Candidate.dedup_phone
+}
+
+
+class CandidateDedupIndex:
+    """Verificação de duplicados na ingestão usando as colunas dedup_* indexadas.
+
+    Em vez de carregar todo o tenant, faz uma consulta pontual por chave de
+    bloqueio do candidato recebido e pontua apenas os registros encontrados,
+    com os mesmos pesos e limiar do DuplicateDetector.
+    """
+
+    # Colunas lidas dos candidatos encontrados (sem resume_text e demais textos)
+    LOOKUP_COLUMNS = (Candidate.id, Candidate.dedup_email, Candidate.dedup_name,
+                      Candidate.dedup_linkedin, Candidate.dedup_phone)
+
+    # Colunas devolvidas para cada membro de um grupo de duplicados
+    DETAIL_COLUMNS = (Candidate.id, Candidate.first_name, Candidate.last_name, Candidate.email,
+                      Candidate.phone, Candidate.linkedin_url)
+
+    # Tamanho das listas IN ao buscar os membros dos grupos
+    DETAIL_BATCH_SIZE = 500
+
+    def __init__(self, detector: Optional[DuplicateDetector] = None):
+        self.detector = detector or DuplicateDetector()
+
+    def find_duplicate(self, tenant_id: int, candidate_data: Dict, threshold: float = 0.8) -> Optional[int]:
+        """Retorna o ID do candidato existente mais antigo que duplica o recebido, se houver."""
+        keys = self.detector.keys_for(candidate_data)
+        matches = set()
+        seen = set()
+
+        for field in self.detector.blocking_fields(threshold):
+            if not keys[field]:
+                continue
+            query = Candidate.query.options(load_only(*self.LOOKUP_COLUMNS)).filter(
+                Candidate.tenant_id == tenant_id,
+                DEDUP_COLUMNS[field] == keys[field]
+            )
+            for existing in query:
+                if existing.id in seen:
+                    continue
+                seen.add(existing.id)
+                if self.detector.similarity(keys, self._keys_of(existing)) >= threshold:
+                    matches.add(existing.id)
+
+        return min(matches) if matches else None
+
+    def find_groups(self, tenant_id: int, threshold: float = 0.8, chunk_size: int = 1000) -> List[List[int]]:
+        """Grupos de IDs duplicados do tenant, com o mesmo resultado do DuplicateDetector.
+
+        Para cada campo de bloqueio, o banco devolve (em lotes, ordenados pela chave)
+        só os candidatos cuja chave se repete; cada sequência de chaves iguais é um
+        bloco. A memória fica limitada ao maior bloco e aos IDs que aparecem em
+        algum deles. Grupos em ordem do menor ID, membros em ordem crescente.
+        Leituras são medidas como a etapa 'db' e a comparação dos blocos, como 'scoring'.
+        """
+        if threshold <= 0:
+            # Qualquer par atinge um limiar não positivo
+            with stage('db'):
+                ids = [row.id for row in db.session.execute(
+                    select(Candidate.id).where(Candidate.tenant_id == tenant_id).order_by(Candidate.id)
+                    .execution_options(yield_per=chunk_size)
+                )]
+            return [ids] if len(ids) > 1 else []
+
+        sets = UnionFind()
+        index_of: Dict[int, int] = {}
+
+        def index(candidate_id: int) -> int:
+            if candidate_id not in index_of:
+                index_of[candidate_id] = sets.add()
+            return index_of[candidate_id]
+
+        for field in self.detector.blocking_fields(threshold):
+            field_alone_matches = self.detector.weights[field] >= threshold
+            for members in self._blocks(tenant_id, DEDUP_COLUMNS[field], chunk_size):
+                with stage('scoring'):
+                    if field_alone_matches:
+                        for other in members[1:]:
+                            sets.union(index(members[0].id), index(other.id))
+                        continue
+                    keys = [self._keys_of(member) for member in members]
+                    for position, first in enumerate(members):
+                        for offset, second in enumerate(members[position + 1:], position + 1):
+                            if sets.find(index(first.id)) != sets.find(index(second.id)) and \
+                                    self.detector.similarity(keys[position], keys[offset]) >= threshold:
+                                sets.union(index(first.id), index(second.id))
+
+        with stage('scoring'):
+            groups: Dict[int, List[int]] = {}
+            for candidate_id in sorted(index_of):
+                groups.setdefault(sets.find(index_of[candidate_id]), []).append(candidate_id)
+        return [group for group in groups.values() if len(group) > 1]
+
+    def candidate_details(self, candidate_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Dados de exibição dos candidatos informados, por ID."""
+        candidate_ids = list(candidate_ids)
+        details = {}
+        for start in range(0, len(candidate_ids), self.DETAIL_BATCH_SIZE):
+            batch = candidate_ids[start:start + self.DETAIL_BATCH_SIZE]
+            for row in db.session.execute(select(*self.DETAIL_COLUMNS).where(Candidate.id.in_(batch))):
+                details[row.id] = {
+                    'id': row.id,
+                    'first_name': row.first_name,
+                    'last_name': row.last_name,
+                    'email': row.email,
+                    'phone': row.phone,
+                    'linkedin_url': row.linkedin_url
+                }
+        return details
+
+    def _blocks(self, tenant_id: int, column, chunk_size: int):
+        """Blocos (duas ou mais linhas com a mesma chave não vazia) da coluna, lidos em lotes."""
+        repeated = select(column).where(
+            Candidate.tenant_id == tenant_id,
+            column.isnot(None),
+            column != ''
+        ).group_by(column).having(func.count() > 1)
+
+        with stage('db'):
+            result = db.session.execute(
+                select(*self.LOOKUP_COLUMNS).where(
+                    Candidate.tenant_id == tenant_id,
+                    column.in_(repeated)
+                ).order_by(column, Candidate.id).execution_options(yield_per=chunk_size)
+            )
+
+        # Cada lote é lido dentro da etapa 'db'; um bloco pode continuar no lote seguinte
+        members: List = []
+        while True:
+            with stage('db'):
+                rows = result.fetchmany(chunk_size)
+            if not rows:
+                break
+            for key, block in groupby(rows, key=lambda row: getattr(row, column.key)):
+                if members and getattr(members[0], column.key) != key:
+                    yield members
+                    members = []
+                members.extend(block)
+        if members:
+            yield members
+
+    @staticmethod
+    def backfill(tenant_id: Optional[int] = None, chunk_size: int = 1000) -> int:
+        """Preenche as chaves de candidatos gravados antes da criação das colunas.
+
+        O commit fica a cargo de quem chamou. Retorna quantos candidatos foram atualizados.
+        """
+        query = Candidate.query.options(load_only(
+            Candidate.id, Candidate.tenant_id, Candidate.first_name, Candidate.last_name,
+            Candidate.email, Candidate.phone, Candidate.linkedin_url
+        )).order_by(Candidate.id)
+        if tenant_id is not None:
+            query = query.filter(Candidate.tenant_id == tenant_id)
+
+        # Paginação por ID com flush a cada lote, para não acumular o tenant na sessão
+        updated = 0
+        last_id = 0
+        while True:
+            batch = query.filter(Candidate.id > last_id).limit(chunk_size).all()
+            if not batch:
+                return updated
+            for candidate in batch:
+                candidate.refresh_dedup_keys()
+            db.session.flush()
+            updated += len(batch)
+            last_id = batch[-1].id
+
+    @staticmethod
+    def _keys_of(candidate) -> Dict[str, str]:
+        return {
+            'email': candidate.dedup_email or '',
+            'name': candidate.dedup_name or '',
+            'linkedin': candidate.dedup_linkedin or '',
+            'phone': candidate.dedup_phone or ''
+        }
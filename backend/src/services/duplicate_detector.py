@@ -0,0 +1,125 @@
+from typing import Dict, List, Optional
+
+from src.utils.normalization import normalize_email, normalize_linkedin, normalize_name, normalize_phone
+
+# Peso de cada campo na similaridade entre dois candidatos
+DUPLICATE_WEIGHTS = {
+    'email': 0.4,
+    'name': 0.2,
+    'linkedin': 0.3,
+    'phone': 0.1
+}
+
+
+class UnionFind:
+    """Conjuntos disjuntos com compressão de caminho e união por tamanho."""
+
+    def __init__(self, size: int = 0):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def add(self) -> int:
+        """Acrescenta um conjunto unitário e retorna seu índice."""
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        return len(self.parent) - 1
+
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, first: int, second: int) -> None:
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+
+
+class DuplicateDetector:
+    """Detecta candidatos duplicados sem comparar todos os pares.
+
+    Cada registro é normalizado uma única vez em chaves (email, nome, slug do
+    LinkedIn e dígitos do telefone). Só são pontuados os pares que compartilham
+    uma chave e os grupos são unidos de forma transitiva com union-find.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = weights or DUPLICATE_WEIGHTS
+
+    @staticmethod
+    def keys_for(candidate: Dict) -> Dict[str, str]:
+        """Chaves normalizadas de deduplicação de um candidato."""
+        return {
+            'email': normalize_email(candidate.get('email')),
+            'name': normalize_name(candidate.get('first_name'), candidate.get('last_name')),
+            'linkedin': normalize_linkedin(candidate.get('linkedin_url')),
+            'phone': normalize_phone(candidate.get('phone'))
+        }
+
+    def similarity(self, keys1: Dict[str, str], keys2: Dict[str, str]) -> float:
+        """Soma ponderada dos campos iguais; campos vazios nunca contam como iguais."""
+        return sum(
+            (1.0 if keys1[field] and keys1[field] == keys2[field] else 0.0) * weight
+            for field, weight in self.weights.items()
+        )
+
+    def blocking_fields(self, threshold: float) -> List[str]:
+        """Campos cujos blocos precisam ser percorridos para o limiar informado.
+
+        Um par só atinge o limiar se compartilhar campos cujo peso somado o alcance.
+        Os campos de menor peso podem ser ignorados enquanto a soma deles ficar
+        abaixo do limiar: qualquer par aprovado divide ao menos um campo restante.
+        Com os pesos padrão e limiar 0.8 basta percorrer os blocos de email, pois
+        telefone, nome e LinkedIn juntos somam apenas 0.6.
+        """
+        skipped_weight = 0.0
+        fields = []
+        for field in sorted(self.weights, key=self.weights.get):
+            if skipped_weight + self.weights[field] < threshold - 1e-9:
+                skipped_weight += self.weights[field]
+                continue
+            fields.append(field)
+        return fields
+
+    def find_groups(self, candidates: List[Dict], threshold: float = 0.8) -> List[List[Dict]]:
+        """Retorna os grupos de duplicados, na ordem de entrada dos candidatos."""
+        if len(candidates) < 2:
+            return []
+        if threshold <= 0:
+            # Qualquer par atinge um limiar não positivo
+            return [list(candidates)]
+
+        keys = [self.keys_for(candidate) for candidate in candidates]
+        sets = UnionFind(len(candidates))
+
+        for field in self.blocking_fields(threshold):
+            blocks: Dict[str, List[int]] = {}
+            for index, candidate_keys in enumerate(keys):
+                if candidate_keys[field]:
+                    blocks.setdefault(candidate_keys[field], []).append(index)
+
+            field_alone_matches = self.weights[field] >= threshold
+            for members in blocks.values():
+                if len(members) < 2:
+                    continue
+                if field_alone_matches:
+                    for other in members[1:]:
+                        sets.union(members[0], other)
+                    continue
+                for position, first in enumerate(members):
+                    for second in members[position + 1:]:
+                        if sets.find(first) != sets.find(second) and \
+                                self.similarity(keys[first], keys[second]) >= threshold:
+                            sets.union(first, second)
+
+        groups: Dict[int, List[Dict]] = {}
+        for index, candidate in enumerate(candidates):
+            groups.setdefault(sets.find(index), []).append(candidate)
+        return [group for group in groups.values() if len(group) > 1]
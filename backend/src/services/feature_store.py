@@ -0,0 +1,185 @@
+import json
+from collections import Counter
+from typing import Dict, Iterable, Optional
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.orm import load_only
+from src.models import db, Candidate, CandidateFeatures, CandidateSkill, ResponseCacheGeneration, TenantSketch, TenantStat
+from src.services.skill_index import SkillIndex
+
+class CandidateFeatureStore:
+    """Mantém as características derivadas de cada candidato (habilidades, experiência,
+    certificações e educação) persistidas na tabela candidate_features.
+
+    As características são calculadas na escrita do candidato; os caminhos de
+    pontuação leem apenas os dados persistidos e não voltam ao texto do currículo.
+    """
+
+    # Incrementar sempre que a lógica de extração mudar de forma incompatível
+    EXTRACTOR_VERSION = 1
+    # Limite de parâmetros por cláusula IN (o SQLite aceita poucos por consulta)
+    QUERY_CHUNK_SIZE = 500
+
+    # Colunas do candidato lidas ao recalcular as características
+    SOURCE_COLUMNS = (Candidate.id, Candidate.tenant_id, Candidate.skills, Candidate.resume_text)
+
+    def __init__(self, ai_service=None):
+        if ai_service is None:
+            from src.services.ai_service import AIService
+            ai_service = AIService()
+        self.ai_service = ai_service
+
+    @property
+    def version(self) -> str:
+        """Versão atual das características: extrator + taxonomia de habilidades."""
+        return f'{self.EXTRACTOR_VERSION}.{self.ai_service.skill_matcher.version}'
+
+    def compute(self, skills: Optional[str], resume_text: Optional[str],
+                resume_analysis: Optional[Dict] = None) -> Dict:
+        """Extrai as características a partir dos campos brutos do candidato.
+
+        `resume_analysis` reaproveita uma análise já feita do mesmo resume_text.
+        """
+        return self.ai_service.resume_analyzer.candidate_features(skills, resume_text, resume_analysis)
+
+    def refresh(self, candidate, resume_analysis: Optional[Dict] = None) -> Dict:
+        """Recalcula e grava as características do candidato na sessão atual.
+
+        O commit fica a cargo de quem chamou, para que as características sejam
+        persistidas na mesma transação da escrita do candidato.
+        """
+        features = self.compute(candidate.skills, candidate.resume_text, resume_analysis)
+        self._store(candidate, features)
+        return features
+
+    def get(self, candidate) -> Dict:
+        """Retorna as características do candidato, recalculando se estiverem ausentes ou desatualizadas."""
+        record = candidate.features
+        if record is None or record.feature_version != self.version:
+            return self.refresh(candidate)
+        return self._to_features(record)
+
+    def get_many(self, candidates: Iterable) -> Dict[int, Dict]:
+        """Retorna as características de vários candidatos com uma única consulta."""
+        candidates = list(candidates)
+        if not candidates:
+            return {}
+
+        by_candidate = {}
+        for start in range(0, len(candidates), self.QUERY_CHUNK_SIZE):
+            chunk_ids = [candidate.id for candidate in candidates[start:start + self.QUERY_CHUNK_SIZE]]
+            for record in CandidateFeatures.query.filter(CandidateFeatures.candidate_id.in_(chunk_ids)):
+                by_candidate[record.candidate_id] = record
+
+        features = {}
+        for candidate in candidates:
+            record = by_candidate.get(candidate.id)
+            if record is None or record.feature_version != self.version:
+                features[candidate.id] = self.refresh(candidate)
+            else:
+                features[candidate.id] = self._to_features(record)
+        return features
+
+    @staticmethod
+    def to_analysis(features: Dict) -> Dict:
+        """Converte as características persistidas no formato de analyze_resume_text."""
+        return {
+            'skills': features.get('skills', []),
+            'experience_years': features.get('experience_years'),
+            'education_keywords': features.get('education_keywords', []),
+            'certifications': features.get('certifications', []),
+            'languages': []
+        }
+
+    def refresh_stale(self, tenant_id: int) -> int:
+        """Recalcula os candidatos do tenant sem características na versão atual.
+
+        Mantém o índice de habilidades coerente após uma troca de extrator ou de
+        taxonomia. Retorna quantos candidatos foram atualizados.
+        """
+        stale = Candidate.query.options(load_only(*self.SOURCE_COLUMNS)).outerjoin(Candidate.features).filter(
+            Candidate.tenant_id == tenant_id,
+            or_(CandidateFeatures.candidate_id.is_(None), CandidateFeatures.feature_version != self.version)
+        ).all()
+        for candidate in stale:
+            self.refresh(candidate)
+        return len(stale)
+
+    def store_many(self, tenant_id: int, features_by_candidate: Dict[int, Dict]) -> None:
+        """Grava as características de vários candidatos em lote (análise em massa).
+
+        Usa uma consulta para os registros existentes e reescreve as entradas do
+        índice de habilidades com um DELETE e um INSERT em lote, em vez de carregar
+        cada candidato. O commit fica a cargo de quem chamou.
+        """
+        candidate_ids = list(features_by_candidate)
+        for start in range(0, len(candidate_ids), self.QUERY_CHUNK_SIZE):
+            chunk_ids = candidate_ids[start:start + self.QUERY_CHUNK_SIZE]
+            existing = {
+                record.candidate_id: record
+                for record in CandidateFeatures.query.filter(CandidateFeatures.candidate_id.in_(chunk_ids))
+            }
+
+            postings = []
+            for candidate_id in chunk_ids:
+                features = features_by_candidate[candidate_id]
+                record = existing.get(candidate_id)
+                if record is None:
+                    record = CandidateFeatures(candidate_id=candidate_id)
+                    db.session.add(record)
+                record.tenant_id = tenant_id
+                record.skills = json.dumps(features['skills'])
+                record.experience_years = features['experience_years']
+                record.certifications = json.dumps(features['certifications'])
+                record.education_keywords = json.dumps(features['education_keywords'])
+                record.feature_version = self.version
+                postings.extend(
+                    {'candidate_id': candidate_id, 'tenant_id': tenant_id, 'skill': skill}
+                    for skill in dict.fromkeys(features['skills'])
+                )
+
+            # O DELETE e o INSERT em lote não passam pelo ORM: a frequência de
+            # habilidades em tenant_stats e o sketch de habilidades são ajustados aqui
+            skill_deltas = Counter()
+            for posting_tenant, skill, count in db.session.execute(
+                select(CandidateSkill.tenant_id, CandidateSkill.skill, func.count())
+                .where(CandidateSkill.candidate_id.in_(chunk_ids))
+                .group_by(CandidateSkill.tenant_id, CandidateSkill.skill)
+            ):
+                skill_deltas[(posting_tenant, 'skill', skill)] -= count
+            for posting in postings:
+                skill_deltas[(tenant_id, 'skill', posting['skill'])] += 1
+
+            db.session.execute(delete(CandidateSkill).where(CandidateSkill.candidate_id.in_(chunk_ids)))
+            if postings:
+                db.session.execute(insert(CandidateSkill), postings)
+            TenantStat.increment(db.session.connection(), skill_deltas)
+            sketch_updates = {}
+            for (posting_tenant, _, skill), count in skill_deltas.items():
+                if count:
+                    sketch_updates.setdefault(posting_tenant, TenantSketch.new_update())['skills'][skill] += count
+            TenantSketch.record(db.session.connection(), sketch_updates)
+            ResponseCacheGeneration.mark(db.session, tenant_id, 'candidates')
+
+    def _store(self, candidate, features: Dict) -> CandidateFeatures:
+        record = candidate.features
+        if record is None:
+            record = CandidateFeatures(tenant_id=candidate.tenant_id)
+            candidate.features = record
+
+        record.tenant_id = candidate.tenant_id
+        record.skills = json.dumps(features['skills'])
+        record.experience_years = features['experience_years']
+        record.certifications = json.dumps(features['certifications'])
+        record.education_keywords = json.dumps(features['education_keywords'])
+        record.feature_version = self.version
+        SkillIndex.sync(candidate, features['skills'])
+        return record
+
+    @staticmethod
+    def _to_features(record: CandidateFeatures) -> Dict:
+        return {
+            'skills': json.loads(record.skills) if record.skills else [],
+            'experience_years': record.experience_years,
+            'certifications': json.loads(record.certifications) if record.certifications else [],
+            'education_keywords': json.loads(record.education_keywords) if record.education_keywords else []
+        }
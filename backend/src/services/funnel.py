@@ -0,0 +1,183 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func, select
+from src.models import db, CandidateStatusEvent, FunnelDailyRollup, ResponseCacheGeneration
+
+
+def _as_date(value) -> date:
+    """O SQLite devolve date() como texto; o PostgreSQL, como date."""
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+class FunnelService:
+    """Histórico de mudanças de status dos candidatos e funil de contratação.
+
+    Cada mudança grava um CandidateStatusEvent e incrementa, na mesma
+    transação, as agregações diárias de FunnelDailyRollup (entradas na etapa
+    nova; saídas e tempo na etapa anterior). O funil é lido apenas das
+    agregações, com custo proporcional ao número de dias e etapas, não de
+    candidatos. A conversão compara entradas entre etapas consecutivas no
+    período (fluxo, não coorte).
+    """
+
+    # Etapas do funil em ordem; 'rejected' é terminal e fica fora da conversão
+    FUNNEL_STAGES = ('new', 'contacted', 'interviewed', 'hired')
+    TERMINAL_STAGES = ('rejected',)
+
+    def record(self, candidate, from_status: Optional[str], job_posting_id: Optional[int] = None,
+               changed_by: Optional[int] = None) -> CandidateStatusEvent:
+        """Registra a entrada do candidato em candidate.status (from_status nulo na criação).
+
+        O commit fica a cargo de quem chamou, junto com a escrita do candidato.
+        """
+        if candidate.id is None:
+            db.session.flush()
+
+        now = datetime.utcnow()
+        seconds_in_previous = None
+        if from_status is not None:
+            # O status anterior começou na última mudança registrada (ou na criação do candidato)
+            entered_at = db.session.execute(
+                select(CandidateStatusEvent.created_at)
+                .where(CandidateStatusEvent.candidate_id == candidate.id)
+                .order_by(CandidateStatusEvent.created_at.desc(), CandidateStatusEvent.id.desc())
+                .limit(1)
+            ).scalar() or candidate.created_at
+            if entered_at is not None:
+                seconds_in_previous = max(0, int((now - entered_at).total_seconds()))
+
+        status_event = CandidateStatusEvent(
+            tenant_id=candidate.tenant_id,
+            candidate_id=candidate.id,
+            job_posting_id=job_posting_id,
+            source=candidate.source,
+            from_status=from_status,
+            to_status=candidate.status,
+            seconds_in_previous=seconds_in_previous,
+            changed_by=changed_by,
+            created_at=now
+        )
+        db.session.add(status_event)
+
+        deltas = defaultdict(dict)
+        self._count(deltas, status_event, now.date())
+        FunnelDailyRollup.increment(db.session.connection(), deltas)
+        return status_event
+
+    @staticmethod
+    def _count(deltas: Dict, status_event: CandidateStatusEvent, day: date) -> None:
+        def add(stage, **values):
+            key = (status_event.tenant_id, day, status_event.source or '', status_event.job_posting_id or 0, stage)
+            for counter, value in values.items():
+                deltas[key][counter] = deltas[key].get(counter, 0) + value
+
+        add(status_event.to_status, entered=1)
+        if status_event.from_status is not None:
+            add(status_event.from_status, exited=1, exit_seconds=status_event.seconds_in_previous or 0)
+
+    def rebuild(self, start: date, end: date, tenant_id: Optional[int] = None) -> Dict:
+        """Recalcula as agregações dos dias [start, end] a partir dos eventos.
+
+        Idempotente: substitui as linhas do período. Retorna quantos dias
+        agregados (linhas) e eventos foram processados.
+        """
+        filters = [
+            CandidateStatusEvent.created_at >= datetime.combine(start, datetime.min.time()),
+            CandidateStatusEvent.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time())
+        ]
+        rollups = db.session.query(FunnelDailyRollup).filter(FunnelDailyRollup.day.between(start, end))
+        if tenant_id is not None:
+            filters.append(CandidateStatusEvent.tenant_id == tenant_id)
+            rollups = rollups.filter(FunnelDailyRollup.tenant_id == tenant_id)
+
+        keys = (
+            CandidateStatusEvent.tenant_id,
+            func.date(CandidateStatusEvent.created_at),
+            func.coalesce(CandidateStatusEvent.source, ''),
+            func.coalesce(CandidateStatusEvent.job_posting_id, 0)
+        )
+        deltas = defaultdict(dict)
+        event_count = 0
+
+        entered = db.session.execute(
+            select(*keys, CandidateStatusEvent.to_status, func.count())
+            .where(*filters)
+            .group_by(*keys, CandidateStatusEvent.to_status)
+        )
+        for tenant, day, source, job_posting_id, stage, count in entered:
+            deltas[(tenant, _as_date(day), source, job_posting_id, stage)]['entered'] = count
+            event_count += count
+
+        exited = db.session.execute(
+            select(*keys, CandidateStatusEvent.from_status, func.count(),
+                   func.coalesce(func.sum(CandidateStatusEvent.seconds_in_previous), 0))
+            .where(*filters, CandidateStatusEvent.from_status.isnot(None))
+            .group_by(*keys, CandidateStatusEvent.from_status)
+        )
+        for tenant, day, source, job_posting_id, stage, count, seconds in exited:
+            key = (tenant, _as_date(day), source, job_posting_id, stage)
+            deltas[key]['exited'] = count
+            deltas[key]['exit_seconds'] = int(seconds)
+
+        tenants = {tenant for (tenant,) in rollups.with_entities(FunnelDailyRollup.tenant_id).distinct()}
+        tenants.update(key[0] for key in deltas)
+        for tenant in tenants:
+            ResponseCacheGeneration.mark(db.session, tenant, 'candidates')
+
+        rollups.delete(synchronize_session=False)
+        FunnelDailyRollup.increment(db.session.connection(), deltas)
+        db.session.commit()
+        return {'rollups': len(deltas), 'events': event_count}
+
+    def funnel(self, tenant_id: int, start: date, end: date, source: Optional[str] = None,
+               job_posting_id: Optional[int] = None) -> Dict:
+        """Funil do tenant no período [start, end], lido apenas das agregações diárias."""
+        query = select(
+            FunnelDailyRollup.source, FunnelDailyRollup.stage,
+            func.sum(FunnelDailyRollup.entered), func.sum(FunnelDailyRollup.exited),
+            func.sum(FunnelDailyRollup.exit_seconds)
+        ).where(
+            FunnelDailyRollup.tenant_id == tenant_id,
+            FunnelDailyRollup.day.between(start, end)
+        ).group_by(FunnelDailyRollup.source, FunnelDailyRollup.stage)
+        if source is not None:
+            query = query.where(FunnelDailyRollup.source == source)
+        if job_posting_id is not None:
+            query = query.where(FunnelDailyRollup.job_posting_id == job_posting_id)
+
+        totals = defaultdict(lambda: [0, 0, 0])
+        by_source = defaultdict(dict)
+        for row_source, stage, entered, exited, exit_seconds in db.session.execute(query):
+            counters = totals[stage]
+            counters[0] += int(entered or 0)
+            counters[1] += int(exited or 0)
+            counters[2] += int(exit_seconds or 0)
+            by_source[row_source or 'unknown'][stage] = int(entered or 0)
+
+        stages = []
+        previous = None
+        for stage in self.FUNNEL_STAGES + self.TERMINAL_STAGES:
+            entered, exited, exit_seconds = totals.get(stage, (0, 0, 0))
+            conversion = None
+            if stage in self.FUNNEL_STAGES and previous:
+                conversion = round(entered / previous, 4)
+            stages.append({
+                'stage': stage,
+                'entered': entered,
+                'exited': exited,
+                'avg_days_in_stage': round(exit_seconds / exited / 86400, 2) if exited else None,
+                'conversion_from_previous': conversion
+            })
+            if stage in self.FUNNEL_STAGES:
+                previous = entered
+
+        first, last = totals.get(self.FUNNEL_STAGES[0]), totals.get(self.FUNNEL_STAGES[-1])
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'stages': stages,
+            'overall_conversion': round(last[0] / first[0], 4) if first and first[0] and last else None,
+            'by_source': dict(by_source)
+        }
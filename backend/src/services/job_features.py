@@ -0,0 +1,62 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+# Quantidade máxima de vagas mantidas no cache de cada worker
+JOB_FEATURE_CACHE_SIZE = int(os.getenv('JOB_FEATURE_CACHE_SIZE', '1024'))
+
+
+class JobFeatureCache:
+    """Cache LRU das características de vagas, compartilhado entre requisições do worker.
+
+    A chave inclui o updated_at da vaga, então qualquer edição gera uma nova
+    entrada e a antiga sai naturalmente pela política LRU.
+    """
+
+    def __init__(self, maxsize: int = JOB_FEATURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        """Valor em cache (marcado como recente) ou None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Dict) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Dict]) -> Dict:
+        value = self.get(key)
+        if value is None:
+            # Calcula fora do lock; duas requisições simultâneas no máximo repetem o trabalho
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'size': len(self._entries), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+job_feature_cache = JobFeatureCache()
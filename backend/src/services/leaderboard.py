@@ -0,0 +1,147 @@
+import base64
+import binascii
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import contains_eager, load_only
+from src.models import Candidate, CandidateJobMatch, MatchDirtyMark
+
+# Atraso máximo tolerado do materializador antes de voltar à pontuação ao vivo
+LEADERBOARD_MAX_LAG_SECONDS = int(os.getenv('LEADERBOARD_MAX_LAG_SECONDS', '300'))
+# Itens por página do ranking; pedidos maiores são reduzidos a este limite
+LEADERBOARD_MAX_PAGE_SIZE = int(os.getenv('LEADERBOARD_MAX_PAGE_SIZE', '100'))
+
+# Colunas do candidato devolvidas em cada item do ranking
+CANDIDATE_COLUMNS = (Candidate.id, Candidate.first_name, Candidate.last_name, Candidate.email,
+                     Candidate.skills, Candidate.experience_years, Candidate.location,
+                     Candidate.salary_expectation, Candidate.status)
+
+
+def encode_cursor(score: float, candidate_id: int) -> str:
+    """Cursor opaco com a posição (score, candidate_id) do último item da página."""
+    payload = json.dumps({'s': score, 'c': candidate_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Inverso de encode_cursor; ValueError se o cursor for inválido."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(payload['s']), int(payload['c'])
+    except (binascii.Error, ValueError, KeyError, TypeError) as error:
+        raise ValueError('Cursor inválido') from error
+
+
+def serialize_candidate(candidate) -> Dict:
+    """Campos do candidato devolvidos em cada item do ranking (CANDIDATE_COLUMNS)."""
+    return {
+        'id': candidate.id,
+        'first_name': candidate.first_name,
+        'last_name': candidate.last_name,
+        'email': candidate.email,
+        'skills': candidate.skills,
+        'experience_years': candidate.experience_years,
+        'location': candidate.location,
+        'salary_expectation': float(candidate.salary_expectation) if candidate.salary_expectation else None,
+        'status': candidate.status
+    }
+
+
+def recommendation_item(candidate, score: float, breakdown: Optional[Dict], match_status: Optional[str]) -> Dict:
+    """Item do ranking, no mesmo formato para o leaderboard e para a pontuação ao vivo."""
+    return {
+        'candidate': serialize_candidate(candidate),
+        'compatibility_score': score,
+        'score_breakdown': breakdown,
+        'match_status': match_status
+    }
+
+
+class Leaderboard:
+    """Ranking por vaga servido a partir de candidate_job_matches.
+
+    As linhas são mantidas pelo MatchMaterializer; a paginação usa cursores por
+    chave (match_score, candidate_id) sobre o índice
+    ix_candidate_job_matches_leaderboard, então a página 100 custa o mesmo que a
+    primeira.
+    """
+
+    def __init__(self, max_lag_seconds: int = LEADERBOARD_MAX_LAG_SECONDS,
+                 max_page_size: int = LEADERBOARD_MAX_PAGE_SIZE):
+        self.max_lag = timedelta(seconds=max_lag_seconds)
+        self.max_page_size = max_page_size
+
+    def is_stale(self, tenant_id: int, job) -> bool:
+        """Indica se o ranking da vaga não reflete os dados atuais.
+
+        Só vagas ativas são materializadas. Uma alteração da própria vaga ainda não
+        processada invalida o ranking; alterações de candidatos são toleradas até
+        LEADERBOARD_MAX_LAG_SECONDS, o atraso normal do materializador.
+        """
+        if job.status != 'active':
+            return True
+
+        pending = MatchDirtyMark.query.filter(MatchDirtyMark.tenant_id == tenant_id)
+        if pending.filter(MatchDirtyMark.job_posting_id == job.id).first() is not None:
+            return True
+
+        oldest = pending.filter(MatchDirtyMark.candidate_id.isnot(None)) \
+            .order_by(MatchDirtyMark.id).with_entities(MatchDirtyMark.created_at).first()
+        if oldest is not None and oldest[0] is not None and datetime.utcnow() - oldest[0] > self.max_lag:
+            return True
+
+        return CandidateJobMatch.query.filter_by(job_posting_id=job.id).first() is None
+
+    def page(self, tenant_id: int, job_id: int, limit: int, cursor: Optional[str] = None,
+             min_score: Optional[float] = None, status: Optional[str] = None,
+             candidate_status: Optional[str] = None) -> Dict:
+        """Uma página do ranking e o cursor da próxima (None na última).
+
+        `limit` menor que 1 gera ValueError; acima de max_page_size é reduzido.
+        """
+        if limit < 1:
+            raise ValueError('limit deve ser maior que zero')
+        limit = min(limit, self.max_page_size)
+        position = decode_cursor(cursor) if cursor else None
+
+        query = CandidateJobMatch.query.join(Candidate, Candidate.id == CandidateJobMatch.candidate_id).options(
+            contains_eager(CandidateJobMatch.candidate).load_only(*CANDIDATE_COLUMNS)
+        ).filter(
+            CandidateJobMatch.tenant_id == tenant_id,
+            CandidateJobMatch.job_posting_id == job_id
+        )
+        if min_score is not None:
+            query = query.filter(CandidateJobMatch.match_score >= min_score)
+        if status:
+            query = query.filter(CandidateJobMatch.status == status)
+        if candidate_status:
+            query = query.filter(Candidate.status == candidate_status)
+        if position is not None:
+            score, candidate_id = position
+            query = query.filter(or_(
+                CandidateJobMatch.match_score < score,
+                and_(CandidateJobMatch.match_score == score, CandidateJobMatch.candidate_id > candidate_id)
+            ))
+
+        matches = query.order_by(
+            CandidateJobMatch.match_score.desc(), CandidateJobMatch.candidate_id
+        ).limit(limit + 1).all()
+
+        items = [self._item(match) for match in matches[:limit]]
+        return {'recommendations': items, 'next_cursor': self.next_cursor(items, len(matches) > limit)}
+
+    @staticmethod
+    def next_cursor(items: List[Dict], has_more: bool) -> Optional[str]:
+        if not items or not has_more:
+            return None
+        last = items[-1]
+        return encode_cursor(last['compatibility_score'], last['candidate']['id'])
+
+    @staticmethod
+    def _item(match) -> Dict:
+        breakdown = json.loads(match.ai_analysis) if match.ai_analysis else None
+        return recommendation_item(match.candidate, match.match_score, breakdown, match.status)
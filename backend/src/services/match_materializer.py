@@ -0,0 +1,252 @@
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+from src.models import db, Candidate, CandidateJobMatch, JobPosting, MatchDirtyMark, ResponseCacheGeneration, TenantStat
+from src.services.feature_store import CandidateFeatureStore
+from src.services.match_store import MatchStore
+
+logger = logging.getLogger(__name__)
+
+# Colunas do candidato usadas na pontuação (o currículo entra pelas características)
+SCORING_COLUMNS = (Candidate.id, Candidate.tenant_id, Candidate.skills, Candidate.experience_years,
+                   Candidate.location, Candidate.salary_expectation)
+
+
+class MatchMaterializer:
+    """Mantém um CandidateJobMatch para cada par (candidato, vaga ativa) do tenant.
+
+    As alterações de candidatos e vagas viram marcas em match_dirty_marks (eventos
+    do SQLAlchemy); process_dirty recalcula apenas os pares afetados e rebuild
+    recalcula a matriz inteira. Os candidatos são lidos em lotes e cada lote é
+    pontuado contra as vagas de uma vez pelo BatchScoringEngine. Quando uma
+    vaga deixa de estar ativa, seus pares ainda não revisados (status
+    'pending') são removidos, para não contarem no ranking nem no dashboard;
+    pares revisados guardam a decisão do recrutador e são mantidos.
+    """
+
+    CHUNK_SIZE = 500
+    ACTIVE_STATUS = 'active'
+    # IDs por DELETE ... IN ao consumir as marcas
+    MARK_DELETE_CHUNK_SIZE = 500
+
+    def __init__(self, feature_store: Optional[CandidateFeatureStore] = None, chunk_size: int = CHUNK_SIZE):
+        self.feature_store = feature_store or CandidateFeatureStore()
+        self.ai_service = self.feature_store.ai_service
+        self.chunk_size = chunk_size
+
+    def rebuild(self, tenant_id: Optional[int] = None) -> Dict:
+        """Recalcula todos os pares (candidato, vaga ativa) do tenant, ou de todos os tenants."""
+        stats = self._new_stats()
+        # A reconstrução cobre as marcas já gravadas; as que chegarem durante ela ficam para process_dirty
+        query = db.session.query(MatchDirtyMark.id)
+        if tenant_id is not None:
+            query = query.filter(MatchDirtyMark.tenant_id == tenant_id)
+        mark_ids = [row.id for row in query]
+
+        stats['pruned'] += self._prune_inactive(tenant_id)
+        for tenant in self._tenants_with_active_jobs(tenant_id):
+            jobs = self._active_jobs(tenant)
+            self._materialize(tenant, jobs, None, stats)
+
+        self._clear_marks(mark_ids)
+        db.session.commit()
+        return self._finish(stats)
+
+    def process_dirty(self, tenant_id: Optional[int] = None, max_marks: int = 10000) -> Dict:
+        """Recalcula apenas os pares afetados pelas marcas pendentes."""
+        stats = self._new_stats()
+        query = MatchDirtyMark.query.order_by(MatchDirtyMark.id)
+        if tenant_id is not None:
+            query = query.filter(MatchDirtyMark.tenant_id == tenant_id)
+        marks = query.limit(max_marks).all()
+        if not marks:
+            return self._finish(stats)
+
+        mark_ids = [mark.id for mark in marks]
+        dirty = defaultdict(lambda: (set(), set()))
+        for mark in marks:
+            candidate_ids, job_ids = dirty[mark.tenant_id]
+            if mark.candidate_id is not None:
+                candidate_ids.add(mark.candidate_id)
+            if mark.job_posting_id is not None:
+                job_ids.add(mark.job_posting_id)
+        stats['marks'] = len(marks)
+
+        for tenant, (candidate_ids, job_ids) in dirty.items():
+            jobs = self._active_jobs(tenant)
+            active_ids = {job['id'] for job in jobs}
+            # Vagas marcadas que deixaram de estar ativas (ou foram excluídas)
+            inactive_ids = sorted(job_ids - active_ids)
+            if inactive_ids:
+                stats['pruned'] += self._prune_inactive(tenant, inactive_ids)
+            dirty_jobs = [job for job in jobs if job['id'] in job_ids]
+            clean_jobs = [job for job in jobs if job['id'] not in job_ids]
+            # Vagas alteradas: contra todos os candidatos
+            if dirty_jobs:
+                self._materialize(tenant, dirty_jobs, None, stats)
+            # Candidatos alterados: contra as demais vagas ativas
+            if clean_jobs and candidate_ids:
+                self._materialize(tenant, clean_jobs, sorted(candidate_ids), stats)
+
+        self._clear_marks(mark_ids)
+        db.session.commit()
+        return self._finish(stats)
+
+    def materialize_job(self, tenant_id: int, job_id: int, only_missing: bool = False) -> Dict:
+        """Recalcula os pares de uma vaga ativa contra todos os candidatos do tenant.
+
+        Com `only_missing`, só age se a vaga ainda não tiver nenhuma linha.
+        """
+        stats = self._new_stats()
+        if only_missing and CandidateJobMatch.query.filter_by(job_posting_id=job_id).first() is not None:
+            return self._finish(stats)
+        self._materialize(tenant_id, self._active_jobs(tenant_id, [job_id]), None, stats)
+        db.session.commit()
+        return self._finish(stats)
+
+    def pending_marks(self, tenant_id: Optional[int] = None) -> int:
+        query = MatchDirtyMark.query
+        if tenant_id is not None:
+            query = query.filter(MatchDirtyMark.tenant_id == tenant_id)
+        return query.count()
+
+    def _materialize(self, tenant_id: int, jobs: List[Dict], candidate_ids: Optional[List[int]], stats: Dict) -> None:
+        if not jobs:
+            return
+        for candidates in self._candidate_chunks(tenant_id, candidate_ids):
+            features = self.feature_store.get_many(candidates)
+            candidates_data = [self._candidate_data(candidate, features[candidate.id]) for candidate in candidates]
+            ids = [candidate.id for candidate in candidates]
+
+            for job in jobs:
+                scores = self.ai_service.scoring_engine.score(job['data'], candidates_data, job['features'])
+                breakdowns = MatchStore.breakdowns(scores, len(ids))
+                stats['pairs'] += MatchStore.save_many(tenant_id, job['id'], dict(zip(ids, breakdowns)))
+
+            stats['candidates'] += len(candidates)
+            db.session.commit()
+            # Libera os objetos do lote; as vagas já estão em dicionários
+            db.session.expunge_all()
+        stats['jobs'] += len(jobs)
+
+    def _candidate_chunks(self, tenant_id: int, candidate_ids: Optional[List[int]]) -> Iterable[List]:
+        """Candidatos do tenant em lotes por ID, lendo apenas as colunas da pontuação."""
+        query = Candidate.query.options(load_only(*SCORING_COLUMNS)).filter(Candidate.tenant_id == tenant_id)
+        if candidate_ids is not None:
+            for start in range(0, len(candidate_ids), self.chunk_size):
+                chunk = query.filter(Candidate.id.in_(candidate_ids[start:start + self.chunk_size])) \
+                    .order_by(Candidate.id).all()
+                if chunk:
+                    yield chunk
+            return
+
+        last_id = 0
+        while True:
+            chunk = query.filter(Candidate.id > last_id).order_by(Candidate.id).limit(self.chunk_size).all()
+            if not chunk:
+                return
+            last_id = chunk[-1].id
+            yield chunk
+
+    def _active_jobs(self, tenant_id: int, job_ids: Optional[List[int]] = None) -> List[Dict]:
+        """Vagas ativas do tenant (ou só as de `job_ids`) convertidas em dados e características de pontuação."""
+        jobs = []
+        query = JobPosting.query.filter_by(tenant_id=tenant_id, status=self.ACTIVE_STATUS)
+        if job_ids is not None:
+            query = query.filter(JobPosting.id.in_(job_ids))
+        for job in query.order_by(JobPosting.id):
+            job_data = {
+                'title': job.title,
+                'description': job.description,
+                'requirements': job.requirements,
+                'experience_level': job.experience_level,
+                'location': job.location,
+                'remote_work': job.remote_work,
+                'salary_min': job.salary_min,
+                'salary_max': job.salary_max
+            }
+            jobs.append({
+                'id': job.id,
+                'data': job_data,
+                'features': self.ai_service.job_features(job_data, job.id, job.updated_at)
+            })
+        return jobs
+
+    def _tenants_with_active_jobs(self, tenant_id: Optional[int]) -> List[int]:
+        query = db.session.query(JobPosting.tenant_id).filter(JobPosting.status == self.ACTIVE_STATUS).distinct()
+        if tenant_id is not None:
+            query = query.filter(JobPosting.tenant_id == tenant_id)
+        return sorted(row[0] for row in query)
+
+    @staticmethod
+    def _candidate_data(candidate, features: Dict) -> Dict:
+        return {
+            'id': candidate.id,
+            'skills': candidate.skills,
+            'features': features,
+            'experience_years': candidate.experience_years,
+            'location': candidate.location,
+            'salary_expectation': candidate.salary_expectation
+        }
+
+    def _prune_inactive(self, tenant_id: Optional[int], job_ids: Optional[List[int]] = None) -> int:
+        """Remove os pares não revisados das vagas que não estão ativas; retorna quantos.
+
+        Sem job_ids, considera todas as vagas inativas do tenant (ou de todos). O
+        DELETE é feito com Core, então tenant_stats é ajustado aqui, a partir das
+        linhas efetivamente removidas.
+        """
+        table = CandidateJobMatch.__table__
+        inactive = select(JobPosting.id).where(JobPosting.status != self.ACTIVE_STATUS)
+        if tenant_id is not None:
+            inactive = inactive.where(JobPosting.tenant_id == tenant_id)
+        if job_ids is not None:
+            inactive = inactive.where(JobPosting.id.in_(job_ids))
+        conditions = (table.c.job_posting_id.in_(inactive), table.c.status == 'pending')
+
+        if db.session.get_bind().dialect.delete_returning:
+            removed = db.session.execute(
+                table.delete().where(*conditions).returning(table.c.tenant_id, table.c.match_score)
+            ).all()
+        else:
+            removed = db.session.execute(
+                select(table.c.tenant_id, table.c.match_score).where(*conditions).with_for_update()
+            ).all()
+            db.session.execute(table.delete().where(*conditions))
+
+        deltas = defaultdict(int)
+        for removed_tenant, score in removed:
+            deltas[(removed_tenant, 'total', 'matches')] -= 1
+            deltas[(removed_tenant, 'score_bucket', TenantStat.bucket_for(score))] -= 1
+        TenantStat.increment(db.session.connection(), deltas)
+        for removed_tenant in {row[0] for row in removed}:
+            ResponseCacheGeneration.mark(db.session, removed_tenant, 'matches')
+        return len(removed)
+
+    @classmethod
+    def _clear_marks(cls, mark_ids: List[int]) -> None:
+        """Remove exatamente as marcas processadas.
+
+        Não usa um intervalo de IDs: no Postgres a sequência é reservada antes do
+        commit, então uma marca confirmada depois da leitura pode ter ID menor que
+        o maior lido e seria apagada sem ter sido processada.
+        """
+        table = MatchDirtyMark.__table__
+        for start in range(0, len(mark_ids), cls.MARK_DELETE_CHUNK_SIZE):
+            db.session.execute(table.delete().where(table.c.id.in_(mark_ids[start:start + cls.MARK_DELETE_CHUNK_SIZE])))
+
+    @staticmethod
+    def _new_stats() -> Dict:
+        return {'pairs': 0, 'jobs': 0, 'candidates': 0, 'marks': 0, 'pruned': 0, '_started': time.perf_counter()}
+
+    @staticmethod
+    def _finish(stats: Dict) -> Dict:
+        seconds = time.perf_counter() - stats.pop('_started')
+        stats['seconds'] = round(seconds, 3)
+        stats['pairs_per_second'] = round(stats['pairs'] / seconds, 1) if seconds and stats['pairs'] else 0.0
+        logger.info('Matriz de compatibilidade: %s', stats)
+        return stats
@@ -0,0 +1,181 @@
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models import db, CandidateJobMatch, ResponseCacheGeneration, TenantStat
+
+# Dialetos com INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert
+}
+
+
+class MatchStore:
+    """Persistência dos resultados de compatibilidade em candidate_job_matches."""
+
+    # Limite de parâmetros por cláusula IN (o SQLite aceita poucos por consulta)
+    QUERY_CHUNK_SIZE = 500
+    # Linhas por execução do upsert
+    UPSERT_CHUNK_SIZE = 5000
+
+    @classmethod
+    def save_many(cls, tenant_id: int, job_id: int, scores: Dict[int, Dict]) -> int:
+        """Grava o score de vários candidatos para uma vaga (candidate_id -> detalhamento).
+
+        O commit fica a cargo de quem chamou. Retorna quantos pares foram gravados.
+        """
+        return cls.upsert_many(
+            {'tenant_id': tenant_id, 'candidate_id': candidate_id, 'job_posting_id': job_id, 'breakdown': breakdown}
+            for candidate_id, breakdown in scores.items()
+        )
+
+    @classmethod
+    def upsert_many(cls, matches: Iterable[Dict]) -> int:
+        """Insere ou atualiza pares (tenant_id, candidate_id, job_posting_id, breakdown).
+
+        No SQLite e no Postgres os pares novos entram por
+        INSERT ... ON CONFLICT DO NOTHING RETURNING e os já existentes são
+        travados (FOR UPDATE) e atualizados por
+        INSERT ... ON CONFLICT (candidate_id, job_posting_id) DO UPDATE, apoiado na
+        restrição unique_candidate_job_match. Score e detalhamento são atualizados;
+        status e revisão dos pares existentes são preservados. Em outros bancos
+        cai na leitura dos existentes seguida de UPDATE/INSERT pelo ORM.
+        O commit fica a cargo de quem chamou.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                'tenant_id': match['tenant_id'],
+                'candidate_id': match['candidate_id'],
+                'job_posting_id': match['job_posting_id'],
+                'match_score': match['breakdown']['overall_score'],
+                'ai_analysis': json.dumps(match['breakdown']),
+                'status': 'pending',
+                'created_at': now,
+                'updated_at': now
+            }
+            for match in matches
+        ]
+        if not rows:
+            return 0
+
+        dialect = db.session.get_bind().dialect.name
+        insert = UPSERT_DIALECTS.get(dialect)
+        if insert is None:
+            cls._save_with_orm(rows)
+            return len(rows)
+
+        for tenant_id in {row['tenant_id'] for row in rows}:
+            ResponseCacheGeneration.mark(db.session, tenant_id, 'matches')
+
+        # O upsert não passa pelo ORM: total e histograma de tenant_stats são ajustados aqui,
+        # a partir das linhas que cada comando efetivamente inseriu ou encontrou travadas
+        deltas = defaultdict(int)
+        table = CandidateJobMatch.__table__
+
+        # 1. Pares novos: só a transação que de fato inseriu a linha a conta, mesmo
+        #    com upserts concorrentes do mesmo par
+        new_pairs = insert(table).on_conflict_do_nothing(index_elements=['candidate_id', 'job_posting_id']) \
+            .returning(table.c.candidate_id, table.c.job_posting_id)
+        inserted = set()
+        for start in range(0, len(rows), cls.UPSERT_CHUNK_SIZE):
+            inserted.update(
+                (row.candidate_id, row.job_posting_id)
+                for row in db.session.execute(new_pairs, rows[start:start + cls.UPSERT_CHUNK_SIZE])
+            )
+        existing = []
+        for row in rows:
+            if (row['candidate_id'], row['job_posting_id']) in inserted:
+                deltas[(row['tenant_id'], 'total', 'matches')] += 1
+                deltas[(row['tenant_id'], 'score_bucket', TenantStat.bucket_for(row['match_score']))] += 1
+            else:
+                existing.append(row)
+
+        # 2. Pares existentes: o score anterior é lido com a linha travada até o commit
+        if existing:
+            cls._count_bucket_moves(existing, deltas)
+            statement = insert(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=['candidate_id', 'job_posting_id'],
+                set_={
+                    'match_score': statement.excluded.match_score,
+                    'ai_analysis': statement.excluded.ai_analysis,
+                    'updated_at': statement.excluded.updated_at
+                }
+            )
+            # Um comando compilado uma vez e executado em lote (executemany): o
+            # SQLAlchemy agrupa as linhas em INSERTs de múltiplos VALUES no Postgres
+            # e o sqlite3 reaproveita o comando preparado
+            for start in range(0, len(existing), cls.UPSERT_CHUNK_SIZE):
+                db.session.execute(statement, existing[start:start + cls.UPSERT_CHUNK_SIZE])
+
+        TenantStat.increment(db.session.connection(), deltas)
+        return len(rows)
+
+    @classmethod
+    def _count_bucket_moves(cls, rows: List[Dict], deltas: Dict) -> None:
+        """Mudanças de faixa do score dos pares existentes, lidos com FOR UPDATE."""
+        by_job: Dict[int, Dict[int, Dict]] = {}
+        for row in rows:
+            by_job.setdefault(row['job_posting_id'], {})[row['candidate_id']] = row
+
+        for job_id, job_rows in by_job.items():
+            candidate_ids = list(job_rows)
+            for start in range(0, len(candidate_ids), cls.QUERY_CHUNK_SIZE):
+                chunk_ids = candidate_ids[start:start + cls.QUERY_CHUNK_SIZE]
+                previous = dict(db.session.execute(
+                    select(CandidateJobMatch.candidate_id, CandidateJobMatch.match_score).where(
+                        CandidateJobMatch.job_posting_id == job_id,
+                        CandidateJobMatch.candidate_id.in_(chunk_ids)
+                    ).with_for_update()
+                ).all())
+                for candidate_id in chunk_ids:
+                    row = job_rows[candidate_id]
+                    bucket = TenantStat.bucket_for(row['match_score'])
+                    if candidate_id not in previous:
+                        # Excluído por outra transação depois do passo 1: o upsert o insere de novo
+                        deltas[(row['tenant_id'], 'total', 'matches')] += 1
+                        deltas[(row['tenant_id'], 'score_bucket', bucket)] += 1
+                    elif TenantStat.bucket_for(previous[candidate_id]) != bucket:
+                        deltas[(row['tenant_id'], 'score_bucket', TenantStat.bucket_for(previous[candidate_id]))] -= 1
+                        deltas[(row['tenant_id'], 'score_bucket', bucket)] += 1
+
+    @classmethod
+    def _save_with_orm(cls, rows: List[Dict]) -> None:
+        by_job: Dict[int, Dict[int, Dict]] = {}
+        for row in rows:
+            by_job.setdefault(row['job_posting_id'], {})[row['candidate_id']] = row
+
+        for job_id, job_rows in by_job.items():
+            candidate_ids = list(job_rows)
+            for start in range(0, len(candidate_ids), cls.QUERY_CHUNK_SIZE):
+                chunk_ids = candidate_ids[start:start + cls.QUERY_CHUNK_SIZE]
+                existing = {
+                    match.candidate_id: match
+                    for match in CandidateJobMatch.query.filter(
+                        CandidateJobMatch.job_posting_id == job_id,
+                        CandidateJobMatch.candidate_id.in_(chunk_ids)
+                    )
+                }
+                for candidate_id in chunk_ids:
+                    row = job_rows[candidate_id]
+                    match = existing.get(candidate_id)
+                    if match is None:
+                        match = CandidateJobMatch(tenant_id=row['tenant_id'], candidate_id=candidate_id,
+                                                  job_posting_id=job_id)
+                        db.session.add(match)
+                    match.match_score = row['match_score']
+                    match.ai_analysis = row['ai_analysis']
+
+    @staticmethod
+    def breakdowns(scores: Dict, count: int) -> List[Dict]:
+        """Converte os arrays do BatchScoringEngine em um detalhamento por candidato."""
+        rows = []
+        for index in range(count):
+            breakdown = {key: float(values[index]) for key, values in scores.items()}
+            breakdown['overall_score'] = round(breakdown['overall_score'], 2)
+            rows.append(breakdown)
+        return rows
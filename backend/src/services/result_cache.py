@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict
+
+from flask import has_app_context
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models import db, AIResult
+
+# Resultados mantidos em memória em cada worker
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '4096'))
+
+# Dialetos com INSERT ... ON CONFLICT DO NOTHING
+INSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert
+}
+
+
+def _normalize(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f'Tipo não serializável na chave do cache: {type(value).__name__}')
+
+
+def stable_hash(operation: str, version: str, inputs: Dict) -> str:
+    """SHA-256 de operação, versão e entradas, independente da ordem das chaves."""
+    payload = json.dumps([operation, version, inputs], sort_keys=True, separators=(',', ':'), default=_normalize)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """Cache de resultados de funções puras, endereçado pelo hash das entradas.
+
+    Duas camadas: LRU em memória no processo e a tabela ai_results, compartilhada
+    entre workers. A camada do banco só é usada dentro de um app context; a
+    gravação vai para a sessão atual e o commit fica a cargo de quem chamou.
+    Os valores são guardados serializados, então cada leitura devolve uma cópia.
+    """
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, operation: str, version: str, inputs: Dict, compute: Callable[[], Dict]) -> Dict:
+        key = stable_hash(operation, version, inputs)
+
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(body)
+
+        use_db = has_app_context()
+        if use_db:
+            record = db.session.get(AIResult, key)
+            if record is not None:
+                with self._lock:
+                    self.db_hits += 1
+                self._remember(key, record.value)
+                return json.loads(record.value)
+
+        with self._lock:
+            self.misses += 1
+        value = compute()
+        body = json.dumps(value, default=_normalize)
+        self._remember(key, body)
+        if use_db:
+            self._store(key, operation, body)
+        return json.loads(body)
+
+    def _remember(self, key: str, body: str) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _store(key: str, operation: str, body: str) -> None:
+        row = {'key': key, 'operation': operation, 'value': body, 'created_at': datetime.utcnow()}
+        insert = INSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+        if insert is not None:
+            # Outra requisição pode ter gravado a mesma chave (mesmo valor) no meio tempo
+            db.session.execute(insert(AIResult).values(row).on_conflict_do_nothing(index_elements=['key']))
+        elif db.session.get(AIResult, key) is None:
+            db.session.add(AIResult(**row))
+
+    def purge(self, max_age_days: int) -> int:
+        """Remove do banco os resultados gravados há mais de `max_age_days` dias."""
+        cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+        deleted = AIResult.query.filter(AIResult.created_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    def clear(self) -> None:
+        """Esvazia a camada em memória e zera os contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.memory_hits = 0
+            self.db_hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'memory_hits': self.memory_hits,
+                'db_hits': self.db_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.memory_hits + self.db_hits) / lookups, 4) if lookups else None
+            }
+
+
+# Instância compartilhada pelas rotas do worker
+result_cache = ResultCache()
@@ -0,0 +1,175 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.services.skill_matcher import SkillMatcher, load_skill_matcher
+
+# Padrões de anos de experiência, em ordem de prioridade
+EXPERIENCE_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'(\d+)\s*(?:years?|anos?)\s*(?:of\s*)?(?:experience|experiência)',
+    r'(\d+)\+\s*(?:years?|anos?)',
+    r'(\d+)\s*(?:years?|anos?)\s*(?:in|em)',
+))
+
+EDUCATION_KEYWORDS = ('bachelor', 'master', 'phd', 'degree', 'university', 'college', 'graduation')
+
+# Certificações (simplificado): "certified X", "certification in X" e "X certified"
+CERTIFIED_BEFORE = re.compile(r'certified?\s+(\w+)')
+CERTIFICATION_IN = re.compile(r'certification\s+in\s+(\w+)')
+CERTIFIED_AFTER_LITERAL = 'certifie'
+
+# Pontos do texto onde algum padrão pode começar. Cada ramo consome no máximo um
+# caractere, então gatilhos sobrepostos (ex.: "phd" e "degree" em "phdegree")
+# não escondem uns aos outros.
+TRIGGERS = re.compile(
+    r'(?P<number>(?<!\d)\d)'
+    r'|(?P<cert>c(?=ertifi))'
+    r'|(?=(?P<education>' + '|'.join(map(re.escape, EDUCATION_KEYWORDS)) + r'))[\s\S]'
+)
+
+
+class ResumeAnalyzer:
+    """Analisa currículos com padrões compilados na importação do módulo.
+
+    O texto é convertido para minúsculas uma única vez; as habilidades vêm do
+    SkillMatcher e experiência, educação e certificações são coletadas em uma
+    única varredura pelos gatilhos, aplicando cada padrão apenas nas posições
+    onde ele pode casar. O resultado é o mesmo da análise anterior, que usava
+    re.search/re.findall separados para cada padrão.
+    """
+
+    # Incrementar sempre que a saída de analyze mudar (invalida o ResultCache)
+    VERSION = 1
+
+    def __init__(self, skill_matcher: Optional[SkillMatcher] = None):
+        self.skill_matcher = skill_matcher or load_skill_matcher()
+
+    @property
+    def version(self) -> str:
+        """Versão da análise: analisador + taxonomia de habilidades."""
+        return f'{self.VERSION}.{self.skill_matcher.version}'
+
+    def analyze(self, resume_text: str) -> Dict:
+        """Extrai habilidades, experiência, educação e certificações de um currículo."""
+        if not resume_text:
+            return {}
+
+        text_lower = resume_text.lower()
+        experience_years, education, certifications = self._scan(text_lower)
+        return {
+            'skills': self.skill_matcher.find_in_lowered(text_lower),
+            'experience_years': experience_years,
+            'education_keywords': [keyword for keyword in EDUCATION_KEYWORDS if keyword in education],
+            'certifications': certifications,
+            'languages': []
+        }
+
+    def analyze_many(self, texts: Iterable[str]) -> List[Dict]:
+        """Analisa vários currículos, na mesma ordem recebida."""
+        analyze = self.analyze
+        return [analyze(text) for text in texts]
+
+    def candidate_features(self, skills: Optional[str], resume_text: Optional[str],
+                           resume_analysis: Optional[Dict] = None) -> Dict:
+        """Características persistidas de um candidato (ver CandidateFeatureStore)."""
+        if resume_analysis is None:
+            resume_analysis = self.analyze(resume_text or '')
+        return {
+            'skills': self.skill_matcher.find_all((skills or '') + ' ' + (resume_text or '')),
+            'experience_years': resume_analysis.get('experience_years'),
+            'certifications': resume_analysis.get('certifications', []),
+            'education_keywords': resume_analysis.get('education_keywords', [])
+        }
+
+    def experience_years(self, text: str) -> Optional[int]:
+        """Anos de experiência declarados no texto, se houver."""
+        if not text:
+            return None
+        return self._scan(text.lower())[0]
+
+    @staticmethod
+    def _scan(text: str):
+        # Primeiro resultado de cada padrão de experiência (equivalente a re.search)
+        experience: List[Optional[int]] = [None] * len(EXPERIENCE_PATTERNS)
+        education = set()
+        # Cada padrão de certificação emula re.findall: só aceita casamentos que
+        # começam depois do fim do anterior do mesmo padrão
+        before, certification_in, after = [], [], []
+        before_end = certification_in_end = after_end = 0
+
+        for trigger in TRIGGERS.finditer(text):
+            kind = trigger.lastgroup
+            start = trigger.start()
+
+            if kind == 'number':
+                # Uma sequência de dígitos só casa a partir do seu primeiro dígito
+                if experience[0] is None:
+                    for index, pattern in enumerate(EXPERIENCE_PATTERNS):
+                        if experience[index] is None:
+                            match = pattern.match(text, start)
+                            if match:
+                                experience[index] = int(match.group(1))
+
+            elif kind == 'cert':
+                if start >= before_end:
+                    match = CERTIFIED_BEFORE.match(text, start)
+                    if match:
+                        before.append(match.group(1))
+                        before_end = match.end()
+                if start >= certification_in_end:
+                    match = CERTIFICATION_IN.match(text, start)
+                    if match:
+                        certification_in.append(match.group(1))
+                        certification_in_end = match.end()
+                if text.startswith(CERTIFIED_AFTER_LITERAL, start):
+                    word, end = ResumeAnalyzer._word_before(text, start, after_end)
+                    if word:
+                        after.append(word)
+                        after_end = end
+
+            else:
+                education.add(trigger.group('education'))
+
+        experience_years = next((years for years in experience if years is not None), None)
+        certifications = list(dict.fromkeys(before + certification_in + after))
+        return experience_years, education, certifications
+
+    @staticmethod
+    def _word_before(text: str, start: int, lower_bound: int):
+        """Emula r'(\\w+)\\s+certified?' com o "certifie" em `start`.
+
+        Volta pelos espaços e pela palavra anterior sem ultrapassar `lower_bound`
+        (fim do casamento anterior). Retorna a palavra e o fim do casamento.
+        """
+        position = start
+        while position > lower_bound and text[position - 1].isspace():
+            position -= 1
+        word_end = position
+        if word_end == start:
+            return None, None
+        while position > lower_bound and (text[position - 1].isalnum() or text[position - 1] == '_'):
+            position -= 1
+        if position == word_end:
+            return None, None
+
+        end = start + len(CERTIFIED_AFTER_LITERAL)
+        if text.startswith('d', end):
+            end += 1
+        return text[position:word_end], end
+
+
+_process_analyzer: Optional[ResumeAnalyzer] = None
+
+
+def analyze_candidate_batch(rows: List[Tuple[int, Optional[str], Optional[str]]]) -> List[Tuple[int, Dict]]:
+    """Calcula as características de um lote de (id, skills, resume_text).
+
+    Executada nos processos do ProcessPoolExecutor da análise em massa; o
+    analisador é criado uma vez por processo e o módulo não depende do banco.
+    """
+    global _process_analyzer
+    if _process_analyzer is None:
+        _process_analyzer = ResumeAnalyzer()
+    return [
+        (candidate_id, _process_analyzer.candidate_features(skills, resume_text))
+        for candidate_id, skills, resume_text in rows
+    ]
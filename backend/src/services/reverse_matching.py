@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import load_only
+from src.models import JobPosting
+from src.services.job_features import job_feature_cache
+from src.services.scoring_engine import parse_job_features
+from src.utils.timing import stage
+
+# Colunas da vaga lidas em toda consulta; descrição e requisitos só em falta no cache
+JOB_COLUMNS = (JobPosting.id, JobPosting.title, JobPosting.department, JobPosting.location,
+               JobPosting.employment_type, JobPosting.experience_level, JobPosting.salary_min,
+               JobPosting.salary_max, JobPosting.remote_work, JobPosting.status, JobPosting.updated_at)
+
+
+class ReverseMatcher:
+    """Pontua um candidato contra todas as vagas ativas do tenant de uma vez.
+
+    As características de cada vaga vêm do JobFeatureCache (chave id + updated_at);
+    o texto das vagas só é lido do banco, em uma única consulta, para as que
+    faltam no cache. A pontuação é feita pelo BatchScoringEngine.score_jobs.
+    """
+
+    def __init__(self, ai_service):
+        self.ai_service = ai_service
+
+    def active_jobs(self, tenant_id: int) -> List[JobPosting]:
+        return (JobPosting.query
+                .options(load_only(*JOB_COLUMNS))
+                .filter_by(tenant_id=tenant_id, status='active')
+                .order_by(JobPosting.id)
+                .all())
+
+    def job_features(self, jobs: List[JobPosting]) -> List[Optional[Dict]]:
+        """Características de cada vaga, na mesma ordem da lista.
+
+        None para as vagas excluídas entre a consulta de `jobs` e a leitura dos textos.
+        """
+        features = [job_feature_cache.get((job.id, job.updated_at)) for job in jobs]
+        missing = [index for index, value in enumerate(features) if value is None]
+        if missing:
+            texts = {
+                row.id: row for row in JobPosting.query
+                .with_entities(JobPosting.id, JobPosting.description, JobPosting.requirements)
+                .filter(JobPosting.id.in_([jobs[index].id for index in missing]))
+            }
+            for index in missing:
+                job = jobs[index]
+                text = texts.get(job.id)
+                if text is None:
+                    continue
+                features[index] = parse_job_features({
+                    'description': text.description,
+                    'requirements': text.requirements,
+                    'experience_level': job.experience_level,
+                    'location': job.location,
+                    'remote_work': job.remote_work,
+                    'salary_min': job.salary_min,
+                    'salary_max': job.salary_max
+                }, self.ai_service.extract_skills)
+                job_feature_cache.put((job.id, job.updated_at), features[index])
+        return features
+
+    def match(self, tenant_id: int, candidate_data: Dict, limit: Optional[int] = None,
+              min_score: Optional[float] = None) -> List[Dict]:
+        """Vagas ativas ordenadas por compatibilidade (score desc, id asc).
+
+        `candidate_data` segue o formato de calculate_compatibility_score (com ou
+        sem 'features'). Sem `limit` todas as vagas são devolvidas.
+        """
+        if limit is not None and limit <= 0:
+            return []
+        with stage('db'):
+            jobs = self.active_jobs(tenant_id)
+        if not jobs:
+            return []
+
+        with stage('features'):
+            jobs_features = self.job_features(jobs)
+            # Vagas excluídas no meio tempo ficam de fora
+            kept = [index for index, features in enumerate(jobs_features) if features is not None]
+            if len(kept) < len(jobs):
+                jobs = [jobs[index] for index in kept]
+                jobs_features = [jobs_features[index] for index in kept]
+        if not jobs:
+            return []
+        with stage('scoring'):
+            scores = self.ai_service.scoring_engine.score_jobs(candidate_data, jobs_features)
+        with stage('ranking'):
+            indices = self.ai_service.scoring_engine.top_k_indices(
+                scores['overall_score'], len(jobs) if limit is None else limit
+            )
+
+        matches = []
+        for index in indices:
+            breakdown = {key: float(values[index]) for key, values in scores.items()}
+            breakdown['overall_score'] = round(breakdown['overall_score'], 2)
+            if min_score is not None and breakdown['overall_score'] < min_score:
+                # A lista está ordenada: nenhuma vaga seguinte alcança o mínimo
+                break
+            job = jobs[index]
+            matches.append({
+                'job': {
+                    'id': job.id,
+                    'title': job.title,
+                    'department': job.department,
+                    'location': job.location,
+                    'employment_type': job.employment_type,
+                    'experience_level': job.experience_level,
+                    'remote_work': job.remote_work,
+                    'salary_min': float(job.salary_min) if job.salary_min else None,
+                    'salary_max': float(job.salary_max) if job.salary_max else None
+                },
+                'compatibility_score': breakdown['overall_score'],
+                'score_breakdown': breakdown
+            })
+        return matches
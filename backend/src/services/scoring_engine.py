@@ -0,0 +1,263 @@
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from src.utils.timing import stage
+
+# Faixas de anos de experiência esperadas por nível de vaga
+EXPERIENCE_REQUIREMENTS = {
+    'entry': (0, 2),
+    'mid': (2, 5),
+    'senior': (5, 10),
+    'executive': (10, 20)
+}
+
+# Peso de cada dimensão no score geral
+SCORE_WEIGHTS = {
+    'skills_match': 0.4,
+    'experience_match': 0.3,
+    'location_match': 0.15,
+    'salary_match': 0.15
+}
+
+# Incrementar sempre que as regras de pontuação mudarem (invalida o ResultCache)
+SCORING_VERSION = 1
+
+
+def parse_job_features(job_data: Dict, extract_skills: Callable[[str], List[str]]) -> Dict:
+    """Extrai da vaga tudo o que a pontuação usa, para não reprocessar o texto por candidato.
+
+    Os valores são imutáveis (tuplas), pois o mesmo dicionário pode ser
+    compartilhado entre requisições pelo JobFeatureCache.
+    """
+    return {
+        'skills': tuple(extract_skills(
+            (job_data.get('requirements') or '') + ' ' + (job_data.get('description') or '')
+        )),
+        'experience_range': EXPERIENCE_REQUIREMENTS.get(job_data.get('experience_level', 'entry'), (0, 2)),
+        'salary_min': float(job_data.get('salary_min', 0) or 0),
+        'salary_max': float(job_data.get('salary_max', 0) or 0),
+        'location': (job_data.get('location') or '').lower(),
+        'remote_work': job_data.get('remote_work', False)
+    }
+
+
+class BatchScoringEngine:
+    """Calcula a compatibilidade de muitos candidatos com uma vaga usando NumPy.
+
+    Reproduz exatamente as regras de AIService.calculate_compatibility_score, mas
+    monta arrays com os dados de todos os candidatos e calcula cada dimensão em
+    operações vetorizadas.
+    """
+
+    def __init__(self, extract_skills: Callable[[str], List[str]],
+                 extract_experience_years: Callable[[str], Optional[int]]):
+        self.extract_skills = extract_skills
+        self.extract_experience_years = extract_experience_years
+
+    def score(self, job_data: Dict, candidates: List[Dict],
+              job_features: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+        """Retorna um array por dimensão do score (sem arredondar o score geral).
+
+        `job_features` (de parse_job_features) evita reprocessar o texto da vaga.
+        """
+        if job_features is None:
+            job_features = parse_job_features(job_data, self.extract_skills)
+
+        scores = {
+            'skills_match': self._skills_scores(job_features['skills'], candidates),
+            'experience_match': self._experience_scores(job_features, candidates),
+            'location_match': self._location_scores(job_features, candidates),
+            'salary_match': self._salary_scores(job_features, candidates),
+        }
+
+        overall = np.zeros(len(candidates))
+        for key, weight in SCORE_WEIGHTS.items():
+            overall = overall + scores[key] * weight
+        scores['overall_score'] = overall
+        return scores
+
+    def recommend(self, job_data: Dict, candidates: List[Dict], limit: int = 10,
+                  job_features: Optional[Dict] = None) -> List[Dict]:
+        """Retorna os `limit` candidatos mais compatíveis, na mesma ordem da ordenação completa."""
+        if not candidates or limit <= 0:
+            return []
+
+        with stage('scoring'):
+            scores = self.score(job_data, candidates, job_features)
+
+        with stage('ranking'):
+            indices = self.top_k_indices(scores['overall_score'], limit)
+
+            recommendations = []
+            for index in indices:
+                breakdown = {key: float(values[index]) for key, values in scores.items()}
+                breakdown['overall_score'] = round(breakdown['overall_score'], 2)
+                recommendations.append({
+                    'candidate': candidates[index],
+                    'compatibility_score': breakdown['overall_score'],
+                    'score_breakdown': breakdown
+                })
+        return recommendations
+
+    def score_jobs(self, candidate: Dict, jobs_features: List[Dict]) -> Dict[str, np.ndarray]:
+        """Pontua um candidato contra várias vagas: um array por dimensão, uma posição por vaga.
+
+        Caminho inverso de score (uma vaga, muitos candidatos), com as mesmas regras
+        de AIService.calculate_compatibility_score.
+        """
+        features = candidate.get('features')
+        if features is not None:
+            candidate_skills = set(features.get('skills', []))
+        else:
+            candidate_skills = set(self.extract_skills(
+                (candidate.get('skills') or '') + ' ' + (candidate.get('resume_text') or '')
+            ))
+        experience = float(candidate.get('experience_years', 0) or self._inferred_experience(candidate) or 0)
+        location = (candidate.get('location') or '').lower()
+        salary = float(candidate.get('salary_expectation') or 0)
+
+        count = len(jobs_features)
+        skills = np.zeros(count)
+        locations = np.empty(count)
+        min_exp = np.empty(count)
+        max_exp = np.empty(count)
+        salary_min = np.empty(count)
+        salary_max = np.empty(count)
+        for column, job in enumerate(jobs_features):
+            job_skills = job['skills']
+            if candidate_skills and job_skills:
+                skills[column] = min(len(candidate_skills.intersection(job_skills)) / len(job_skills) * 100, 100)
+            job_location = job['location']
+            locations[column] = 100.0 if (job['remote_work'] or location in job_location
+                                          or job_location in location) else 50.0
+            min_exp[column], max_exp[column] = job['experience_range']
+            salary_min[column] = job['salary_min']
+            salary_max[column] = job['salary_max']
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            below = np.where(min_exp > 0, np.maximum(experience / min_exp * 100, 0), 0.0)
+            overage = np.where(salary_max > 0, (salary - salary_max) / salary_max, 0.0)
+        above = np.maximum(100 - (experience - max_exp) * 10, 50)
+        experience_scores = np.where(
+            (min_exp <= experience) & (experience <= max_exp),
+            100.0,
+            np.where(experience > max_exp, above, below)
+        )
+
+        no_salary_data = (salary == 0) | ((salary_min == 0) & (salary_max == 0))
+        acceptable = ((salary_min <= salary) & (salary <= salary_max)) | (salary < salary_min)
+        salary_scores = np.where(no_salary_data, 75.0,
+                                 np.where(acceptable, 100.0, np.maximum(100 - overage * 100, 0)))
+
+        scores = {
+            'skills_match': skills,
+            'experience_match': experience_scores,
+            'location_match': locations,
+            'salary_match': salary_scores,
+        }
+        overall = np.zeros(count)
+        for key, weight in SCORE_WEIGHTS.items():
+            overall = overall + scores[key] * weight
+        scores['overall_score'] = overall
+        return scores
+
+    @staticmethod
+    def top_k_indices(overall: np.ndarray, limit: int) -> List[int]:
+        """Seleciona os índices dos maiores scores com argpartition.
+
+        A ordenação original usa o score arredondado com 2 casas e é estável, então
+        empates mantêm a ordem de entrada. Qualquer candidato cujo score arredondado
+        alcance o do k-ésimo colocado tem score bruto de no máximo 0.01 abaixo dele;
+        esses candidatos formam a lista curta que é ordenada de forma exata.
+        """
+        count = len(overall)
+        if limit < count:
+            kth = np.argpartition(-overall, limit - 1)[limit - 1]
+            shortlist = np.flatnonzero(overall >= overall[kth] - 0.01)
+        else:
+            shortlist = np.arange(count)
+
+        ranked = sorted(
+            (int(index) for index in shortlist),
+            key=lambda index: (-round(float(overall[index]), 2), index)
+        )
+        return ranked[:limit]
+
+    def _skills_scores(self, job_skills: Sequence[str], candidates: List[Dict]) -> np.ndarray:
+        if not job_skills:
+            return np.zeros(len(candidates))
+
+        # Matriz de pertinência candidato x habilidade da vaga
+        columns = {skill: column for column, skill in enumerate(job_skills)}
+        membership = np.zeros((len(candidates), len(columns)), dtype=bool)
+        for row, candidate in enumerate(candidates):
+            features = candidate.get('features')
+            if features is not None:
+                candidate_skills = features.get('skills', [])
+            else:
+                candidate_skills = self.extract_skills(
+                    (candidate.get('skills') or '') + ' ' + (candidate.get('resume_text') or '')
+                )
+            for skill in candidate_skills:
+                column = columns.get(skill)
+                if column is not None:
+                    membership[row, column] = True
+
+        matches = membership.sum(axis=1)
+        return np.minimum(matches / len(job_skills) * 100, 100)
+
+    def _experience_scores(self, job_features: Dict, candidates: List[Dict]) -> np.ndarray:
+        experience = np.array([
+            candidate.get('experience_years', 0) or self._inferred_experience(candidate) or 0
+            for candidate in candidates
+        ], dtype=float)
+
+        min_exp, max_exp = job_features['experience_range']
+        below = np.maximum(experience / min_exp * 100, 0) if min_exp > 0 else np.zeros(len(candidates))
+        above = np.maximum(100 - (experience - max_exp) * 10, 50)
+
+        return np.where(
+            (experience >= min_exp) & (experience <= max_exp),
+            100.0,
+            np.where(experience > max_exp, above, below)
+        )
+
+    def _inferred_experience(self, candidate: Dict) -> Optional[int]:
+        features = candidate.get('features')
+        if features is not None:
+            return features.get('experience_years')
+        return self.extract_experience_years(candidate.get('resume_text') or '')
+
+    @staticmethod
+    def _location_scores(job_features: Dict, candidates: List[Dict]) -> np.ndarray:
+        if job_features['remote_work']:
+            return np.full(len(candidates), 100.0)
+
+        job_location = job_features['location']
+        # A comparação é por substring, então cada localização distinta é avaliada uma vez
+        by_location = {}
+        scores = np.empty(len(candidates))
+        for row, candidate in enumerate(candidates):
+            location = (candidate.get('location') or '').lower()
+            if location not in by_location:
+                by_location[location] = 100.0 if location in job_location or job_location in location else 50.0
+            scores[row] = by_location[location]
+        return scores
+
+    @staticmethod
+    def _salary_scores(job_features: Dict, candidates: List[Dict]) -> np.ndarray:
+        salary = np.array([float(candidate.get('salary_expectation') or 0) for candidate in candidates])
+        salary_min = job_features['salary_min']
+        salary_max = job_features['salary_max']
+
+        if salary_min == 0 and salary_max == 0:
+            return np.full(len(candidates), 75.0)
+
+        if salary_max > 0:
+            overage = (salary - salary_max) / salary_max
+            above = np.maximum(100 - overage * 100, 0)
+        else:
+            above = np.full(len(candidates), 100.0)
+
+        acceptable = ((salary_min <= salary) & (salary <= salary_max)) | (salary < salary_min)
+        return np.where(salary == 0, 75.0, np.where(acceptable, 100.0, above))
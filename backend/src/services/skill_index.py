@@ -0,0 +1,67 @@
+from typing import Dict, Iterable, List
+from sqlalchemy import exists
+from src.models import Candidate, CandidateSkill
+from src.services.scoring_engine import SCORE_WEIGHTS
+
+class SkillIndex:
+    """Índice invertido por tenant: habilidade -> IDs dos candidatos que a possuem.
+
+    As listas ficam na tabela candidate_skills e são mantidas pelo
+    CandidateFeatureStore sempre que as características de um candidato mudam;
+    a exclusão do candidato remove suas entradas por cascata.
+    """
+
+    # Maior score possível para quem não tem nenhuma habilidade da vaga
+    NON_SKILL_CEILING = round(100 * sum(
+        weight for key, weight in SCORE_WEIGHTS.items() if key != 'skills_match'
+    ), 2)
+
+    @staticmethod
+    def sync(candidate, skills: Iterable[str]) -> None:
+        """Ajusta as entradas do candidato no índice para o conjunto de habilidades informado."""
+        desired = set(skills)
+        current = {posting.skill: posting for posting in candidate.skill_postings}
+
+        for skill, posting in current.items():
+            if skill not in desired:
+                candidate.skill_postings.remove(posting)
+
+        for skill in desired - set(current):
+            candidate.skill_postings.append(CandidateSkill(tenant_id=candidate.tenant_id, skill=skill))
+
+    @staticmethod
+    def has_any_skill(skills: List[str]):
+        """Condição SQL: o candidato possui ao menos uma das habilidades."""
+        return exists().where(
+            CandidateSkill.candidate_id == Candidate.id,
+            CandidateSkill.tenant_id == Candidate.tenant_id,
+            CandidateSkill.skill.in_(skills)
+        )
+
+    @classmethod
+    def shortlist_query(cls, tenant_id: int, skills: List[str]):
+        """Candidatos do tenant presentes nas listas das habilidades da vaga."""
+        return Candidate.query.filter(
+            Candidate.tenant_id == tenant_id,
+            cls.has_any_skill(skills)
+        ).order_by(Candidate.id)
+
+    @classmethod
+    def outsiders_query(cls, tenant_id: int, skills: List[str]):
+        """Candidatos do tenant sem nenhuma das habilidades da vaga."""
+        return Candidate.query.filter(
+            Candidate.tenant_id == tenant_id,
+            ~cls.has_any_skill(skills)
+        ).order_by(Candidate.id)
+
+    @classmethod
+    def needs_outsiders(cls, recommendations: List[Dict], limit: int) -> bool:
+        """Indica se candidatos fora do índice ainda podem entrar no top-k.
+
+        Eles têm skills_match igual a zero, então só alcançam o top-k se o k-ésimo
+        score da lista curta não superar o teto dado pelos demais pesos (empates
+        também contam, pois a ordem final desempata pelo ID do candidato).
+        """
+        if len(recommendations) < limit:
+            return True
+        return recommendations[limit - 1]['compatibility_score'] <= cls.NON_SKILL_CEILING
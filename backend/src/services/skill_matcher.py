@@ -0,0 +1,100 @@
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_TAXONOMY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'skills_taxonomy.json'
+)
+
+
+class SkillMatcher:
+    """Encontra habilidades de uma taxonomia em uma única passada sobre o texto."""
+
+    def __init__(self, categories: Dict[str, Iterable[str]], version: int = 1):
+        self.version = version
+        self.categories: Dict[str, List[str]] = {}
+        self._canonical: Dict[str, str] = {}
+
+        for category, skills in categories.items():
+            self.categories[category] = []
+            for skill in skills:
+                key = self._normalize(skill)
+                if not key or key in self._canonical:
+                    continue
+                self._canonical[key] = skill.lower()
+                self.categories[category].append(skill.lower())
+
+        self.skills: List[str] = list(self._canonical.values())
+        self.pattern_source = self._build_trie_pattern(self._canonical)
+        # Limites de palavra explícitos para evitar "java" dentro de "javascript".
+        # \b só é seguro no início quando todos os termos começam com caractere de palavra.
+        leading = r'\b' if all(re.match(r'\w', term) for term in self._canonical) else r'(?<!\w)'
+        self.pattern = re.compile(leading + self.pattern_source + r'(?!\w)') if self._canonical else None
+
+    @staticmethod
+    def _build_trie_pattern(terms: Iterable[str]) -> str:
+        """Monta uma alternação fatorada por prefixo (trie).
+
+        Assim o motor de regex testa um caractere por nível em vez de tentar cada
+        habilidade em cada posição do texto, e o custo quase não cresce com o
+        tamanho da taxonomia.
+        """
+        trie: Dict = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        def build(node: Dict) -> str:
+            branches = []
+            for char in sorted(key for key in node if key):
+                piece = r'\s+' if char == ' ' else re.escape(char)
+                branches.append(piece + build(node[char]))
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            # Um termo que termina aqui torna o restante opcional; o (?!\w) final
+            # garante que só aceitamos o prefixo quando ele é uma palavra inteira.
+            return '(?:' + body + ')?' if '' in node else body
+
+        return '(?:' + build(trie) + ')'
+
+    @staticmethod
+    def _normalize(term: str) -> str:
+        return ' '.join(term.lower().split())
+
+    def find_all(self, text: str) -> List[str]:
+        """Retorna as habilidades encontradas no texto, na ordem da primeira ocorrência."""
+        if not text:
+            return []
+        return self.find_in_lowered(text.lower())
+
+    def find_in_lowered(self, text_lower: str) -> List[str]:
+        """Como find_all, para textos já convertidos para minúsculas."""
+        if not text_lower or self.pattern is None:
+            return []
+
+        found = {}
+        for term in self.pattern.findall(text_lower):
+            skill = self._canonical.get(term) or self._canonical[self._normalize(term)]
+            found.setdefault(skill, None)
+        return list(found)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'SkillMatcher':
+        """Carrega a taxonomia de habilidades de um arquivo JSON."""
+        with open(path, encoding='utf-8') as taxonomy_file:
+            taxonomy = json.load(taxonomy_file)
+        return cls(taxonomy.get('categories', {}), version=taxonomy.get('version', 1))
+
+
+@lru_cache(maxsize=None)
+def load_skill_matcher(path: Optional[str] = None) -> SkillMatcher:
+    """Retorna o matcher da taxonomia configurada, construído uma única vez por processo.
+
+    O caminho pode ser definido pela variável de ambiente SKILLS_TAXONOMY_PATH.
+    """
+    return SkillMatcher.from_file(path or os.getenv('SKILLS_TAXONOMY_PATH', DEFAULT_TAXONOMY_PATH))
@@ -0,0 +1,387 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+from src.models import db, AITask
+from src.models.ai_task import ACTIVE_TASK_PREDICATE
+from src.models.tenant_stat import UPSERT_DIALECTS
+
+logger = logging.getLogger(__name__)
+
+# Segundos que uma tarefa fica reservada para o worker que a reivindicou
+TASK_VISIBILITY_TIMEOUT = int(os.getenv('TASK_VISIBILITY_TIMEOUT', '300'))
+# Intervalo de renovação da reserva enquanto o handler roda (0: um terço do prazo de visibilidade)
+TASK_HEARTBEAT_SECONDS = float(os.getenv('TASK_HEARTBEAT_SECONDS', '0'))
+# Tentativas por tarefa antes de marcá-la como falha
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', '3'))
+# Espera antes da segunda tentativa; dobra a cada nova falha
+TASK_RETRY_BACKOFF_SECONDS = int(os.getenv('TASK_RETRY_BACKOFF_SECONDS', '10'))
+# Por quanto tempo resultados (e falhas) ficam disponíveis para consulta
+TASK_RESULT_TTL_SECONDS = int(os.getenv('TASK_RESULT_TTL_SECONDS', '86400'))
+
+# (fila, ID da tarefa, worker) da tarefa cujo handler está em execução
+_current_task: ContextVar = ContextVar('current_task', default=None)
+
+
+def report_progress(progress: Dict) -> bool:
+    """Grava o progresso da tarefa em execução pelo worker (sem efeito fora dele).
+
+    Confirma a transação corrente: o handler deve chamá-la entre as próprias
+    gravações. Retorna False se a reserva já tiver sido perdida para outro worker.
+    """
+    current = _current_task.get()
+    if current is None:
+        return True
+    queue, task_id, worker_id = current
+    return queue.report_progress(task_id, worker_id, progress)
+
+
+class TaskQueue:
+    """Fila de tarefas persistida na tabela ai_tasks, sem broker externo.
+
+    A reivindicação é um UPDATE condicional: só um worker consegue passar a
+    tarefa de reivindicável para running, em qualquer banco. Enquanto o handler
+    roda, heartbeat renova a reserva, então tarefas mais longas que o prazo de
+    visibilidade não são reivindicadas de novo. Resultados e falhas só são
+    gravados pelo worker que ainda detém a reserva.
+    """
+
+    def __init__(self, visibility_timeout: int = TASK_VISIBILITY_TIMEOUT, max_attempts: int = TASK_MAX_ATTEMPTS,
+                 retry_backoff: int = TASK_RETRY_BACKOFF_SECONDS, result_ttl: int = TASK_RESULT_TTL_SECONDS,
+                 heartbeat_interval: Optional[float] = None):
+        self.visibility_timeout = timedelta(seconds=visibility_timeout)
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.result_ttl = timedelta(seconds=result_ttl)
+        self.heartbeat_interval = heartbeat_interval or TASK_HEARTBEAT_SECONDS or visibility_timeout / 3
+
+    def enqueue(self, tenant_id: int, operation: str, payload: Dict) -> AITask:
+        task = AITask(
+            id=uuid.uuid4().hex,
+            tenant_id=tenant_id,
+            operation=operation,
+            payload=json.dumps(payload),
+            max_attempts=self.max_attempts,
+            available_at=datetime.utcnow()
+        )
+        db.session.add(task)
+        db.session.commit()
+        return task
+
+    def enqueue_unique(self, tenant_id: int, operation: str, payload: Dict, unique_key: str) -> Tuple[AITask, bool]:
+        """Enfileira a tarefa se nenhuma outra com a mesma chave estiver na fila ou em execução.
+
+        Retorna (tarefa, criada); sem criar, a tarefa é a ativa existente. A
+        exclusividade vem do índice único parcial uq_ai_tasks_active_unique_key:
+        entre pedidos concorrentes só um INSERT entra, em qualquer banco.
+        """
+        table = AITask.__table__
+        while True:
+            task_id = uuid.uuid4().hex
+            now = datetime.utcnow()
+            row = {
+                'id': task_id, 'tenant_id': tenant_id, 'operation': operation, 'unique_key': unique_key,
+                'payload': json.dumps(payload), 'status': 'queued', 'attempts': 0,
+                'max_attempts': self.max_attempts, 'available_at': now, 'created_at': now
+            }
+            insert = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+            if insert is not None:
+                statement = insert(table).values(row).on_conflict_do_nothing(
+                    index_elements=['unique_key'], index_where=ACTIVE_TASK_PREDICATE
+                )
+                created = db.session.execute(statement).rowcount == 1
+            else:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(table.insert().values(row))
+                    created = True
+                except IntegrityError:
+                    created = False
+            db.session.commit()
+
+            if created:
+                return db.session.get(AITask, task_id), True
+            existing = AITask.query.filter(AITask.unique_key == unique_key, ACTIVE_TASK_PREDICATE).first()
+            if existing is not None:
+                return existing, False
+            # A tarefa ativa terminou entre o INSERT e a leitura: nova tentativa
+
+    def get(self, task_id: str, tenant_id: int) -> Optional[AITask]:
+        """Tarefa do tenant, ou None se não existir ou o resultado já tiver expirado."""
+        return AITask.query.filter(
+            AITask.id == task_id,
+            AITask.tenant_id == tenant_id,
+            or_(AITask.expires_at.is_(None), AITask.expires_at > datetime.utcnow())
+        ).first()
+
+    @staticmethod
+    def _claimable(now: datetime):
+        return or_(
+            and_(AITask.status == 'queued', AITask.available_at <= now),
+            # Reserva vencida: o worker morreu ou excedeu o prazo de visibilidade
+            and_(AITask.status == 'running', AITask.locked_until < now)
+        )
+
+    def claim(self, worker_id: str, batch_size: int = 10, limits: Optional[Dict[str, int]] = None) -> Optional[AITask]:
+        """Reserva a próxima tarefa disponível para o worker.
+
+        `limits` limita quantas tarefas de cada operação rodam ao mesmo tempo em
+        todos os workers. A contagem é refeita depois da reserva confirmada: se
+        outro worker reservou a mesma operação ao mesmo tempo e o limite foi
+        excedido, a tarefa é devolvida à fila sem consumir tentativa.
+        """
+        limits = limits or {}
+        while True:
+            now = datetime.utcnow()
+            query = db.session.query(AITask.id).filter(self._claimable(now))
+            saturated = [operation for operation, limit in limits.items() if self.running(operation, now) >= limit]
+            if saturated:
+                query = query.filter(AITask.operation.notin_(saturated))
+            task_ids = [row.id for row in query.order_by(AITask.available_at, AITask.created_at).limit(batch_size)]
+            if not task_ids:
+                return None
+
+            for task_id in task_ids:
+                claimed = AITask.query.filter(AITask.id == task_id, self._claimable(now)).update({
+                    'status': 'running',
+                    'locked_by': worker_id,
+                    'locked_until': now + self.visibility_timeout,
+                    'attempts': AITask.attempts + 1,
+                    'started_at': now
+                }, synchronize_session=False)
+                db.session.commit()
+                if not claimed:
+                    # Outro worker chegou antes
+                    continue
+
+                task = db.session.get(AITask, task_id)
+                if task.attempts > task.max_attempts:
+                    # Só chega aqui quem esgotou as tentativas por reservas vencidas
+                    self.fail(task, worker_id, 'Prazo de visibilidade excedido', retry=False)
+                    continue
+                limit = limits.get(task.operation)
+                if limit is not None and self.running(task.operation, now) > limit:
+                    self._release(task, worker_id)
+                    break
+                return task
+
+    def running(self, operation: str, now: Optional[datetime] = None) -> int:
+        """Tarefas da operação em execução com reserva válida."""
+        return db.session.query(func.count(AITask.id)).filter(
+            AITask.operation == operation,
+            AITask.status == 'running',
+            AITask.locked_until >= (now or datetime.utcnow())
+        ).scalar()
+
+    def _release(self, task: AITask, worker_id: str) -> None:
+        """Devolve à fila uma tarefa reservada além do limite da operação."""
+        AITask.query.filter(
+            AITask.id == task.id,
+            AITask.status == 'running',
+            AITask.locked_by == worker_id
+        ).update({
+            'status': 'queued',
+            'locked_by': None,
+            'locked_until': None,
+            'started_at': None,
+            'attempts': AITask.attempts - 1
+        }, synchronize_session=False)
+        db.session.commit()
+
+    def extend(self, task_id: str, worker_id: str) -> bool:
+        """Renova a reserva do worker por mais um prazo de visibilidade; False se já a perdeu."""
+        extended = AITask.query.filter(
+            AITask.id == task_id,
+            AITask.status == 'running',
+            AITask.locked_by == worker_id
+        ).update({'locked_until': datetime.utcnow() + self.visibility_timeout}, synchronize_session=False)
+        db.session.commit()
+        return bool(extended)
+
+    def report_progress(self, task_id: str, worker_id: str, progress: Dict) -> bool:
+        """Grava o progresso informado pelo handler; False se a reserva já tiver sido perdida."""
+        updated = AITask.query.filter(
+            AITask.id == task_id,
+            AITask.status == 'running',
+            AITask.locked_by == worker_id
+        ).update({'progress': current_app.json.dumps(progress)}, synchronize_session=False)
+        db.session.commit()
+        return bool(updated)
+
+    @contextmanager
+    def heartbeat(self, task: AITask, worker_id: str):
+        """Renova a reserva da tarefa a cada heartbeat_interval enquanto o bloco executa.
+
+        A renovação roda numa thread com contexto de aplicação (e sessão) próprios,
+        sem interferir na transação do handler.
+        """
+        app = current_app._get_current_object()
+        task_id = task.id
+        stop = threading.Event()
+
+        def renew():
+            with app.app_context():
+                try:
+                    while not stop.wait(self.heartbeat_interval):
+                        try:
+                            if not self.extend(task_id, worker_id):
+                                logger.warning('Reserva da tarefa %s perdida pelo worker %s', task_id, worker_id)
+                                return
+                        except Exception:
+                            db.session.rollback()
+                            logger.exception('Falha ao renovar a reserva da tarefa %s', task_id)
+                finally:
+                    db.session.remove()
+
+        thread = threading.Thread(target=renew, name=f'task-heartbeat-{task_id}', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, task: AITask, worker_id: str, result) -> bool:
+        """Grava o resultado; False se a reserva já tiver sido perdida para outro worker."""
+        now = datetime.utcnow()
+        body = current_app.json.dumps(result)
+        return self._finish(task, worker_id, {
+            'status': 'completed',
+            'result': body,
+            'error': None,
+            'finished_at': now,
+            'expires_at': now + self.result_ttl,
+            'locked_until': None
+        })
+
+    def fail(self, task: AITask, worker_id: str, error: str, retry: bool = True) -> bool:
+        """Devolve a tarefa à fila com espera exponencial ou a marca como falha."""
+        now = datetime.utcnow()
+        attempts = task.attempts
+        if retry and attempts < task.max_attempts:
+            values = {
+                'status': 'queued',
+                'error': error,
+                'available_at': now + timedelta(seconds=self.retry_backoff * 2 ** (attempts - 1)),
+                'locked_by': None,
+                'locked_until': None
+            }
+        else:
+            values = {
+                'status': 'failed',
+                'error': error,
+                'finished_at': now,
+                'expires_at': now + self.result_ttl,
+                'locked_until': None
+            }
+        return self._finish(task, worker_id, values)
+
+    def _finish(self, task: AITask, worker_id: str, values: Dict) -> bool:
+        task_id = task.id
+        updated = AITask.query.filter(
+            AITask.id == task_id,
+            AITask.status == 'running',
+            AITask.locked_by == worker_id
+        ).update(values, synchronize_session=False)
+        db.session.commit()
+        if not updated:
+            logger.warning('Tarefa %s não pertence mais ao worker %s; resultado descartado', task_id, worker_id)
+        return bool(updated)
+
+    def purge_expired(self) -> int:
+        """Remove tarefas concluídas ou falhas cujo resultado expirou."""
+        deleted = AITask.query.filter(AITask.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+
+class TaskWorker:
+    """Executa as tarefas da fila chamando o handler registrado para cada operação.
+
+    Erros de LookupError e ValueError (registro inexistente, parâmetro inválido)
+    são definitivos; os demais devolvem a tarefa à fila até max_attempts. Um
+    resultado que não pode ser serializado também falha a tarefa em definitivo,
+    sem derrubar o worker.
+    """
+
+    PURGE_INTERVAL_SECONDS = 60
+
+    def __init__(self, queue: TaskQueue, handlers: Dict[str, Callable], worker_id: Optional[str] = None,
+                 limits: Optional[Dict[str, int]] = None):
+        self.queue = queue
+        self.handlers = handlers
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        # Máximo de tarefas simultâneas por operação, somando todos os workers
+        self.limits = limits or {}
+        self._last_purge = 0.0
+
+    def run_once(self) -> Optional[AITask]:
+        """Processa uma tarefa, se houver; retorna a tarefa processada."""
+        task = self.queue.claim(self.worker_id, limits=self.limits)
+        if task is None:
+            return None
+
+        task_id, operation = task.id, task.operation
+        handler = self.handlers.get(operation)
+        token = _current_task.set((self.queue, task_id, self.worker_id))
+        try:
+            if handler is None:
+                raise LookupError(f'Operação desconhecida: {operation}')
+            with self.queue.heartbeat(task, self.worker_id):
+                result = handler(task.tenant_id, **json.loads(task.payload))
+        except (LookupError, ValueError) as error:
+            db.session.rollback()
+            self.queue.fail(self._reload(task_id), self.worker_id, str(error), retry=False)
+        except Exception as error:
+            db.session.rollback()
+            logger.exception('Falha na tarefa %s (%s)', task_id, operation)
+            self.queue.fail(self._reload(task_id), self.worker_id, str(error))
+        else:
+            try:
+                task = self._reload(task_id)
+                self.queue.complete(task, self.worker_id, result)
+            except Exception as error:
+                db.session.rollback()
+                logger.exception('Resultado da tarefa %s (%s) não gravado', task_id, operation)
+                # Resultado não serializável é definitivo; erros do banco voltam à fila
+                self.queue.fail(task, self.worker_id, f'Resultado não gravado: {error}',
+                                retry=not isinstance(error, (TypeError, ValueError)))
+        finally:
+            _current_task.reset(token)
+        return task
+
+    @staticmethod
+    def _reload(task_id: str) -> AITask:
+        """Tarefa lida de novo: o handler pode ter desanexado os objetos da sessão (expunge_all)."""
+        return db.session.get(AITask, task_id)
+
+    def run(self, interval: float = 1.0, burst: bool = False) -> int:
+        """Processa tarefas continuamente, aguardando `interval` segundos quando a fila está vazia.
+
+        Com `burst` o worker termina assim que a fila esvazia.
+        """
+        processed = 0
+        while True:
+            if time.monotonic() - self._last_purge >= self.PURGE_INTERVAL_SECONDS:
+                self.queue.purge_expired()
+                self._last_purge = time.monotonic()
+            task = self.run_once()
+            # Libera a sessão entre tarefas para não acumular objetos
+            db.session.remove()
+            if task is not None:
+                processed += 1
+            elif burst:
+                return processed
+            else:
+                time.sleep(interval)
@@ -0,0 +1,180 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select, union
+from src.models import db, Candidate, CandidateSkill, ResponseCacheGeneration, TenantSketch, TenantSketchDelta
+
+
+class TenantSketchService:
+    """Estatísticas aproximadas do tenant a partir dos sketches de tenant_sketches.
+
+    As consultas leem uma linha por sketch, com custo constante no tamanho do
+    tenant. Os limites de erro acompanham cada resposta:
+
+    - habilidades (Count-Min): cada contagem fica entre o valor real e o real
+      mais max_overcount, com a confiança informada;
+    - percentis (t-digest): o valor devolvido tem posição (rank) a no máximo
+      rank_error_bound do percentil pedido, sobre os valores incluídos no
+      digest; stale_fraction indica quantos deles já foram alterados ou
+      excluídos e pedem uma reconstrução.
+
+    As escritas entram nos sketches quando flask sketches fold incorpora os
+    deltas pendentes; pending_updates, em cada resposta, conta os que ainda
+    faltam. Enquanto o tenant não for reconstruído (flask sketches rebuild), os
+    sketches são calculados em memória a partir das tabelas de origem a cada
+    consulta.
+    """
+
+    # Linhas lidas por vez ao percorrer os candidatos na reconstrução
+    STREAM_CHUNK_SIZE = 1000
+
+    def compute(self, tenant_id: int, names: Iterable[str] = None) -> Dict:
+        """Sketches do tenant calculados a partir de candidate_skills e candidates."""
+        names = tuple(names or (TenantSketch.SKILLS,) + TenantSketch.NUMERIC_FIELDS)
+        sketches = {name: TenantSketch.empty(name) for name in names}
+
+        if TenantSketch.SKILLS in sketches:
+            rows = db.session.execute(
+                select(CandidateSkill.skill, func.count())
+                .where(CandidateSkill.tenant_id == tenant_id)
+                .group_by(CandidateSkill.skill)
+            )
+            for skill, count in rows:
+                sketches[TenantSketch.SKILLS].add(skill, count)
+
+        fields = [field for field in TenantSketch.NUMERIC_FIELDS if field in sketches]
+        if fields:
+            rows = db.session.execute(
+                select(*[getattr(Candidate, field) for field in fields])
+                .where(Candidate.tenant_id == tenant_id)
+                .execution_options(yield_per=self.STREAM_CHUNK_SIZE)
+            )
+            for row in rows:
+                for field, value in zip(fields, row):
+                    if value is not None:
+                        sketches[field].add(value)
+        return sketches
+
+    def read(self, tenant_id: int, name: str) -> Tuple[object, int]:
+        """(sketch, valores obsoletos) do tenant; calculado na hora se ainda não reconstruído."""
+        row = db.session.execute(
+            select(TenantSketch.data, TenantSketch.stale, TenantSketch.rebuilt_at)
+            .where(TenantSketch.tenant_id == tenant_id, TenantSketch.name == name)
+        ).first()
+        if row is None or row.rebuilt_at is None:
+            return self.compute(tenant_id, [name])[name], 0
+        return TenantSketch.load(name, row.data), row.stale
+
+    def top_skills(self, tenant_id: int, limit: int = 10) -> Dict:
+        sketch, _ = self.read(tenant_id, TenantSketch.SKILLS)
+        return {
+            'skills': [{'skill': skill, 'count': count} for skill, count in sketch.top(limit)],
+            'total': sketch.total,
+            'error_bound': {
+                'max_overcount': sketch.max_overcount(),
+                'epsilon': round(sketch.epsilon, 6),
+                'confidence': round(1 - sketch.delta, 4)
+            },
+            'pending_updates': self.pending_deltas(tenant_id)
+        }
+
+    def percentiles(self, tenant_id: int, field: str, percentiles: List[float]) -> Dict:
+        digest, stale = self.read(tenant_id, field)
+        count = int(digest.count)
+        return {
+            'field': field,
+            'count': count,
+            'min': digest.min,
+            'max': digest.max,
+            'percentiles': [
+                {
+                    'percentile': percentile,
+                    'value': digest.quantile(percentile / 100),
+                    'rank_error_bound': round(digest.rank_error_bound(percentile / 100), 4)
+                }
+                for percentile in percentiles
+            ],
+            'stale_fraction': round(stale / count, 4) if count else 0.0,
+            'pending_updates': self.pending_deltas(tenant_id)
+        }
+
+    def rebuild(self, tenant_id: Optional[int] = None) -> Dict:
+        """Recalcula os sketches de um tenant (ou de todos) a partir das tabelas de origem.
+
+        As linhas do tenant são travadas antes da leitura das origens: as escritas
+        em andamento (FOR SHARE em TenantSketch.record) terminam antes e já estão
+        nas origens, então seus deltas são descartados; as seguintes esperam e
+        gravam deltas sobre o sketch reconstruído. As linhas são atualizadas no
+        lugar, para que as escritas que esperavam continuem a encontrá-las. Cada
+        tenant é confirmado em sua própria transação.
+        """
+        tenant_ids = [tenant_id] if tenant_id is not None else self._tenant_ids()
+        table = TenantSketch.__table__
+        deltas = TenantSketchDelta.__table__
+        for current in tenant_ids:
+            existing = set(db.session.execute(
+                select(table.c.name).where(table.c.tenant_id == current).with_for_update()
+            ).scalars())
+            sketches = self.compute(current)
+            now = datetime.utcnow()
+            db.session.execute(deltas.delete().where(deltas.c.tenant_id == current))
+            for name, sketch in sketches.items():
+                values = {'data': sketch.to_bytes(), 'stale': 0, 'rebuilt_at': now, 'updated_at': now}
+                if name in existing:
+                    db.session.execute(
+                        table.update().where(table.c.tenant_id == current, table.c.name == name).values(values)
+                    )
+                else:
+                    db.session.execute(table.insert().values(tenant_id=current, name=name, **values))
+            ResponseCacheGeneration.mark(db.session, current, 'candidates')
+            db.session.commit()
+        return {'tenants': len(tenant_ids), 'sketches': len(tenant_ids) * (1 + len(TenantSketch.NUMERIC_FIELDS))}
+
+    def fold(self, tenant_id: Optional[int] = None, max_deltas: int = 10000) -> Dict:
+        """Incorpora aos sketches os deltas pendentes de um tenant (ou de todos).
+
+        As linhas do tenant são travadas com FOR UPDATE: as escritas em andamento
+        terminam antes e as seguintes esperam, então os deltas lidos são todos os
+        confirmados até ali e são apagados pelo id. Cada sketch alterado é
+        regravado uma vez por lote de até max_deltas deltas. Cada tenant é
+        confirmado em sua própria transação.
+        """
+        deltas = TenantSketchDelta.__table__
+        if tenant_id is not None:
+            tenant_ids = [tenant_id]
+        else:
+            tenant_ids = list(db.session.execute(
+                select(deltas.c.tenant_id).distinct().order_by(deltas.c.tenant_id)
+            ).scalars())
+
+        table = TenantSketch.__table__
+        folded = 0
+        for current in tenant_ids:
+            db.session.execute(select(table.c.name).where(table.c.tenant_id == current).with_for_update()).all()
+            rows = db.session.execute(
+                select(deltas.c.id, deltas.c.data).where(deltas.c.tenant_id == current)
+                .order_by(deltas.c.id).limit(max_deltas)
+            ).all()
+            if rows:
+                update = TenantSketch.new_update()
+                for row in rows:
+                    TenantSketch.merge_update(update, row.data)
+                TenantSketch.apply(db.session.connection(), {current: update})
+                db.session.execute(deltas.delete().where(deltas.c.tenant_id == current, deltas.c.id <= rows[-1].id))
+                ResponseCacheGeneration.mark(db.session, current, 'candidates')
+                folded += len(rows)
+            db.session.commit()
+        return {'tenants': len(tenant_ids), 'deltas': folded}
+
+    @staticmethod
+    def pending_deltas(tenant_id: Optional[int] = None) -> int:
+        query = select(func.count()).select_from(TenantSketchDelta)
+        if tenant_id is not None:
+            query = query.where(TenantSketchDelta.tenant_id == tenant_id)
+        return db.session.execute(query).scalar()
+
+    @staticmethod
+    def _tenant_ids() -> List[int]:
+        """Tenants com candidatos ou sketches gravados."""
+        query = union(select(Candidate.tenant_id), select(TenantSketch.tenant_id))
+        return sorted(row[0] for row in db.session.execute(query))
@@ -0,0 +1,125 @@
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func, literal, select, union, union_all
+from src.models import db, Candidate, JobPosting, CandidateJobMatch, CandidateSkill, ResponseCacheGeneration, TenantStat
+
+
+def score_bucket_expression(score_column):
+    """CASE SQL com a mesma faixa de TenantStat.bucket_for (score nulo conta como zero)."""
+    score = func.coalesce(score_column, 0)
+    return case(
+        *[(score >= minimum, label) for label, minimum in TenantStat.SCORE_BUCKETS if minimum is not None],
+        else_=TenantStat.SCORE_BUCKETS[-1][0]
+    )
+
+
+class TenantStatsService:
+    """Leitura e reconciliação dos contadores de tenant_stats.
+
+    Os contadores são mantidos incrementalmente pelas escritas (ver TenantStat);
+    a reconciliação recalcula cada tenant a partir das tabelas de origem e
+    corrige o desvio acumulado, por exemplo de escritas feitas por fora da
+    aplicação. Deve rodar periodicamente (flask stats reconcile) e uma vez após a
+    criação da tabela, já que antes dela o tenant não tem contadores confiáveis.
+    """
+
+    META_METRIC = 'meta'
+    RECONCILED_KEY = 'reconciled_at'
+
+    def read(self, tenant_id: int) -> Optional[Dict[str, Dict[str, int]]]:
+        """Contadores do tenant (métrica -> chave -> valor) em uma leitura pela chave primária.
+
+        Retorna None se o tenant ainda não foi reconciliado.
+        """
+        stats: Dict[str, Dict[str, int]] = {}
+        rows = db.session.execute(
+            select(TenantStat.metric, TenantStat.key, TenantStat.value).where(TenantStat.tenant_id == tenant_id)
+        )
+        for metric, key, value in rows:
+            stats.setdefault(metric, {})[key] = value
+        if self.RECONCILED_KEY not in stats.get(self.META_METRIC, {}):
+            return None
+        return stats
+
+    def reconcile(self, tenant_id: Optional[int] = None) -> Dict:
+        """Corrige os contadores de um tenant (ou de todos) a partir das tabelas de origem.
+
+        A diferença entre o recalculado e o gravado sai de uma única consulta,
+        portanto de um único snapshot, e é somada aos contadores com
+        TenantStat.increment. Escritas concorrentes continuam aplicando seus
+        próprios incrementos: as já confirmadas no snapshot entram nos dois lados
+        e se anulam, e as posteriores não entram em nenhum. Nada é apagado e
+        regravado, então nenhum incremento se perde. Cada tenant é confirmado em
+        sua própria transação. Retorna quantos tenants foram processados e quantos
+        contadores estavam errados.
+        """
+        tenant_ids = [tenant_id] if tenant_id is not None else self._tenant_ids()
+        corrected = 0
+        table = TenantStat.__table__
+        for current in tenant_ids:
+            reconciled = self.read(current) is not None
+            # A linha meta é gravada antes da consulta: reconciliações concorrentes do
+            # mesmo tenant esperam por ela e não aplicam a mesma diferença duas vezes
+            meta = (table.c.tenant_id == current, table.c.metric == self.META_METRIC,
+                    table.c.key == self.RECONCILED_KEY)
+            if not db.session.execute(table.update().where(*meta).values(value=int(time.time()))).rowcount:
+                db.session.execute(table.insert().values(
+                    tenant_id=current, metric=self.META_METRIC, key=self.RECONCILED_KEY, value=int(time.time())
+                ))
+
+            deltas = self._deltas(current)
+            if reconciled:
+                corrected += len(deltas)
+            if deltas:
+                ResponseCacheGeneration.mark(db.session, current, 'candidates', 'job_postings', 'matches')
+            TenantStat.increment(db.session.connection(), deltas)
+            # Contadores zerados não carregam informação
+            db.session.execute(table.delete().where(
+                table.c.tenant_id == current, table.c.metric != self.META_METRIC, table.c.value == 0
+            ))
+            db.session.commit()
+
+        return {'tenants': len(tenant_ids), 'corrected': corrected}
+
+    def _deltas(self, tenant_id: int) -> Dict:
+        """(tenant, métrica, chave) -> recalculado - gravado, para as chaves divergentes do tenant.
+
+        Uma única consulta une as contagens das tabelas de origem aos contadores
+        gravados com sinal trocado.
+        """
+        bucket = score_bucket_expression(CandidateJobMatch.match_score)
+        parts = [
+            select(literal('candidate_status').label('metric'), Candidate.status.label('key'),
+                   func.count().label('value'))
+            .where(Candidate.tenant_id == tenant_id).group_by(Candidate.status),
+            select(literal('job_status'), JobPosting.status, func.count())
+            .where(JobPosting.tenant_id == tenant_id).group_by(JobPosting.status),
+            select(literal('skill'), CandidateSkill.skill, func.count())
+            .where(CandidateSkill.tenant_id == tenant_id).group_by(CandidateSkill.skill),
+            select(literal('score_bucket'), bucket, func.count())
+            .where(CandidateJobMatch.tenant_id == tenant_id).group_by(bucket),
+            select(literal('total'), literal('candidates'), func.count()).where(Candidate.tenant_id == tenant_id),
+            select(literal('total'), literal('jobs'), func.count()).where(JobPosting.tenant_id == tenant_id),
+            select(literal('total'), literal('matches'), func.count()).where(CandidateJobMatch.tenant_id == tenant_id),
+            # Contadores gravados entram com sinal trocado
+            select(TenantStat.metric, TenantStat.key, -TenantStat.value)
+            .where(TenantStat.tenant_id == tenant_id, TenantStat.metric != self.META_METRIC)
+        ]
+        combined = union_all(*parts).subquery()
+        difference = func.sum(combined.c.value)
+        rows = db.session.execute(
+            select(combined.c.metric, combined.c.key, difference)
+            .group_by(combined.c.metric, combined.c.key).having(difference != 0)
+        )
+        return {(tenant_id, metric, key): int(value) for metric, key, value in rows if key is not None}
+
+    @staticmethod
+    def _tenant_ids() -> List[int]:
+        """Tenants com candidatos, vagas ou contadores gravados."""
+        query = union(
+            select(Candidate.tenant_id),
+            select(JobPosting.tenant_id),
+            select(TenantStat.tenant_id)
+        )
+        return sorted(row[0] for row in db.session.execute(query))
@@ -0,0 +1,357 @@
+import fcntl
+import json
+import os
+import pickle
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from scipy import sparse
+from sklearn.base import clone
+
+DEFAULT_INDEX_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'tfidf'
+)
+
+KINDS = ('candidate', 'job')
+
+
+class TfidfIndex:
+    """Matriz TF-IDF esparsa de candidatos e vagas de um tenant.
+
+    Cada tipo de documento tem sua própria matriz CSR com linhas normalizadas (L2),
+    então a similaridade de cosseno entre um documento e todos os de outro tipo é
+    um único produto matriz-vetor.
+    """
+
+    def __init__(self, vectorizer_template, drift_threshold: float = 0.15, min_drift_terms: int = 2000):
+        self.vectorizer_template = vectorizer_template
+        self.vectorizer = None
+        self.drift_threshold = drift_threshold
+        self.min_drift_terms = min_drift_terms
+        self.matrices: Dict[str, sparse.csr_matrix] = {}
+        self.keys: Dict[str, List[int]] = {kind: [] for kind in KINDS}
+        self.positions: Dict[str, Dict[int, int]] = {kind: {} for kind in KINDS}
+        # Estatísticas de termos fora do vocabulário, usadas para medir o desvio
+        self.baseline_oov_rate = 0.0
+        self.added_terms = 0
+        self.added_oov_terms = 0
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.vectorizer is not None
+
+    @property
+    def drift(self) -> float:
+        """Aumento da taxa de termos desconhecidos nos documentos adicionados desde o último ajuste."""
+        if not self.added_terms:
+            return 0.0
+        return self.added_oov_terms / self.added_terms - self.baseline_oov_rate
+
+    @property
+    def needs_refit(self) -> bool:
+        return (not self.is_fitted
+                or (self.added_terms >= self.min_drift_terms and self.drift > self.drift_threshold))
+
+    def fit(self, documents: Dict[str, Dict[int, str]]) -> None:
+        """Ajusta o vocabulário com todos os documentos ({'candidate': {id: texto}, 'job': {...}})."""
+        corpus = [text or '' for kind in KINDS for text in documents.get(kind, {}).values()]
+        vectorizer = clone(self.vectorizer_template)
+        try:
+            vectorizer.fit(corpus)
+        except ValueError:
+            # Corpus vazio ou só com stop words: o índice fica sem vocabulário até o próximo ajuste
+            self.vectorizer = None
+            return
+
+        self.vectorizer = vectorizer
+        for kind in KINDS:
+            ids = list(documents.get(kind, {}).keys())
+            texts = [documents[kind][doc_id] or '' for doc_id in ids] if ids else []
+            self.matrices[kind] = (vectorizer.transform(texts).tocsr() if texts
+                                   else sparse.csr_matrix((0, len(vectorizer.vocabulary_))))
+            self.keys[kind] = ids
+            self.positions[kind] = {doc_id: row for row, doc_id in enumerate(ids)}
+
+        total_terms, oov_terms = self._oov_counts(corpus)
+        self.baseline_oov_rate = oov_terms / total_terms if total_terms else 0.0
+        self.added_terms = 0
+        self.added_oov_terms = 0
+
+    def apply(self, changes: Dict[str, Dict[int, Optional[str]]]) -> None:
+        """Aplica um lote de alterações com o vocabulário atual (sem reajuste).
+
+        `changes[kind]` mapeia o ID do documento para o texto novo, ou None para
+        removê-lo. Cada tipo alterado é remontado com um único vstack: as linhas
+        mantidas e, no fim, os documentos novos ou substituídos.
+        """
+        if not self.is_fitted:
+            return
+
+        for kind, documents in changes.items():
+            if not documents:
+                continue
+            texts = {doc_id: text or '' for doc_id, text in documents.items() if text is not None}
+            kept = [row for row, doc_id in enumerate(self.keys[kind]) if doc_id not in documents]
+            parts = [self.matrices[kind][kept]]
+            if texts:
+                parts.append(self.vectorizer.transform(list(texts.values())).tocsr())
+                total_terms, oov_terms = self._oov_counts(list(texts.values()))
+                self.added_terms += total_terms
+                self.added_oov_terms += oov_terms
+
+            self.matrices[kind] = sparse.vstack(parts, format='csr')
+            self.keys[kind] = [self.keys[kind][row] for row in kept] + list(texts)
+            self.positions[kind] = {doc_id: row for row, doc_id in enumerate(self.keys[kind])}
+
+    def similarity(self, kind: str, doc_id: int, other_kind: str, other_id: int) -> Optional[float]:
+        """Similaridade de cosseno entre dois documentos indexados."""
+        row = self.positions[kind].get(doc_id)
+        other_row = self.positions[other_kind].get(other_id)
+        if row is None or other_row is None:
+            return None
+        product = self.matrices[kind][row].multiply(self.matrices[other_kind][other_row]).sum()
+        return float(product)
+
+    def save(self, directory: str) -> None:
+        """Grava matrizes (.npz), vocabulário (pickle) e metadados de forma atômica."""
+        os.makedirs(directory, exist_ok=True)
+        if not self.is_fitted:
+            return
+        for kind in KINDS:
+            self._atomic_write(directory, f'{kind}s.npz',
+                               lambda handle, kind=kind: sparse.save_npz(handle, self.matrices[kind]))
+        self._atomic_write(directory, 'vectorizer.pkl', lambda handle: pickle.dump(self.vectorizer, handle))
+        meta = {
+            'keys': self.keys,
+            'baseline_oov_rate': self.baseline_oov_rate,
+            'added_terms': self.added_terms,
+            'added_oov_terms': self.added_oov_terms
+        }
+        self._atomic_write(directory, 'meta.json', lambda handle: handle.write(json.dumps(meta).encode('utf-8')))
+
+    def load(self, directory: str) -> bool:
+        """Carrega o índice do disco. Retorna False se não houver índice salvo."""
+        meta_path = os.path.join(directory, 'meta.json')
+        if not os.path.exists(meta_path):
+            return False
+        with open(meta_path, encoding='utf-8') as meta_file:
+            meta = json.load(meta_file)
+        with open(os.path.join(directory, 'vectorizer.pkl'), 'rb') as vectorizer_file:
+            self.vectorizer = pickle.load(vectorizer_file)
+        for kind in KINDS:
+            self.matrices[kind] = sparse.load_npz(os.path.join(directory, f'{kind}s.npz')).tocsr()
+            self.keys[kind] = [int(key) for key in meta['keys'].get(kind, [])]
+            self.positions[kind] = {key: row for row, key in enumerate(self.keys[kind])}
+        self.baseline_oov_rate = meta.get('baseline_oov_rate', 0.0)
+        self.added_terms = meta.get('added_terms', 0)
+        self.added_oov_terms = meta.get('added_oov_terms', 0)
+        return True
+
+    def _oov_counts(self, texts: List[str]):
+        analyzer = self.vectorizer.build_analyzer()
+        vocabulary = self.vectorizer.vocabulary_
+        total_terms = 0
+        oov_terms = 0
+        for text in texts:
+            for term in analyzer(text):
+                total_terms += 1
+                if term not in vocabulary:
+                    oov_terms += 1
+        return total_terms, oov_terms
+
+    @staticmethod
+    def _atomic_write(directory: str, filename: str, writer) -> None:
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                writer(temp_file)
+            os.replace(temp_path, os.path.join(directory, filename))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+class TextSimilarityService:
+    """Mantém um TfidfIndex persistido por tenant, construído a partir do banco.
+
+    As escritas de candidatos e vagas só registram marcas em
+    text_index_dirty_marks; process_dirty (flask text-index process-dirty) as
+    aplica em lote fora das requisições. Toda gravação do índice acontece com o
+    arquivo .lock do tenant travado (exclusivo) e parte da versão em disco, então
+    processos concorrentes não perdem documentos uns dos outros; as leituras
+    carregam o índice com o mesmo arquivo travado (compartilhado) e recarregam
+    quando outro processo o grava.
+
+    O diretório dos índices pode ser definido por TFIDF_INDEX_DIR e o limite de
+    desvio de vocabulário que dispara o reajuste por TFIDF_REFIT_DRIFT.
+    """
+
+    LOCK_FILE = '.lock'
+
+    def __init__(self, ai_service=None, base_dir: Optional[str] = None):
+        if ai_service is None:
+            from src.services.ai_service import AIService
+            ai_service = AIService()
+        self.ai_service = ai_service
+        self.base_dir = base_dir or os.getenv('TFIDF_INDEX_DIR', DEFAULT_INDEX_DIR)
+        self.drift_threshold = float(os.getenv('TFIDF_REFIT_DRIFT', '0.15'))
+        self._indexes: Dict[int, TfidfIndex] = {}
+        self._loaded_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def candidate_document(candidate) -> str:
+        return ' '.join(filter(None, [candidate.resume_text, candidate.skills, candidate.current_position]))
+
+    @staticmethod
+    def job_document(job) -> str:
+        return ' '.join(filter(None, [job.title, job.description, job.requirements]))
+
+    def index_for(self, tenant_id: int) -> Optional[TfidfIndex]:
+        """Retorna o índice do tenant gravado em disco, ou None se ainda não foi construído.
+
+        A construção fica com `flask text-index process-dirty`/`rebuild`, fora das
+        requisições. Se outro processo gravou o índice depois da última leitura, ele
+        é recarregado.
+        """
+        with self._lock:
+            index = self._indexes.get(tenant_id)
+            saved_at = self._saved_at(tenant_id)
+            if index is not None and not (saved_at and saved_at > self._loaded_at.get(tenant_id, 0)):
+                return index
+
+            index = self._new_index()
+            with self._file_lock(tenant_id, fcntl.LOCK_SH):
+                if not index.load(self._directory(tenant_id)):
+                    return None
+                loaded_at = self._saved_at(tenant_id)
+            self._indexes[tenant_id] = index
+            self._loaded_at[tenant_id] = loaded_at
+            return index
+
+    def candidate_job_similarity(self, tenant_id: int, candidate_id: int, job_id: int) -> Optional[float]:
+        index = self.index_for(tenant_id)
+        if index is None:
+            return None
+        return index.similarity('candidate', candidate_id, 'job', job_id)
+
+    def rebuild(self, tenant_id: int) -> TfidfIndex:
+        """Reajusta o vocabulário do tenant com todos os documentos atuais."""
+        index = self._new_index()
+        with self._lock, self._file_lock(tenant_id, fcntl.LOCK_EX):
+            self._rebuild(tenant_id, index)
+            self._indexes[tenant_id] = index
+            self._loaded_at[tenant_id] = self._saved_at(tenant_id)
+        return index
+
+    def process_dirty(self, tenant_id: Optional[int] = None, max_marks: int = 10000) -> Dict:
+        """Aplica ao índice de cada tenant os documentos marcados, em lote.
+
+        Cada tenant é processado com o arquivo .lock travado, a partir do índice
+        gravado em disco (o de outro processo, se ele gravou por último). As marcas
+        consumidas são exatamente as lidas aqui; as que chegarem durante o
+        processamento ficam para a próxima vez.
+        """
+        from src.models import db, TextIndexDirtyMark
+        query = db.session.query(TextIndexDirtyMark).order_by(TextIndexDirtyMark.id)
+        if tenant_id is not None:
+            query = query.filter(TextIndexDirtyMark.tenant_id == tenant_id)
+        marks = query.limit(max_marks).all()
+
+        dirty: Dict[int, Dict[str, set]] = {}
+        mark_ids: Dict[int, List[int]] = {}
+        for mark in marks:
+            dirty.setdefault(mark.tenant_id, {kind: set() for kind in KINDS})[mark.kind].add(mark.doc_id)
+            mark_ids.setdefault(mark.tenant_id, []).append(mark.id)
+
+        stats = {'marks': len(marks), 'tenants': len(dirty), 'documents': 0, 'removed': 0, 'refits': 0}
+        for current, documents in dirty.items():
+            changes = self._current_documents(current, documents)
+            with self._lock, self._file_lock(current, fcntl.LOCK_EX):
+                index = self._new_index()
+                if index.load(self._directory(current)):
+                    index.apply(changes)
+                    if index.needs_refit:
+                        self._rebuild(current, index)
+                        stats['refits'] += 1
+                    else:
+                        self._save(current, index)
+                else:
+                    # Sem índice gravado: a construção a partir do banco já inclui as alterações
+                    self._rebuild(current, index)
+                self._indexes[current] = index
+                self._loaded_at[current] = self._saved_at(current)
+
+            table = TextIndexDirtyMark.__table__
+            db.session.execute(table.delete().where(table.c.id.in_(mark_ids[current])))
+            db.session.commit()
+            stats['documents'] += sum(text is not None for kind in changes.values() for text in kind.values())
+            stats['removed'] += sum(text is None for kind in changes.values() for text in kind.values())
+        return stats
+
+    def pending_marks(self, tenant_id: Optional[int] = None) -> int:
+        from src.models import TextIndexDirtyMark
+        query = TextIndexDirtyMark.query
+        if tenant_id is not None:
+            query = query.filter(TextIndexDirtyMark.tenant_id == tenant_id)
+        return query.count()
+
+    def _current_documents(self, tenant_id: int, documents: Dict[str, set]) -> Dict[str, Dict[int, Optional[str]]]:
+        """Texto atual de cada documento marcado; None para os que não existem mais."""
+        from sqlalchemy.orm import load_only
+        from src.models import Candidate, JobPosting
+        changes = {kind: dict.fromkeys(ids) for kind, ids in documents.items()}
+        if documents['candidate']:
+            for candidate in Candidate.query.options(load_only(
+                Candidate.id, Candidate.resume_text, Candidate.skills, Candidate.current_position
+            )).filter(Candidate.tenant_id == tenant_id, Candidate.id.in_(documents['candidate'])):
+                changes['candidate'][candidate.id] = self.candidate_document(candidate)
+        if documents['job']:
+            for job in JobPosting.query.options(load_only(
+                JobPosting.id, JobPosting.title, JobPosting.description, JobPosting.requirements
+            )).filter(JobPosting.tenant_id == tenant_id, JobPosting.id.in_(documents['job'])):
+                changes['job'][job.id] = self.job_document(job)
+        return changes
+
+    def _rebuild(self, tenant_id: int, index: TfidfIndex) -> None:
+        """Ajusta o índice com todos os documentos do banco e o grava (com a trava exclusiva já obtida)."""
+        from sqlalchemy.orm import load_only
+        from src.models import Candidate, JobPosting
+        # Só as colunas que entram no documento do candidato (ver candidate_document)
+        candidates = Candidate.query.options(load_only(
+            Candidate.id, Candidate.resume_text, Candidate.skills, Candidate.current_position
+        )).filter_by(tenant_id=tenant_id)
+        documents = {
+            'candidate': {c.id: self.candidate_document(c) for c in candidates},
+            'job': {j.id: self.job_document(j) for j in JobPosting.query.filter_by(tenant_id=tenant_id)}
+        }
+        index.fit(documents)
+        self._save(tenant_id, index)
+
+    def _save(self, tenant_id: int, index: TfidfIndex) -> None:
+        index.save(self._directory(tenant_id))
+
+    @contextmanager
+    def _file_lock(self, tenant_id: int, operation: int):
+        """Trava o arquivo .lock do diretório do tenant (LOCK_SH para ler, LOCK_EX para gravar)."""
+        directory = self._directory(tenant_id)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, self.LOCK_FILE), 'a+b') as lock_file:
+            fcntl.flock(lock_file, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _saved_at(self, tenant_id: int) -> float:
+        meta_path = os.path.join(self._directory(tenant_id), 'meta.json')
+        return os.path.getmtime(meta_path) if os.path.exists(meta_path) else 0.0
+
+    def _new_index(self) -> TfidfIndex:
+        return TfidfIndex(self.ai_service.vectorizer, drift_threshold=self.drift_threshold)
+
+    def _directory(self, tenant_id: int) -> str:
+        return os.path.join(self.base_dir, f'tenant_{tenant_id}')
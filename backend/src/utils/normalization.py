@@ -0,0 +1,36 @@
+import re
+from urllib.parse import urlparse
+
+_NON_DIGITS = re.compile(r'[^\d]')
+_LINKEDIN_PROFILE = re.compile(r'^/(?:in|pub)/([^/?#]+)')
+
+
+def normalize_email(email) -> str:
+    """Email em minúsculas e sem espaços nas pontas."""
+    return (email or '').strip().lower()
+
+
+def normalize_phone(phone) -> str:
+    """Apenas os dígitos do telefone."""
+    return _NON_DIGITS.sub('', phone or '')
+
+
+def normalize_linkedin(url) -> str:
+    """Slug canônico do perfil do LinkedIn (ex.: 'joaosilva' para .../in/joaosilva/).
+
+    Ignora protocolo, subdomínio (www, br., ...), barra final e parâmetros. URLs
+    que não são de perfil ficam apenas em minúsculas e sem barra final.
+    """
+    value = (url or '').strip().lower()
+    if not value:
+        return ''
+    parsed = urlparse(value if '://' in value else f'https://{value}')
+    match = _LINKEDIN_PROFILE.match(parsed.path)
+    if parsed.netloc.endswith('linkedin.com') and match:
+        return match.group(1)
+    return value.rstrip('/')
+
+
+def normalize_name(first_name, last_name) -> str:
+    """Nome completo em minúsculas com espaços colapsados."""
+    return ' '.join(f"{first_name or ''} {last_name or ''}".lower().split())
@@ -0,0 +1,235 @@
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+# Cache de respostas das rotas de leitura muito consultadas pelo dashboard
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+# Respostas mantidas em memória em cada worker
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '1024'))
+# Validade máxima de uma resposta; limita o atraso se a invalidação falhar depois de um commit
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '30'))
+# Diretório local do tier compartilhado entre os workers do mesmo host (vazio = desligado)
+RESPONSE_CACHE_DIR = os.getenv('RESPONSE_CACHE_DIR', '')
+
+
+def current_tenant_id() -> Optional[int]:
+    """Tenant do JWT da requisição, nas duas formas usadas pelas rotas (claim ou identidade)."""
+    tenant_id = get_jwt().get('tenant_id')
+    if tenant_id is None:
+        identity = get_jwt_identity()
+        if isinstance(identity, dict):
+            tenant_id = identity.get('tenant_id')
+    return tenant_id
+
+
+class SharedResponseStore:
+    """Tier compartilhado em um arquivo SQLite local com as respostas dos workers do host.
+
+    Cada thread abre sua própria conexão; o modo WAL permite leituras
+    simultâneas dos workers enquanto outro grava.
+    """
+
+    PURGE_EVERY = 200
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'responses.sqlite3')
+        self._local = threading.local()
+        self._writes = 0
+        with self._connection() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, tenant_id INTEGER, '
+                'generations TEXT, expires_at REAL, mimetype TEXT, body BLOB)'
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        return connection
+
+    def get(self, key: str) -> Optional[Tuple]:
+        return self._connection().execute(
+            'SELECT generations, expires_at, mimetype, body FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+
+    def put(self, key: str, tenant_id: int, generations: Tuple[int, ...], expires_at: float,
+            mimetype: str, body: bytes) -> None:
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO responses (key, tenant_id, generations, expires_at, mimetype, body) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (key, tenant_id, json.dumps(generations), expires_at, mimetype, body)
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            connection.execute('DELETE FROM responses WHERE expires_at < ?', (time.time(),))
+
+    def clear(self) -> None:
+        connection = self._connection()
+        connection.execute('DELETE FROM responses')
+
+
+class ResponseCache:
+    """Cache de respostas JSON por tenant, rota, parâmetros normalizados e idioma.
+
+    Cada rota declara os escopos que lê (candidates, tags, job_postings,
+    matches) e cada escopo tem uma geração por tenant, gravada no banco em
+    response_cache_generations. Toda transação que altera um escopo incrementa
+    a geração depois do commit, em qualquer processo (ver
+    ResponseCacheGeneration): as respostas guardadas com a geração anterior
+    deixam de valer em todos os workers, sem varrer o cache e sem afetar os
+    demais tenants. A memória é um LRU com limite de tamanho e TTL; com
+    RESPONSE_CACHE_DIR, as respostas também ficam em um arquivo local
+    compartilhado pelos workers do host.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL_SECONDS,
+                 shared_dir: str = RESPONSE_CACHE_DIR):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.shared = SharedResponseStore(shared_dir) if shared_dir else None
+        self._entries: 'OrderedDict[str, Tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ('memory_hits', 'shared_hits', 'misses', 'stores', 'evictions', 'expirations', 'invalidations'), 0
+        )
+
+    @staticmethod
+    def make_key(tenant_id: int, endpoint: str, args: Iterable[Tuple[str, str]], locale: str) -> str:
+        payload = json.dumps([tenant_id, endpoint, sorted(args), locale], separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def generations(tenant_id: int, scopes: Tuple[str, ...]) -> Tuple[int, ...]:
+        """Gerações atuais dos escopos do tenant, lidas do banco."""
+        # Importado aqui, como o i18n em cached_response: o módulo não depende dos modelos ao ser importado
+        from src.models import db, ResponseCacheGeneration
+        return ResponseCacheGeneration.read(db.session.connection(), tenant_id, scopes)
+
+    def get(self, key: str, generations: Tuple[int, ...]) -> Optional[Tuple[str, bytes]]:
+        """(mimetype, corpo) da resposta válida para as gerações atuais, se houver."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_generations, expires_at, mimetype, body = entry
+                if expires_at > now and entry_generations == generations:
+                    self._entries.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return mimetype, body
+                del self._entries[key]
+                self._counters['expirations' if expires_at <= now else 'invalidations'] += 1
+
+        if self.shared is not None:
+            row = self.shared.get(key)
+            if row is not None and row[1] > now and tuple(json.loads(row[0])) == generations:
+                self._remember(key, (generations, row[1], row[2], row[3]))
+                with self._lock:
+                    self._counters['shared_hits'] += 1
+                return row[2], row[3]
+
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+
+    def put(self, key: str, tenant_id: int, generations: Tuple[int, ...], mimetype: str, body: bytes) -> None:
+        expires_at = time.time() + self.ttl
+        self._remember(key, (generations, expires_at, mimetype, body))
+        if self.shared is not None:
+            self.shared.put(key, tenant_id, generations, expires_at, mimetype, body)
+        with self._lock:
+            self._counters['stores'] += 1
+
+    def _remember(self, key: str, entry: Tuple) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def clear(self) -> None:
+        """Esvazia o cache (inclusive o tier compartilhado) e zera os contadores."""
+        with self._lock:
+            self._entries.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters['memory_hits'] + counters['shared_hits'] + counters['misses']
+        return {
+            'size': size,
+            'maxsize': self.maxsize,
+            'ttl_seconds': self.ttl,
+            'shared': self.shared is not None,
+            **counters,
+            'hit_rate': round((counters['memory_hits'] + counters['shared_hits']) / lookups, 4) if lookups else None
+        }
+
+    def to_prometheus(self, name: str = 'response_cache') -> str:
+        stats = self.stats()
+        lines = []
+        for counter in ('memory_hits', 'shared_hits', 'misses', 'stores', 'evictions', 'expirations', 'invalidations'):
+            lines.append(f'# TYPE {name}_{counter}_total counter')
+            lines.append(f'{name}_{counter}_total {stats[counter]}')
+        lines.append(f'# TYPE {name}_size gauge')
+        lines.append(f'{name}_size {stats["size"]}')
+        if stats['hit_rate'] is not None:
+            lines.append(f'# TYPE {name}_hit_ratio gauge')
+            lines.append(f'{name}_hit_ratio {stats["hit_rate"]}')
+        return '\n'.join(lines) + '\n'
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(*scopes: str):
+    """Guarda as respostas 200 da rota (GET) para o tenant, enquanto os escopos não forem alterados.
+
+    Deve ficar abaixo de jwt_required e das verificações de acesso, para que
+    só requisições autorizadas cheguem ao cache.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            tenant_id = current_tenant_id() if RESPONSE_CACHE_ENABLED else None
+            if tenant_id is None:
+                return view(*args, **kwargs)
+
+            # Importado aqui: o módulo de i18n carrega o Babel
+            from src.utils.i18n import get_user_locale
+            key = response_cache.make_key(tenant_id, request.endpoint, request.args.items(multi=True),
+                                          get_user_locale())
+            generations = response_cache.generations(tenant_id, scopes)
+            cached = response_cache.get(key, generations)
+            if cached is not None:
+                response = current_app.response_class(cached[1], status=200, mimetype=cached[0])
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.is_json:
+                # Gerações lidas antes de calcular: uma escrita concorrente invalida o que foi gravado
+                response_cache.put(key, tenant_id, generations, response.mimetype, response.get_data())
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
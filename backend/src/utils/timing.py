@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Dict, List, Tuple
+
+from flask import g, has_request_context, request
+
+# Liga a medição por etapa (cabeçalho Server-Timing e histogramas)
+STAGE_TIMING_ENABLED = os.getenv('AI_STAGE_TIMING', 'false').lower() == 'true'
+
+# Limites superiores dos buckets dos histogramas, em segundos
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Contexto vazio reutilizado quando a medição está desligada
+_NOOP = nullcontext()
+
+
+class StageHistograms:
+    """Histogramas de duração por (endpoint, etapa), acumulados no processo."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, str], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, stage: str, seconds: float) -> None:
+        with self._lock:
+            series = self._series.get((endpoint, stage))
+            if series is None:
+                # Contagem por bucket (o último é +Inf), soma e total de observações
+                series = self._series[(endpoint, stage)] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def snapshot(self) -> List[Dict]:
+        """Séries com buckets cumulativos, como no formato do Prometheus."""
+        with self._lock:
+            items = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+
+        snapshot = []
+        for (endpoint, stage), counts, total, count in sorted(items):
+            cumulative = []
+            running = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                running += bucket_count
+                cumulative.append(('+Inf' if bound == float('inf') else bound, running))
+            snapshot.append({
+                'endpoint': endpoint,
+                'stage': stage,
+                'buckets': cumulative,
+                'sum': round(total, 6),
+                'count': count
+            })
+        return snapshot
+
+    def to_prometheus(self, name: str = 'ai_stage_duration_seconds') -> str:
+        lines = [f'# HELP {name} Duração de cada etapa das rotas de IA.', f'# TYPE {name} histogram']
+        for series in self.snapshot():
+            labels = f'endpoint="{series["endpoint"]}",stage="{series["stage"]}"'
+            for bound, count in series['buckets']:
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{{labels}}} {series["sum"]}')
+            lines.append(f'{name}_count{{{labels}}} {series["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+stage_histograms = StageHistograms()
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        timings = g.setdefault('stage_timings', {})
+        timings[self.name] = timings.get(self.name, 0.0) + elapsed
+        return False
+
+
+def stage(name: str):
+    """Mede um trecho da requisição como a etapa `name` (db, features, scoring, ranking, serialization).
+
+    Repetições da mesma etapa na requisição são somadas. Com a medição desligada,
+    ou fora de uma requisição, devolve um contexto vazio compartilhado.
+    """
+    if not STAGE_TIMING_ENABLED or not has_request_context():
+        return _NOOP
+    return _Stage(name)
+
+
+def _start_request_timer():
+    if STAGE_TIMING_ENABLED:
+        g.stage_request_start = time.perf_counter()
+
+
+def _emit_stage_timings(response):
+    if not STAGE_TIMING_ENABLED:
+        return response
+    timings = g.pop('stage_timings', {})
+    start = g.pop('stage_request_start', None)
+    if start is not None:
+        timings['total'] = time.perf_counter() - start
+
+    endpoint = request.endpoint or 'unknown'
+    for name, seconds in timings.items():
+        stage_histograms.observe(endpoint, name, seconds)
+    if timings:
+        response.headers['Server-Timing'] = ', '.join(
+            f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings.items()
+        )
+    return response
+
+
+def init_stage_timing(blueprint) -> None:
+    """Registra a medição por etapa nas requisições do blueprint (ou da aplicação)."""
+    blueprint.before_request(_start_request_timer)
+    blueprint.after_request(_emit_stage_timings)
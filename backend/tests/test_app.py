@@ -0,0 +1,21 @@
+"""Aplicação montada por create_app, a mesma do wsgi.py."""
+import pytest
+
+
+@pytest.mark.parametrize('command', [
+    ['dedup', 'backfill'], ['text-index', 'process-dirty'], ['text-index', 'rebuild'], ['sketches', 'fold'],
+    ['sketches', 'rebuild'], ['matches', 'process-dirty'], ['tasks', 'worker'], ['stats', 'reconcile'],
+    ['funnel', 'rollup'],
+])
+def test_factory_registers_the_deploy_commands(cli, command):
+    result = cli.invoke(args=command + ['--help'])
+    assert result.exit_code == 0, result.output
+
+
+def test_factory_commands_run_against_the_app_database(cli, client):
+    assert client.get('/api/health').status_code == 200
+
+    result = cli.invoke(args=['sketches', 'fold'])
+    assert result.exit_code == 0, result.output
+    result = cli.invoke(args=['dedup', 'backfill'])
+    assert result.exit_code == 0 and 'tenants=0, candidates=0' in result.output
@@ -0,0 +1,50 @@
+"""Agregações diárias do funil: o incremento na escrita deve bater com a reconstrução."""
+from datetime import datetime
+
+from src.models import db, FunnelDailyRollup
+from src.services.funnel import FunnelService
+
+
+def rollup_rows():
+    return sorted(
+        (row.tenant_id, row.day, row.source, row.job_posting_id, row.stage, row.entered, row.exited, row.exit_seconds)
+        for row in FunnelDailyRollup.query.all()
+        if row.entered or row.exited
+    )
+
+
+def test_incremental_rollups_match_rebuild_from_events(app, client, auth_headers):
+    headers = auth_headers()
+    job = client.post('/api/job-postings', json={'title': 'Dev', 'description': 'd', 'requirements': 'Python',
+                                                 'status': 'active', 'experience_level': 'mid', 'location': 'Rio'},
+                      headers=headers)
+    candidate_ids = []
+    for index in range(6):
+        response = client.post('/api/candidates', json={
+            'first_name': f'C{index}', 'last_name': 'X', 'email': f'c{index}@example.com',
+            'source': 'linkedin' if index % 2 else 'site'
+        }, headers=headers)
+        candidate_ids.append(response.json['candidate']['id'])
+
+    for candidate_id in candidate_ids[:4]:
+        assert client.put(f'/api/candidates/{candidate_id}', json={'status': 'contacted'}, headers=headers).status_code == 200
+    for candidate_id in candidate_ids[:2]:
+        assert client.put(f'/api/candidates/{candidate_id}', json={
+            'status': 'interviewed', 'job_posting_id': job.json['id']
+        }, headers=headers).status_code == 200
+    client.put(f'/api/candidates/{candidate_ids[0]}', json={'status': 'hired'}, headers=headers)
+    # Alterações sem mudança de status não geram eventos
+    client.put(f'/api/candidates/{candidate_ids[1]}', json={'first_name': 'Novo'}, headers=headers)
+
+    with app.app_context():
+        incremental = rollup_rows()
+        today = datetime.utcnow().date()
+        FunnelService().rebuild(today, today)
+        assert rollup_rows() == incremental
+
+    response = client.get('/api/analytics/funnel', headers=headers)
+    stages = {stage['stage']: stage for stage in response.json['stages']}
+    assert [stages[name]['entered'] for name in FunnelService.FUNNEL_STAGES] == [6, 4, 2, 1]
+    assert stages['contacted']['exited'] == 2
+    assert response.json['by_source'] == {'site': {'new': 3, 'contacted': 2, 'interviewed': 1, 'hired': 1},
+                                          'linkedin': {'new': 3, 'contacted': 2, 'interviewed': 1}}
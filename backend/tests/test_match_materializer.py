@@ -0,0 +1,99 @@
+"""Marcas da matriz de compatibilidade e vagas que deixam de estar ativas."""
+import pytest
+
+from src.models import db, CandidateJobMatch, MatchDirtyMark
+from src.services.match_materializer import MatchMaterializer
+from src.services.tenant_stats import TenantStatsService
+
+
+@pytest.fixture
+def tenant(app, client, auth_headers):
+    headers = auth_headers()
+    for index in range(4):
+        client.post('/api/candidates', json={
+            'first_name': f'C{index}', 'last_name': 'X', 'email': f'c{index}@example.com',
+            'skills': 'Python, SQL' if index % 2 else 'Java'
+        }, headers=headers)
+    job_ids = [
+        client.post('/api/job-postings', json={
+            'title': f'Vaga {index}', 'description': 'd', 'requirements': 'Python SQL', 'status': 'active',
+            'experience_level': 'mid', 'location': 'Rio'
+        }, headers=headers).json['id']
+        for index in range(2)
+    ]
+    with app.app_context():
+        TenantStatsService().reconcile(1)
+        MatchMaterializer().process_dirty()
+    return {'headers': headers, 'job_ids': job_ids}
+
+
+def test_marks_written_during_processing_are_not_deleted(app, tenant, client, monkeypatch):
+    client.put('/api/candidates/1', json={'skills': 'Python'}, headers=tenant['headers'])
+    materializer = MatchMaterializer()
+    original = materializer._materialize
+
+    def materialize_and_mark(*args, **kwargs):
+        original(*args, **kwargs)
+        # Marca confirmada durante o processamento com ID menor que o maior lido,
+        # como acontece com sequências do Postgres
+        db.session.execute(MatchDirtyMark.__table__.insert().values(id=0, tenant_id=1, candidate_id=2))
+
+    monkeypatch.setattr(materializer, '_materialize', materialize_and_mark)
+    with app.app_context():
+        stats = materializer.process_dirty()
+        remaining = [(mark.id, mark.candidate_id) for mark in MatchDirtyMark.query.all()]
+
+    assert stats['marks'] >= 1
+    assert remaining == [(0, 2)]
+
+
+def test_process_dirty_respects_max_marks(app, tenant, client):
+    for candidate_id in (1, 2, 3):
+        client.put(f'/api/candidates/{candidate_id}', json={'experience_years': candidate_id}, headers=tenant['headers'])
+    with app.app_context():
+        assert MatchMaterializer().process_dirty(max_marks=2)['marks'] == 2
+        assert MatchMaterializer().pending_marks() == 1
+
+
+def test_closed_job_loses_pending_matches(app, tenant, client, stats_drift):
+    closed, open_job = tenant['job_ids']
+    with app.app_context():
+        reviewed = CandidateJobMatch.query.filter_by(job_posting_id=closed, candidate_id=1).one()
+        reviewed.status = 'approved'
+        db.session.commit()
+        assert CandidateJobMatch.query.filter_by(job_posting_id=closed).count() == 4
+
+    assert client.put(f'/api/job-postings/{closed}', json={'status': 'closed'}, headers=tenant['headers']).status_code == 200
+    with app.app_context():
+        stats = MatchMaterializer().process_dirty()
+        remaining = {(match.job_posting_id, match.status) for match in CandidateJobMatch.query.all()}
+
+    assert stats['pruned'] == 3
+    assert (closed, 'approved') in remaining
+    assert all(status != 'pending' for job_id, status in remaining if job_id == closed)
+    assert stats_drift() == 0
+    dashboard = client.get('/api/analytics/dashboard', headers=tenant['headers']).json
+    assert dashboard['basic_stats']['total_matches'] == 5
+
+    # Ao voltar a ficar ativa, a vaga é pontuada de novo contra todos os candidatos
+    client.put(f'/api/job-postings/{closed}', json={'status': 'active'}, headers=tenant['headers'])
+    with app.app_context():
+        MatchMaterializer().process_dirty()
+        assert CandidateJobMatch.query.filter_by(job_posting_id=closed).count() == 4
+        assert CandidateJobMatch.query.filter_by(job_posting_id=closed, candidate_id=1).one().status == 'approved'
+    assert stats_drift() == 0
+
+
+def test_rebuild_prunes_inactive_jobs_and_clears_only_read_marks(app, tenant, client, stats_drift):
+    closed = tenant['job_ids'][0]
+    with app.app_context():
+        # Vaga fechada por fora da aplicação, sem marca
+        db.session.execute(db.text('UPDATE job_postings SET status = :status WHERE id = :id'),
+                           {'status': 'closed', 'id': closed})
+        db.session.commit()
+        TenantStatsService().reconcile(1)
+        stats = MatchMaterializer().rebuild(1)
+        assert stats['pruned'] == 4
+        assert CandidateJobMatch.query.filter_by(job_posting_id=closed).count() == 0
+        assert MatchMaterializer().pending_marks() == 0
+    assert stats_drift() == 0
@@ -0,0 +1,124 @@
+"""Ranking de candidatos por vaga: leaderboard e pontuação ao vivo."""
+import pytest
+
+from src.models import db, AITask, CandidateJobMatch, MatchDirtyMark
+from src.services.match_materializer import MatchMaterializer
+from src.services.task_queue import TaskQueue, TaskWorker
+
+
+def run_worker(app):
+    from src.routes.ai_analytics import operations
+    with app.app_context():
+        TaskWorker(TaskQueue(), operations.handlers(), worker_id='w').run(burst=True)
+
+
+@pytest.fixture
+def job(app, client, auth_headers):
+    headers = auth_headers()
+    for index in range(5):
+        client.post('/api/candidates', json={
+            'first_name': f'C{index}', 'last_name': 'X', 'email': f'c{index}@example.com',
+            'skills': 'Python, SQL' if index % 2 else 'Java', 'salary_expectation': 8000,
+            'location': 'Rio'
+        }, headers=headers)
+    job_id = client.post('/api/job-postings', json={
+        'title': 'Dev', 'description': 'd', 'requirements': 'Python SQL', 'status': 'active',
+        'experience_level': 'mid', 'location': 'Rio'
+    }, headers=headers).json['id']
+    with app.app_context():
+        MatchMaterializer().process_dirty()
+    return {'id': job_id, 'headers': headers, 'url': f'/api/jobs/{job_id}/recommend-candidates'}
+
+
+def shape(item):
+    return {
+        key: {field: type(value) for field, value in item[key].items()} if key == 'candidate' else type(item[key])
+        for key in item
+    }
+
+
+def test_live_and_leaderboard_items_have_the_same_shape(client, job):
+    leaderboard = client.get(job['url'], headers=job['headers']).json
+    client.put(f'/api/job-postings/{job["id"]}', json={'status': 'closed'}, headers=job['headers'])
+    live = client.get(job['url'], headers=job['headers']).json
+
+    assert (leaderboard['source'], live['source']) == ('leaderboard', 'live')
+    assert [shape(item) for item in live['recommendations']] == [shape(item) for item in leaderboard['recommendations']]
+    assert live['recommendations'][0]['candidate']['salary_expectation'] == 8000.0
+    assert {item['match_status'] for item in live['recommendations']} == {'pending'}
+
+
+def test_stale_leaderboard_is_served_and_refreshed_by_the_queue(app, client, job):
+    # Vaga alterada depois da última materialização: ranking atrasado
+    client.put(f'/api/job-postings/{job["id"]}', json={'requirements': 'Java'}, headers=job['headers'])
+    with app.app_context():
+        before = {row.candidate_id: row.match_score for row in CandidateJobMatch.query}
+
+    stale = [client.get(job['url'], headers=job['headers']).json for _ in range(3)]
+
+    # A leitura não grava pares: serve a página atrasada e enfileira uma única atualização
+    assert {(body['source'], body['stale']) for body in stale} == {('leaderboard', True)}
+    with app.app_context():
+        assert {row.candidate_id: row.match_score for row in CandidateJobMatch.query} == before
+        assert MatchDirtyMark.query.count() == 1
+        assert [task.operation for task in AITask.query] == ['refresh_leaderboard']
+
+    run_worker(app)
+
+    pages, cursor = [], None
+    while True:
+        url = job['url'] + '?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url, headers=job['headers']).json
+        pages.append(body)
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+
+    with app.app_context():
+        assert MatchDirtyMark.query.count() == 0
+    assert {(page['source'], page['stale']) for page in pages} == {('leaderboard', False)}
+    ids = [item['candidate']['id'] for page in pages for item in page['recommendations']]
+    assert sorted(ids) == [1, 2, 3, 4, 5]
+    # Java agora é a habilidade pedida
+    assert pages[0]['recommendations'][0]['candidate']['skills'] == 'Java'
+
+
+def test_inactive_job_ranking_is_not_paginated(client, job):
+    client.put(f'/api/job-postings/{job["id"]}', json={'status': 'closed'}, headers=job['headers'])
+
+    first = client.get(job['url'] + '?limit=2', headers=job['headers'])
+    paged = client.get(job['url'] + '?limit=2&cursor=eyJzIjo1MCwiYyI6MX0', headers=job['headers'])
+
+    assert first.status_code == 200 and first.json['next_cursor'] is None
+    assert paged.status_code == 400
+
+
+def test_job_without_pairs_gets_a_live_first_page(app, client, job):
+    with app.app_context():
+        CandidateJobMatch.query.delete()
+        db.session.commit()
+
+    body = client.get(job['url'] + '?limit=2', headers=job['headers']).json
+    paged = client.get(job['url'] + '?limit=2&cursor=eyJzIjo1MCwiYyI6MX0', headers=job['headers'])
+
+    assert (body['source'], body['stale'], body['next_cursor']) == ('live', True, None)
+    assert len(body['recommendations']) == 2
+    assert paged.status_code == 400
+    run_worker(app)
+    with app.app_context():
+        assert CandidateJobMatch.query.count() == 5
+
+
+@pytest.mark.parametrize('limit', ['0', '-1'])
+def test_limit_below_one_is_rejected(client, job, limit):
+    assert client.get(job['url'] + f'?limit={limit}', headers=job['headers']).status_code == 400
+
+
+def test_limit_is_capped_at_the_max_page_size(client, job, monkeypatch):
+    from src.routes import ai_analytics
+
+    monkeypatch.setattr(ai_analytics, 'LEADERBOARD_MAX_PAGE_SIZE', 2)
+    body = client.get(job['url'] + '?limit=1000', headers=job['headers']).json
+    assert len(body['recommendations']) == 2 and body['next_cursor'] is not None
+    with pytest.raises(ValueError):
+        ai_analytics.leaderboard.page(1, job['id'], 0)
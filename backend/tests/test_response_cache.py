@@ -0,0 +1,95 @@
+"""Cache de respostas: gerações por tenant e escopo gravadas no banco."""
+import pytest
+
+from src.models import db, Candidate, ResponseCacheGeneration
+from src.services.feature_store import CandidateFeatureStore
+from src.utils.response_cache import ResponseCache, response_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+@pytest.fixture
+def candidate_id(client, auth_headers):
+    return client.post('/api/candidates', json={
+        'first_name': 'Ana', 'last_name': 'Silva', 'email': 'ana@example.com', 'skills': 'Python'
+    }, headers=auth_headers()).json['candidate']['id']
+
+
+def generation(app, tenant_id, scope):
+    with app.app_context():
+        return ResponseCacheGeneration.read(db.session.connection(), tenant_id, (scope,))[0]
+
+
+def test_repeated_read_is_served_from_cache(client, auth_headers, candidate_id):
+    first = client.get('/api/analytics/skills/top', headers=auth_headers())
+    second = client.get('/api/analytics/skills/top', headers=auth_headers())
+
+    assert (first.headers['X-Cache'], second.headers['X-Cache']) == ('MISS', 'HIT')
+    assert second.json == first.json
+
+
+def test_feature_store_write_outside_a_request_invalidates_skills(app, client, auth_headers, candidate_id):
+    before = client.get('/api/analytics/skills/top', headers=auth_headers()).json
+    assert [item['skill'] for item in before['skills']] == ['python']
+
+    # Mesma escrita da análise em massa, feita pelo TaskWorker fora de qualquer requisição
+    with app.app_context():
+        CandidateFeatureStore().store_many(1, {candidate_id: {
+            'skills': ['python', 'rust'], 'experience_years': 3, 'certifications': [], 'education_keywords': []
+        }})
+        db.session.commit()
+
+    after = client.get('/api/analytics/skills/top', headers=auth_headers())
+    assert after.headers['X-Cache'] == 'MISS'
+    assert sorted(item['skill'] for item in after.json['skills']) == ['python', 'rust']
+
+
+def test_generations_are_shared_between_workers(app, auth_headers, candidate_id):
+    # Outro worker: instância própria, sem tier compartilhado em disco
+    other_worker = ResponseCache(shared_dir='')
+    with app.test_request_context():
+        generations = other_worker.generations(1, ('candidates',))
+        other_worker.put('key', 1, generations, 'application/json', b'{}')
+
+    with app.app_context():
+        db.session.get(Candidate, candidate_id).location = 'Recife'
+        db.session.commit()
+
+    with app.test_request_context():
+        assert other_worker.get('key', other_worker.generations(1, ('candidates',))) is None
+    assert other_worker.stats()['invalidations'] == 1
+
+
+def test_only_committed_writes_bump_their_tenant_and_scope(app, candidate_id):
+    candidates = generation(app, 1, 'candidates')
+
+    with app.app_context():
+        db.session.get(Candidate, candidate_id).location = 'Recife'
+        db.session.flush()
+        db.session.rollback()
+    assert generation(app, 1, 'candidates') == candidates
+
+    with app.app_context():
+        db.session.get(Candidate, candidate_id).location = 'Recife'
+        db.session.commit()
+    assert generation(app, 1, 'candidates') == candidates + 1
+    assert generation(app, 1, 'tags') == 0
+    assert generation(app, 2, 'candidates') == 0
+
+
+def test_tagging_a_candidate_invalidates_the_tag_list(app, client, auth_headers, candidate_id):
+    headers = auth_headers()
+    tag_id = client.post('/api/tags', json={'name': 'Backend'}, headers=headers).json['tag']['id']
+    client.get('/api/tags', headers=headers)
+    tags = generation(app, 1, 'tags')
+
+    response = client.post(f'/api/candidates/{candidate_id}/tags', json={'tag_id': tag_id}, headers=headers)
+
+    assert response.status_code in (200, 201)
+    assert generation(app, 1, 'tags') == tags + 1
+    assert client.get('/api/tags', headers=headers).headers['X-Cache'] == 'MISS'
@@ -0,0 +1,28 @@
+"""Vagas compatíveis com um candidato (ReverseMatcher)."""
+from src.models import db, JobPosting
+from src.services.ai_service import AIService
+from src.services.job_features import job_feature_cache
+from src.services.reverse_matching import ReverseMatcher
+
+
+def test_job_deleted_between_the_two_queries_is_skipped(app, client, auth_headers, monkeypatch):
+    headers = auth_headers()
+    for title in ('Dev Python', 'Dev Go'):
+        client.post('/api/job-postings', json={
+            'title': title, 'description': title, 'requirements': title.split()[1].lower(), 'location': 'Rio',
+            'experience_level': 'mid', 'status': 'active'
+        }, headers=headers)
+
+    with app.app_context():
+        matcher = ReverseMatcher(AIService())
+        jobs = matcher.active_jobs(1)
+        db.session.expunge_all()
+        job_feature_cache.clear()
+        # Excluída depois da consulta das vagas ativas e antes da leitura dos textos
+        db.session.execute(JobPosting.__table__.delete().where(JobPosting.id == jobs[0].id))
+        db.session.commit()
+        monkeypatch.setattr(matcher, 'active_jobs', lambda tenant_id: jobs)
+
+        matches = matcher.match(1, {'skills': 'python go'})
+
+    assert [match['job']['id'] for match in matches] == [jobs[1].id]
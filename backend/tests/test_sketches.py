@@ -0,0 +1,115 @@
+"""Sketches por tenant: t-digest com valores discretos e deltas incorporados em segundo plano."""
+import bisect
+import random
+import zlib
+
+import pytest
+
+from src.models import db, TenantSketch, TenantSketchDelta
+from src.services.tenant_sketches import TenantSketchService
+from src.utils.sketches import TDigest
+
+
+def rank_error(ordered, value, q):
+    """Distância de q à faixa de posições do valor nos dados ordenados."""
+    low = bisect.bisect_left(ordered, value) / len(ordered)
+    high = bisect.bisect_right(ordered, value) / len(ordered)
+    return 0.0 if low <= q <= high else min(abs(q - low), abs(q - high))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_quantiles_of_tied_integers_stay_within_the_bound(seed):
+    rng = random.Random(seed)
+    values = sorted(rng.sample(range(40), 6))
+    data = rng.choices(values, [rng.random() ** 3 for _ in values], k=2000)
+    digest = TDigest()
+    digest.update(data)
+    digest = TDigest.from_bytes(digest.to_bytes())
+
+    assert digest.discrete
+    ordered = sorted(data)
+    for q in (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99):
+        value = digest.quantile(q)
+        assert value.is_integer()
+        assert rank_error(ordered, value, q) <= digest.rank_error_bound(q)
+
+
+def test_continuous_values_are_interpolated_and_legacy_digests_load():
+    rng = random.Random(1)
+    data = [rng.lognormvariate(8, 1) for _ in range(5000)]
+    digest = TDigest()
+    digest.update(data)
+    ordered = sorted(data)
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        assert rank_error(ordered, digest.quantile(q), q) <= digest.rank_error_bound(q)
+    assert not digest.discrete
+
+    # Formato TDG1, gravado antes do indicador de valores discretos
+    payload = zlib.decompress(digest.to_bytes())
+    legacy = TDigest.LEGACY_HEADER.pack(b'TDG1', *TDigest.HEADER.unpack_from(payload)[1:-1]) \
+        + payload[TDigest.HEADER.size:]
+    loaded = TDigest.from_bytes(zlib.compress(legacy))
+    assert (loaded.count, loaded.discrete, loaded.quantile(0.5)) == (digest.count, False, digest.quantile(0.5))
+
+
+@pytest.fixture
+def create_candidate(client, auth_headers):
+    def create(index, salary, skills='Python'):
+        response = client.post('/api/candidates', json={
+            'first_name': f'C{index}', 'last_name': 'X', 'email': f'c{index}@example.com',
+            'skills': skills, 'salary_expectation': salary
+        }, headers=auth_headers())
+        return response.json['candidate']['id']
+    return create
+
+
+def stored_sketches(app, tenant_id=1):
+    with app.app_context():
+        return {row.name: (row.data, row.stale) for row in TenantSketch.query.filter_by(tenant_id=tenant_id)}
+
+
+def test_writes_record_deltas_that_fold_incorporates(app, client, auth_headers, cli, create_candidate):
+    create_candidate(1, 5000)
+    with app.app_context():
+        # Antes da reconstrução os sketches não são usados nem recebem deltas
+        assert TenantSketchDelta.query.count() == 0
+        TenantSketchService().rebuild(1)
+    rebuilt = stored_sketches(app)
+
+    create_candidate(2, 7000)
+    create_candidate(3, 9000, skills='Python, Go')
+
+    # As escritas não regravam os sketches, só acrescentam deltas
+    assert stored_sketches(app) == rebuilt
+    with app.app_context():
+        assert TenantSketchDelta.query.filter_by(tenant_id=1).count() == 2
+    pending = client.get('/api/analytics/percentiles?field=salary_expectation', headers=auth_headers()).json
+    assert (pending['count'], pending['pending_updates']) == (1, 2)
+
+    result = cli.invoke(args=['sketches', 'fold'])
+    assert result.exit_code == 0, result.output
+    assert 'deltas=2' in result.output
+
+    with app.app_context():
+        assert TenantSketchDelta.query.count() == 0
+        service = TenantSketchService()
+        folded = service.percentiles(1, 'salary_expectation', [50])
+        skills = service.top_skills(1)
+        expected = service.compute(1)
+    assert (folded['count'], folded['pending_updates'], folded['percentiles'][0]['value']) == (3, 0, 7000.0)
+    assert {item['skill']: item['count'] for item in skills['skills']} == \
+        dict(expected[TenantSketch.SKILLS].top(10))
+
+
+def test_rebuild_discards_deltas_already_in_the_source_tables(app, create_candidate):
+    create_candidate(1, 5000)
+    with app.app_context():
+        TenantSketchService().rebuild(1)
+    create_candidate(2, 7000)
+
+    with app.app_context():
+        TenantSketchService().rebuild(1)
+        assert TenantSketchDelta.query.count() == 0
+        assert TenantSketchService().fold() == {'tenants': 0, 'deltas': 0}
+        digest = TenantSketch.load('salary_expectation', db.session.get(TenantSketch, (1, 'salary_expectation')).data)
+    assert digest.count == 2
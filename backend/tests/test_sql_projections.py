@@ -0,0 +1,102 @@
+"""Colunas de candidates lidas por cada rota.
+
+Cada rota deve projetar apenas as colunas que usa; resume_text (texto sem
+limite, adiado no modelo) só pode aparecer onde o texto é necessário.
+"""
+import re
+
+import pytest
+from src.models import Candidate
+
+ALL_COLUMNS = frozenset(Candidate.__table__.columns.keys())
+SCORING_COLUMNS = frozenset({'id', 'tenant_id', 'skills', 'experience_years', 'location', 'salary_expectation'})
+
+
+def candidate_columns(statements):
+    """União das colunas de candidates projetadas pelos SELECTs capturados."""
+    columns = set()
+    for statement in statements:
+        if not statement.startswith('SELECT') or not re.search(r'\bFROM candidates\b', statement):
+            continue
+        projection = statement[:statement.index(' FROM ')]
+        columns.update(re.findall(r'\bcandidates\.(\w+)', projection))
+    return columns
+
+
+@pytest.fixture
+def seeded(client, auth_headers):
+    headers = auth_headers()
+    for index in range(3):
+        response = client.post('/api/candidates', json={
+            'first_name': f'Ana{index}', 'last_name': 'Silva', 'email': f'ana{index}@example.com',
+            'skills': 'Python, SQL', 'resume_text': '5 anos como desenvolvedora Python'
+        }, headers=headers)
+        assert response.status_code == 201
+    job = client.post('/api/job-postings', json={
+        'title': 'Dev', 'description': 'python', 'requirements': 'Python SQL', 'status': 'active',
+        'experience_level': 'mid', 'location': 'Rio'
+    }, headers=headers)
+    tag = client.post('/api/tags', json={'name': 'destaque', 'color': '#fff'}, headers=headers)
+    return {
+        'candidate_id': response.json['candidate']['id'],
+        'job_id': job.json['id'],
+        'tag_id': tag.json['tag']['id'],
+        'headers': headers
+    }
+
+
+ROUTES = [
+    # (nome, método, url, corpo, colunas esperadas)
+    ('list', 'get', '/api/candidates', None, ALL_COLUMNS),
+    ('detail', 'get', '/api/candidates/{candidate_id}', None, ALL_COLUMNS),
+    ('update', 'put', '/api/candidates/{candidate_id}', {'status': 'contacted'}, ALL_COLUMNS),
+    ('add tag', 'post', '/api/candidates/{candidate_id}/tags', {'tag_id': '{tag_id}'}, {'id'}),
+    ('list notes', 'get', '/api/candidates/{candidate_id}/notes', None, {'id'}),
+    ('create note', 'post', '/api/candidates/{candidate_id}/notes', {'content': 'ok'}, {'id'}),
+    ('duplicates', 'get', '/api/candidates/duplicates', None,
+     {'id', 'dedup_email', 'dedup_name', 'dedup_linkedin', 'dedup_phone'}),
+    ('compatibility', 'get', '/api/candidates/{candidate_id}/compatibility/{job_id}', None, SCORING_COLUMNS),
+    ('matching jobs', 'get', '/api/candidates/{candidate_id}/matching-jobs', None, SCORING_COLUMNS),
+    ('analyze', 'post', '/api/candidates/{candidate_id}/analyze', None,
+     SCORING_COLUMNS | {'first_name', 'last_name', 'email', 'resume_text'}),
+    ('dashboard', 'get', '/api/analytics/dashboard', None, set()),
+]
+
+
+@pytest.mark.parametrize('name, method, url, body, expected', ROUTES, ids=[route[0] for route in ROUTES])
+def test_route_projects_only_needed_columns(client, seeded, sql_statements, name, method, url, body, expected):
+    url = url.format(**seeded)
+    if body:
+        body = {key: int(value.format(**seeded)) if isinstance(value, str) and value.startswith('{') else value
+                for key, value in body.items()}
+    sql_statements.clear()
+
+    response = getattr(client, method)(url, json=body, headers=seeded['headers'])
+
+    assert response.status_code < 300, response.get_data(as_text=True)
+    assert candidate_columns(sql_statements) == set(expected)
+
+
+def test_tag_removal_reads_only_candidate_id(client, seeded, sql_statements):
+    headers = seeded['headers']
+    client.post(f'/api/candidates/{seeded["candidate_id"]}/tags', json={'tag_id': seeded['tag_id']}, headers=headers)
+    sql_statements.clear()
+
+    response = client.delete(f'/api/candidates/{seeded["candidate_id"]}/tags/{seeded["tag_id"]}', headers=headers)
+
+    assert response.status_code == 200
+    assert candidate_columns(sql_statements) == {'id'}
+
+
+def test_recommendation_reads_resume_text_only_to_refresh_features(client, seeded, sql_statements):
+    url = f'/api/jobs/{seeded["job_id"]}/recommend-candidates'
+    sql_statements.clear()
+
+    response = client.get(url, headers=seeded['headers'])
+
+    assert response.status_code == 200
+    # O texto só é lido pela consulta dos candidatos com features ausentes ou desatualizadas
+    with_resume = [statement for statement in sql_statements if 'candidates.resume_text' in statement]
+    assert all('candidate_features.candidate_id IS NULL' in statement for statement in with_resume)
+    ranking = [statement for statement in sql_statements if statement not in with_resume]
+    assert candidate_columns(ranking) <= SCORING_COLUMNS | {'first_name', 'last_name', 'email', 'status'}
@@ -0,0 +1,220 @@
+"""Fila ai_tasks: reivindicação exclusiva, reservas vencidas e resultados do dono da reserva."""
+from datetime import datetime, timedelta
+
+from src.models import db, AITask
+from src.services.task_queue import TaskQueue, TaskWorker
+
+
+def test_each_task_is_claimed_by_a_single_worker(app):
+    with app.app_context():
+        queue = TaskQueue()
+        for index in range(5):
+            queue.enqueue(1, 'noop', {'index': index})
+
+        claimed = [queue.claim(worker) for worker in ('a', 'b', 'a', 'b', 'a', 'b')]
+
+        ids = [task.id for task in claimed if task is not None]
+        assert len(ids) == len(set(ids)) == 5
+        assert claimed[-1] is None
+        assert {task.locked_by for task in claimed if task is not None} == {'a', 'b'}
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_cannot_finish(app):
+    with app.app_context():
+        queue = TaskQueue(visibility_timeout=60)
+        task_id = queue.enqueue(1, 'noop', {}).id
+        assert queue.claim('a').id == task_id
+        assert queue.claim('b') is None
+
+        AITask.query.filter_by(id=task_id).update({'locked_until': datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+        reclaimed = queue.claim('b')
+
+        assert reclaimed.id == task_id and reclaimed.attempts == 2
+        assert queue.complete(reclaimed, 'a', {'stale': True}) is False
+        assert queue.complete(reclaimed, 'b', {'ok': True}) is True
+        assert db.session.get(AITask, task_id).status == 'completed'
+
+
+def test_worker_retries_transient_errors_and_fails_on_lookup_errors(app):
+    calls = []
+
+    def flaky(tenant_id, **payload):
+        calls.append(payload)
+        raise RuntimeError('temporário')
+
+    def missing(tenant_id, **payload):
+        raise LookupError('Candidato não encontrado')
+
+    with app.app_context():
+        queue = TaskQueue(retry_backoff=0)
+        flaky_id = queue.enqueue(1, 'flaky', {}).id
+        missing_id = queue.enqueue(1, 'missing', {}).id
+        worker = TaskWorker(queue, {'flaky': flaky, 'missing': missing}, worker_id='w')
+
+        while worker.run_once() is not None:
+            pass
+
+        assert len(calls) == queue.max_attempts
+        assert db.session.get(AITask, flaky_id).status == 'failed'
+        missing_task = db.session.get(AITask, missing_id)
+        assert (missing_task.status, missing_task.attempts) == ('failed', 1)
+
+
+def test_heartbeat_keeps_long_tasks_from_being_claimed_again(app):
+    import time
+
+    claims = []
+
+    def slow(tenant_id, **payload):
+        # Outro worker tenta reivindicar depois do prazo de visibilidade original
+        time.sleep(1.5)
+        with app.app_context():
+            claims.append(TaskQueue(visibility_timeout=1).claim('other'))
+        return {'ok': True}
+
+    with app.app_context():
+        queue = TaskQueue(visibility_timeout=1, heartbeat_interval=0.2)
+        task_id = queue.enqueue(1, 'slow', {}).id
+        TaskWorker(queue, {'slow': slow}, worker_id='w').run_once()
+
+        task = db.session.get(AITask, task_id)
+        assert claims == [None]
+        assert (task.status, task.attempts, task.locked_by) == ('completed', 1, 'w')
+
+
+def test_unserializable_result_fails_the_task_without_crashing_the_worker(app):
+    with app.app_context():
+        queue = TaskQueue()
+        task_id = queue.enqueue(1, 'bad', {}).id
+        worker = TaskWorker(queue, {'bad': lambda tenant_id: {'value': object()}}, worker_id='w')
+
+        assert worker.run_once().id == task_id
+
+        task = db.session.get(AITask, task_id)
+        assert task.status == 'failed'
+        assert task.error.startswith('Resultado não gravado')
+
+
+def test_async_analyze_of_missing_candidate_is_rejected(client, auth_headers):
+    response = client.post('/api/candidates/999/analyze?async=true', headers=auth_headers())
+
+    assert response.status_code == 404
+    with client.application.app_context():
+        assert AITask.query.count() == 0
+
+
+def test_async_analyze_enqueues_existing_candidate(client, auth_headers):
+    headers = auth_headers()
+    candidate_id = client.post('/api/candidates', json={'first_name': 'A', 'last_name': 'B'},
+                               headers=headers).json['candidate']['id']
+
+    response = client.post(f'/api/candidates/{candidate_id}/analyze?async=true', headers=headers)
+    assert response.status_code == 202
+    # Candidato de outro tenant também é rejeitado antes de enfileirar
+    assert client.post(f'/api/candidates/{candidate_id}/analyze?async=true',
+                       headers=auth_headers(2)).status_code == 404
+
+
+def test_operation_limit_holds_across_workers(app):
+    with app.app_context():
+        queue = TaskQueue()
+        for tenant_id in (1, 2):
+            queue.enqueue(tenant_id, 'heavy', {})
+        light_id = queue.enqueue(1, 'light', {}).id
+        limits = {'heavy': 1}
+
+        first = queue.claim('a', limits=limits)
+        second = queue.claim('b', limits=limits)
+
+        assert first.operation == 'heavy'
+        # A segunda tarefa pesada espera; a leve passa à frente
+        assert second.id == light_id
+        assert queue.claim('c', limits=limits) is None
+        assert queue.running('heavy') == 1
+
+
+def test_claim_over_limit_is_released_without_spending_an_attempt(app, monkeypatch):
+    with app.app_context():
+        queue = TaskQueue()
+        queue.enqueue(1, 'heavy', {})
+        other_id = queue.enqueue(2, 'heavy', {}).id
+        assert queue.claim('a', limits={'heavy': 1}) is not None
+
+        # Outro worker viu a operação livre antes da primeira reserva ser confirmada
+        original = queue.running
+        calls = []
+
+        def running(operation, now=None):
+            calls.append(operation)
+            return 0 if len(calls) == 1 else original(operation, now)
+
+        monkeypatch.setattr(queue, 'running', running)
+
+        assert queue.claim('b', limits={'heavy': 1}) is None
+        # Contagem antes da reserva, depois dela e na nova busca
+        assert len(calls) == 3
+        other = db.session.get(AITask, other_id)
+        db.session.refresh(other)
+        assert (other.status, other.attempts, other.locked_by) == ('queued', 0, None)
+
+
+def test_bulk_analysis_runs_on_the_queue_and_reports_progress(app, client, auth_headers, monkeypatch):
+    from src.services.bulk_analysis import BulkAnalysisService
+
+    headers = auth_headers()
+    for index in range(5):
+        client.post('/api/candidates', json={
+            'first_name': f'C{index}', 'last_name': 'X', 'skills': 'Python',
+            'resume_text': '3 anos com Python e SQL'
+        }, headers=headers)
+
+    response = client.post('/api/candidates/bulk-analyze', json={}, headers=headers)
+    job_id = response.json['job_id']
+    assert response.status_code == 202 and response.json['status'] == 'queued'
+    # Uma análise por tenant de cada vez
+    duplicate = client.post('/api/candidates/bulk-analyze', json={}, headers=headers)
+    assert duplicate.status_code == 409 and duplicate.json['job_id'] == job_id
+
+    progress = []
+    with app.app_context():
+        service = BulkAnalysisService(max_workers=1, chunk_size=2)
+        original = TaskQueue.report_progress
+
+        def record(queue, task_id, worker_id, counters):
+            progress.append(counters['processed'])
+            return original(queue, task_id, worker_id, counters)
+
+        monkeypatch.setattr(TaskQueue, 'report_progress', record)
+        TaskWorker(TaskQueue(), {service.OPERATION: service.run}, worker_id='w').run(burst=True)
+
+    body = client.get(f'/api/analysis-jobs/{job_id}', headers=headers).json
+    assert (body['status'], body['total'], body['processed'], body['failed']) == ('completed', 5, 5, 0)
+    assert progress[0] == 0 and progress[-1] == 5 and progress == sorted(progress)
+    assert client.get(f'/api/analysis-jobs/{job_id}', headers=auth_headers(tenant_id=2)).status_code == 404
+
+
+def test_unique_key_admits_a_single_active_task(app):
+    import pytest
+    from sqlalchemy.exc import IntegrityError
+
+    with app.app_context():
+        queue = TaskQueue()
+        first, created = queue.enqueue_unique(1, 'heavy', {'n': 1}, 'heavy:1')
+        again, created_again = queue.enqueue_unique(1, 'heavy', {'n': 2}, 'heavy:1')
+        other, created_other = queue.enqueue_unique(2, 'heavy', {}, 'heavy:2')
+        assert (created, created_again, created_other) == (True, False, True)
+        assert again.id == first.id != other.id
+
+        # Um pedido concorrente que passou de qualquer verificação prévia ainda esbarra no índice
+        with pytest.raises(IntegrityError):
+            db.session.add(AITask(id='x' * 32, tenant_id=1, operation='heavy', unique_key='heavy:1', payload='{}'))
+            db.session.commit()
+        db.session.rollback()
+
+        task = queue.claim('a')
+        assert task.id == first.id
+        queue.complete(task, 'a', {})
+        # Terminada a tarefa, a chave fica livre
+        _, created = queue.enqueue_unique(1, 'heavy', {}, 'heavy:1')
+        assert created
@@ -0,0 +1,86 @@
+"""Contadores de tenant_stats sob escritas concorrentes."""
+import threading
+
+from src.models import db, Candidate, CandidateJobMatch, JobPosting, TenantStat
+from src.services.match_store import MatchStore
+from src.services.tenant_stats import TenantStatsService
+
+
+def test_reconcile_keeps_increments_committed_while_it_runs(app, client, auth_headers, stats_drift, monkeypatch):
+    headers = auth_headers()
+    for index in range(3):
+        client.post('/api/candidates', json={'first_name': f'C{index}', 'last_name': 'X', 'skills': 'Python'},
+                    headers=headers)
+    service = TenantStatsService()
+    original = service._deltas
+
+    def deltas_then_concurrent_write(tenant_id):
+        deltas = original(tenant_id)
+        # Escrita (com seus incrementos) que o snapshot da consulta não viu, como
+        # uma transação concorrente confirmada logo depois dela
+        db.session.add(Candidate(tenant_id=tenant_id, first_name='Novo', last_name='X', status='new'))
+        db.session.flush()
+        return deltas
+
+    with app.app_context():
+        db.session.execute(TenantStat.__table__.update().where(
+            TenantStat.tenant_id == 1, TenantStat.metric == 'total', TenantStat.key == 'candidates'
+        ).values(value=TenantStat.value + 10))
+        db.session.commit()
+        monkeypatch.setattr(service, '_deltas', deltas_then_concurrent_write)
+        result = service.reconcile(1)
+
+    assert result['corrected'] == 0  # ainda não reconciliado: o desvio não é contado
+    assert stats_drift() == 0
+    with app.app_context():
+        assert service.read(1)['total']['candidates'] == 4
+
+
+def test_reconcile_reports_and_fixes_drift(app, client, auth_headers, stats_drift):
+    client.post('/api/candidates', json={'first_name': 'A', 'last_name': 'X', 'skills': 'Python, SQL'},
+                headers=auth_headers())
+    with app.app_context():
+        service = TenantStatsService()
+        service.reconcile(1)
+        db.session.execute(TenantStat.__table__.update().where(
+            TenantStat.tenant_id == 1, TenantStat.metric == 'skill'
+        ).values(value=TenantStat.value + 2))
+        db.session.commit()
+
+        assert service.reconcile(1)['corrected'] == 2
+        assert service.reconcile(1)['corrected'] == 0
+    assert stats_drift() == 0
+
+
+def test_concurrent_upserts_of_the_same_new_pairs_count_once(app, stats_drift):
+    with app.app_context():
+        db.session.add_all([Candidate(id=index, tenant_id=1, first_name='C', last_name=str(index))
+                            for index in range(1, 51)])
+        db.session.add(JobPosting(id=1, tenant_id=1, title='Vaga', description='d'))
+        db.session.commit()
+        TenantStatsService().reconcile(1)
+
+    barrier = threading.Barrier(4)
+    errors = []
+
+    def upsert(offset):
+        with app.app_context():
+            try:
+                barrier.wait()
+                MatchStore.save_many(1, 1, {index: {'overall_score': (index * 7 + offset) % 100}
+                                            for index in range(1, 51)})
+                db.session.commit()
+            except Exception as error:  # pragma: no cover - falha reportada abaixo
+                errors.append(error)
+
+    threads = [threading.Thread(target=upsert, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    with app.app_context():
+        assert CandidateJobMatch.query.count() == 50
+        assert TenantStatsService().read(1)['total']['matches'] == 50
+    assert stats_drift() == 0
@@ -0,0 +1,99 @@
+"""Índice TF-IDF por tenant: marcas fora da requisição e gravações concorrentes."""
+import os
+
+import pytest
+
+from src.models import TextIndexDirtyMark
+from src.services.text_similarity import TextSimilarityService
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    return str(tmp_path / 'tfidf')
+
+
+def create_candidate(client, headers, index, text):
+    response = client.post('/api/candidates', json={
+        'first_name': f'C{index}', 'last_name': 'X', 'email': f'c{index}@example.com', 'resume_text': text
+    }, headers=headers)
+    return response.json['candidate']['id']
+
+
+def test_writes_only_mark_documents_and_process_dirty_applies_them(app, client, auth_headers, index_dir):
+    headers = auth_headers()
+    service = TextSimilarityService(base_dir=index_dir)
+    first = create_candidate(client, headers, 0, 'python java spring postgres')
+    with app.app_context():
+        service.process_dirty()
+
+    second = create_candidate(client, headers, 1, 'java spring kafka')
+    job_id = client.post('/api/job-postings', json={
+        'title': 'Dev Java', 'description': 'spring kafka', 'requirements': 'java', 'location': 'Rio',
+        'experience_level': 'mid'
+    }, headers=headers).json['id']
+    client.delete(f'/api/candidates/{first}', headers=headers)
+
+    with app.app_context():
+        pending = {(mark.kind, mark.doc_id) for mark in TextIndexDirtyMark.query}
+        stats = service.process_dirty()
+        index = service.index_for(1)
+
+        assert pending == {('candidate', first), ('candidate', second), ('job', job_id)}
+        assert (stats['documents'], stats['removed']) == (2, 1)
+        assert TextIndexDirtyMark.query.count() == 0
+        assert index.keys['candidate'] == [second]
+        assert index.similarity('candidate', second, 'job', job_id) > 0
+
+
+def test_concurrent_processes_keep_each_others_documents(app, client, auth_headers, index_dir):
+    headers = auth_headers()
+    create_candidate(client, headers, 0, 'python django')
+    with app.app_context():
+        # Dois processos, cada um com o índice em memória
+        worker_a = TextSimilarityService(base_dir=index_dir)
+        worker_b = TextSimilarityService(base_dir=index_dir)
+        worker_a.process_dirty()
+        worker_b.index_for(1)
+
+    second = create_candidate(client, headers, 1, 'python flask')
+    with app.app_context():
+        worker_a.process_dirty()
+    third = create_candidate(client, headers, 2, 'python fastapi')
+    with app.app_context():
+        # B parte do índice gravado por A, não do que tinha em memória
+        worker_b.process_dirty()
+        reader = TextSimilarityService(base_dir=index_dir)
+
+        assert sorted(reader.index_for(1).keys['candidate']) == [1, second, third]
+        assert sorted(worker_a.index_for(1).keys['candidate']) == [1, second, third]
+    assert os.path.exists(os.path.join(index_dir, 'tenant_1', TextSimilarityService.LOCK_FILE))
+
+
+def test_similarity_is_informative_and_never_builds_the_index_in_the_request(app, client, auth_headers,
+                                                                              index_dir, monkeypatch):
+    from src.models import CandidateJobMatch
+    from src.routes import ai_analytics
+    service = TextSimilarityService(base_dir=index_dir)
+    monkeypatch.setattr(ai_analytics, 'text_similarity', service)
+    headers = auth_headers()
+    candidate_id = create_candidate(client, headers, 0, 'python django postgres')
+    job_id = client.post('/api/job-postings', json={
+        'title': 'Dev Python', 'description': 'django postgres', 'requirements': 'python', 'location': 'Rio',
+        'experience_level': 'mid'
+    }, headers=headers).json['id']
+    url = f'/api/candidates/{candidate_id}/compatibility/{job_id}?include_text_similarity=true'
+
+    missing = client.get(url, headers=headers).json['compatibility']
+    assert missing['text_similarity'] is None
+    with app.app_context():
+        assert service.index_for(1) is None
+        assert not os.path.exists(os.path.join(index_dir, 'tenant_1', 'vectorizer.pkl'))
+        service.process_dirty()
+
+    compatibility = client.get(url, headers=headers).json['compatibility']
+    assert compatibility['text_similarity'] > 0
+    assert compatibility['overall_score'] == missing['overall_score']
+    with app.app_context():
+        match = CandidateJobMatch.query.filter_by(candidate_id=candidate_id, job_posting_id=job_id).one()
+        assert float(match.match_score) == compatibility['overall_score']
+        assert 'text_similarity' not in match.ai_analysis
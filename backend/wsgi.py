@@ -1,7 +1,6 @@
+from src.main import create_app
 
-from src.main import app
+app = create_app()
 
 if __name__ == "__main__":
     app.run()
-
-